@@ -0,0 +1,9 @@
+"""
+Admission control.
+Rate limits and in-flight budgets that let the API refuse excess work
+early (429/503 with Retry-After) instead of slowing down every request.
+"""
+
+from app.admission.limits import ByteBudget, RateLimiter
+
+__all__ = ["ByteBudget", "RateLimiter"]
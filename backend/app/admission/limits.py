@@ -0,0 +1,73 @@
+"""
+Admission primitives: per-key token buckets and a shared byte budget.
+Not thread-safe: intended for use from the event loop thread only. Limits
+are per process; with several workers each enforces its own share.
+"""
+
+import time
+
+from app.cache.lru import LRUCache
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """
+    Token bucket per key: `burst` requests at once, refilled at `rate` per second.
+
+    Buckets of idle keys are evicted least-recently-used beyond max_keys;
+    an evicted key simply starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._buckets: LRUCache[str, _Bucket] = LRUCache(max_entries=max_keys)
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens from key's bucket.
+
+        Returns:
+            0.0 if admitted, otherwise seconds until enough tokens refill
+            (nothing is taken)
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(float(self.burst), now)
+            self._buckets.set(key, bucket)
+        else:
+            bucket.tokens = min(float(self.burst), bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+
+        if bucket.tokens >= cost:
+            bucket.tokens -= cost
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (cost - bucket.tokens) / self.rate
+
+
+class ByteBudget:
+    """Cap on bytes in flight across concurrent requests."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.in_flight = 0
+
+    def try_reserve(self, size: int) -> bool:
+        """Reserve size bytes if they fit; a lone oversized request is still admitted."""
+        if self.in_flight and self.in_flight + size > self.limit:
+            return False
+        self.in_flight += size
+        return True
+
+    def release(self, size: int) -> None:
+        self.in_flight -= size
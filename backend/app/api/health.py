@@ -5,10 +5,26 @@ Phase-1: Deterministic, no external dependencies.
 
 from fastapi import APIRouter
 
+from app.auth import get_token_cache_stats
+from app.cache import public_menus
+from app.resilience import get_breaker_stats
+
 router = APIRouter(prefix="/api", tags=["health"])
 
 
 @router.get("/health")
 def health_check() -> dict:
-    """Return health status. Deterministic, no DB or external calls."""
-    return {"status": "ok"}
+    """
+    Return health status. No DB or external calls.
+    
+    Includes in-process counters (e.g. token cache hits/misses), the
+    shared cache tier's counters and the state of the circuit breakers
+    around Supabase calls (reported, not probed; status stays "ok").
+    """
+    return {
+        "status": "ok",
+        "token_cache": get_token_cache_stats(),
+        "public_menu_cache": public_menus.get_stats(),
+        "public_menu_shared_cache": public_menus.get_shared_stats(),
+        "circuit_breakers": get_breaker_stats(),
+    }
@@ -1,18 +1,60 @@
 """
 Phase-4: Image upload endpoint.
 Accepts multipart images, validates, and uploads to Supabase Storage.
+Resized WebP derivatives are generated afterwards in the worker pool.
+Large photos on flaky connections can use resumable uploads instead:
+chunks are staged on disk and finalized into the same storage path.
 Does NOT perform OCR, parsing, or any business logic.
 """
 
-from typing import Annotated
+import asyncio
+import hashlib
+import re
+import time
+from datetime import datetime, timezone
+from typing import Annotated, NamedTuple
 
-from fastapi import APIRouter, File, HTTPException, UploadFile, status
-from pydantic import BaseModel
+from fastapi import APIRouter, File, Header, HTTPException, Request, Response, UploadFile, status
+from pydantic import BaseModel, Field
+from starlette.requests import ClientDisconnect
 
 from app.auth.dependencies import CurrentUser
+from app.config import get_settings
+from app.db import images as images_repo
+from app.db import menus as menus_repo
+from app.db.images import MenuImageRecord
 from app.logging import logger
-from app.storage import upload_file
+from app.media import ImageInfo, ImageTooLargeError, LimitedStream, sniff_image
+from app.media.pipeline import schedule_derivatives
+from app.media.validation import SNIFF_BYTES
+from app.resilience import CircuitOpenError
+from app.storage import (
+    SIGNED_UPLOAD_EXPIRES_SECONDS,
+    content_path,
+    create_signed_upload_url,
+    delete_files,
+    direct_upload_path,
+    object_exists,
+    object_size,
+    public_url_for,
+    read_object_head,
+    upload_file,
+)
 from app.storage.supabase import StorageConfigError
+from app.uploads import (
+    UploadOffsetMismatchError,
+    UploadSession,
+    UploadSessionBusyError,
+    UploadTooLargeError,
+    append_chunk,
+    create_session,
+    delete_session,
+    get_session,
+    hash_staged,
+    iter_staged,
+    locked_upload,
+    read_head,
+)
 
 
 router = APIRouter(prefix="/api/menus", tags=["images"])
@@ -24,6 +66,12 @@ ALLOWED_MIME_TYPES = {"image/jpeg", "image/png", "image/webp"}
 ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png", "webp"}
 MAX_FILE_SIZE_BYTES = 5 * 1024 * 1024  # 5MB
 MAX_FILE_COUNT = 5
+MAX_IMAGE_PIXELS = 40_000_000  # Reject decompression bombs from the header alone
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"  # Body type of resumable upload chunks
+_DIRECT_UPLOAD_NAME = re.compile(r"^[0-9a-f]{32}$")  # Stem of direct_upload_path names
+
+# Storage transfers in flight across all requests of this process
+_transfer_slots: asyncio.Semaphore | None = None
 
 
 # --- Pydantic Models ---
@@ -32,6 +80,8 @@ class ImageUploadResult(BaseModel):
     """Single uploaded image result."""
     path: str
     url: str
+    derivatives_status: str = "pending"  # pending, ready, failed
+    derivatives: dict[str, str] = {}  # width (px) -> WebP URL, once ready
 
 
 class ImageUploadResponse(BaseModel):
@@ -39,50 +89,99 @@ class ImageUploadResponse(BaseModel):
     images: list[ImageUploadResult]
 
 
-# --- Mock menu storage (reuse from menus.py until database is ready) ---
-# TODO: This will be replaced with actual database queries in Phase-5+
+class DirectUploadFile(BaseModel):
+    """A file the client will upload straight to storage."""
+    content_type: str
+    size: int = Field(gt=0)  # Bytes
+    # Hex digest as declared by the client; never verified, so it only
+    # de-duplicates within the menu and does not name the object
+    sha256: str = Field(pattern=r"^[0-9a-f]{64}$")
 
-_mock_menus: dict[str, dict] = {
-    "menu-1": {
-        "id": "menu-1",
-        "owner_id": "placeholder-owner",
-        "name": "Test Menu",
-        "status": "draft",
-    }
-}
 
+class DirectUploadRequest(BaseModel):
+    """Files to sign, in page order."""
+    files: list[DirectUploadFile]
 
-def _get_menu_or_404(menu_id: str) -> dict:
-    """Get menu from mock storage or raise 404."""
-    menu = _mock_menus.get(menu_id)
-    if not menu:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Menu not found"
-        )
-    return menu
+
+class DirectUploadedFile(DirectUploadFile):
+    """A file the client uploaded straight to storage."""
+    path: str | None = None  # From the signing call; not needed for content the menu already had
+
+
+class DirectUploadCompleteRequest(BaseModel):
+    """Uploaded files to add to the menu, in page order."""
+    files: list[DirectUploadedFile]
+
+
+class DirectUploadTarget(BaseModel):
+    """Where to PUT one file."""
+    sha256: str
+    path: str
+    upload_url: str | None  # None: the menu already has this content, nothing to send
+
+
+class DirectUploadResponse(BaseModel):
+    """Signed upload targets, in request order."""
+    uploads: list[DirectUploadTarget]
+    expires_in: int  # Seconds the upload URLs stay valid
+
+
+class ResumableUploadRequest(BaseModel):
+    """A file to upload in chunks."""
+    content_type: str
+    size: int = Field(gt=0)  # Bytes
+
+
+class ResumableUploadResponse(BaseModel):
+    """A resumable upload session."""
+    id: str
+    offset: int  # Bytes received so far; the next chunk starts here
+    size: int
+    expires_at: datetime
+
+
+class _ValidatedFile(NamedTuple):
+    """A file that passed validation and hashing and is ready to stream."""
+    label: str
+    info: ImageInfo
+    content_hash: str  # Hex SHA-256; names the object
+    stream: LimitedStream
+
+
+class _StoredFile(NamedTuple):
+    """Outcome of storing one unique file."""
+    path: str
+    content_hash: str
+    created: bool  # False if the object already existed (nothing transferred)
 
 
-def _enforce_ownership(menu: dict, user_id: str) -> None:
+# --- Helpers ---
+
+def _to_upload_result(image: MenuImageRecord) -> ImageUploadResult:
+    return ImageUploadResult(
+        path=image["path"],
+        url=public_url_for(image["path"]),
+        derivatives_status=image["status"],
+        derivatives={
+            width: public_url_for(path) for width, path in image["derivatives"].items()
+        },
+    )
+
+
+async def _require_owned_menu(menu_id: str, user_id: str) -> None:
     """
-    Enforce that the current user owns the menu.
+    Ensure the menu exists and belongs to the current user.
     
     Raises:
-        HTTPException: 403 if user_id does not match menu.owner_id
+        HTTPException: 404 if the menu does not exist or is owned by someone else
     """
-    # DEVELOPMENT ONLY: Auto-assign mock menu to current user
-    if menu["owner_id"] == "placeholder-owner":
-        menu["owner_id"] = user_id
-        logger.info(f"DEVELOPMENT: Auto-assigned {menu['id']} ownership to {user_id}")
-        return
-
-    if menu["owner_id"] != user_id:
+    if not await menus_repo.owns_menu(menu_id, user_id):
         logger.warning(
-            f"Ownership violation: user {user_id[:8]}... attempted to upload to menu owned by {menu['owner_id'][:8]}..."
+            f"Upload rejected: menu {menu_id} not found for user {user_id[:8]}..."
         )
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to upload images to this menu"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Menu not found"
         )
 
 
@@ -105,6 +204,334 @@ def _get_extension(filename: str | None, content_type: str | None) -> str | None
     return None
 
 
+def _check_file_count(count: int) -> None:
+    """Step 3: File count validation."""
+    if count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No files provided"
+        )
+    
+    if count > MAX_FILE_COUNT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many files. Maximum allowed: {MAX_FILE_COUNT}"
+        )
+
+
+def _check_file_type(file_label: str, content_type: str | None, filename: str | None) -> str:
+    """
+    Step 4: MIME type and extension validation.
+    
+    Returns:
+        The file extension (without dot)
+    """
+    if content_type not in ALLOWED_MIME_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file type for '{file_label}': {content_type}. Allowed: {', '.join(ALLOWED_MIME_TYPES)}"
+        )
+    
+    extension = _get_extension(filename, content_type)
+    if not extension or extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file extension for '{file_label}'. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    return extension
+
+
+def _check_declared_size(file_label: str, size: int | None) -> None:
+    """Step 5 (first part): declared size, before reading anything."""
+    if size is not None and size > MAX_FILE_SIZE_BYTES:
+        size_mb = size / (1024 * 1024)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File '{file_label}' too large: {size_mb:.2f}MB. Maximum: 5MB"
+        )
+
+
+def _check_content(file_label: str, head: bytes) -> ImageInfo:
+    """
+    Step 5 (second part): the header must be a supported image of sane size.
+    
+    Returns:
+        The detected image format and dimensions
+    """
+    if len(head) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File '{file_label}' is empty"
+        )
+    
+    # Content must really be a supported image, not just be labelled as one
+    info = sniff_image(head)
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File '{file_label}' is not a valid JPEG, PNG or WebP image"
+        )
+    
+    if info.width is not None and info.height is not None:
+        if info.width == 0 or info.height == 0 or info.width * info.height > MAX_IMAGE_PIXELS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File '{file_label}' has unsupported dimensions: {info.width}x{info.height}"
+            )
+    return info
+
+
+async def _hash_file(file: UploadFile, head: bytes) -> str:
+    """
+    Hash a spooled upload in one chunked pass, then rewind it for streaming.
+    
+    Raises:
+        ImageTooLargeError: If the file is larger than MAX_FILE_SIZE_BYTES
+    """
+    digest = hashlib.sha256()
+    async for chunk in LimitedStream(file, head, MAX_FILE_SIZE_BYTES):
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest()
+
+
+def _get_transfer_slots() -> asyncio.Semaphore:
+    """Process-wide limit of STORAGE_UPLOAD_CONCURRENCY storage transfers, created on first use."""
+    global _transfer_slots
+    if _transfer_slots is None:
+        _transfer_slots = asyncio.Semaphore(get_settings().STORAGE_UPLOAD_CONCURRENCY)
+    return _transfer_slots
+
+
+async def _store_one(menu_id: str, validated: _ValidatedFile) -> _StoredFile:
+    """
+    Stream a single validated file to storage unless it is already there.
+    
+    Waits for a process-wide transfer slot. A HEAD request catches objects that exist
+    without an index row (e.g. a previous request failed after uploading).
+    """
+    path = content_path(menu_id, validated.content_hash, validated.info.extension)
+    async with _get_transfer_slots():
+        if await object_exists(path):
+            logger.info(f"Skipped upload of {path}: object already exists", extra={"menu_id": menu_id})
+            return _StoredFile(path=path, content_hash=validated.content_hash, created=False)
+        
+        started = time.perf_counter()
+        try:
+            result = await upload_file(
+                menu_id, validated.stream, validated.info.extension, validated.content_hash
+            )
+        except ImageTooLargeError as e:
+            raise ImageTooLargeError(
+                f"File '{validated.label}' too large. Maximum: 5MB"
+            ) from e
+        duration_ms = (time.perf_counter() - started) * 1000
+    
+    logger.info(
+        f"Stored {result['path']}",
+        extra={"menu_id": menu_id, "bytes": validated.stream.bytes_read, "duration_ms": round(duration_ms, 1)},
+    )
+    return _StoredFile(path=result["path"], content_hash=validated.content_hash, created=True)
+
+
+async def _rollback(menu_id: str, stored: list[_StoredFile]) -> None:
+    """
+    Delete objects this request created; pre-existing ones are kept.
+    
+    Objects that are indexed by now are kept too: a concurrent request
+    with the same bytes may have found this request's object and
+    indexed it.
+    """
+    created = [s.path for s in stored if s.created]
+    if not created:
+        return
+    try:
+        indexed = await images_repo.find_indexed_paths(created)
+        created = [path for path in created if path not in indexed]
+        if not created:
+            return
+        logger.warning(f"Rolling back {len(created)} uploaded image(s) for menu_id={menu_id}")
+        await delete_files(created)
+    except Exception as e:
+        logger.error(f"Rollback failed for menu_id={menu_id}: {e}")
+
+
+async def _upload_all(
+    menu_id: str,
+    validated_files: list[_ValidatedFile],
+) -> list[ImageUploadResult]:
+    """
+    Store all validated files, all-or-nothing, skipping known content.
+    
+    Files whose hash is already in the menu's image index are not
+    transferred at all; duplicates within the request are sent once. At
+    most STORAGE_UPLOAD_CONCURRENCY uploads run at once per process, across
+    all requests. If any upload
+    fails, objects created by this request are deleted again and the first
+    error is re-raised.
+    
+    Returns:
+        Results in the same order as validated_files
+    """
+    unique: dict[str, _ValidatedFile] = {}
+    for validated in validated_files:
+        unique.setdefault(validated.content_hash, validated)
+    
+    known = await images_repo.find_menu_images(menu_id, list(unique))
+    to_store = [v for h, v in unique.items() if h not in known]
+    
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(_store_one(menu_id, validated) for validated in to_store),
+        return_exceptions=True,
+    )
+    duration_ms = (time.perf_counter() - started) * 1000
+    
+    stored = [o for o in outcomes if isinstance(o, _StoredFile)]
+    errors = [o for o in outcomes if isinstance(o, BaseException)]
+    
+    if errors:
+        await _rollback(menu_id, stored)
+        raise errors[0]
+    
+    uploaded = sum(s.created for s in stored)
+    logger.info(
+        f"Uploaded {uploaded} image(s) for menu_id={menu_id}",
+        extra={
+            "menu_id": menu_id,
+            "uploaded": uploaded,
+            "reused": len(validated_files) - uploaded,
+            "duration_ms": round(duration_ms, 1),
+        },
+    )
+    
+    records = await _index_images(menu_id, stored, known)
+    return _ordered_results(
+        menu_id, [(v.content_hash, v.info.extension) for v in validated_files], records
+    )
+
+
+async def _index_images(
+    menu_id: str,
+    stored: list[_StoredFile],
+    known: dict[str, MenuImageRecord],
+) -> dict[str, MenuImageRecord]:
+    """
+    Index stored originals and schedule their derivatives.
+    
+    Known images whose derivatives failed earlier are retried.
+    
+    Returns:
+        Index records by content hash (known and newly inserted)
+    """
+    # Index new originals before answering; if that fails they are
+    # unreachable, so they are deleted like any other failed upload
+    try:
+        inserted = await images_repo.add_menu_images(
+            menu_id, [(s.path, s.content_hash) for s in stored]
+        )
+    except Exception:
+        await _rollback(menu_id, stored)
+        raise
+    
+    records = {**known, **{r["content_hash"]: r for r in inserted if r["content_hash"]}}
+    for record in inserted:
+        schedule_derivatives(menu_id, record["path"])
+    for record in known.values():
+        if record["status"] == "failed" and await images_repo.retry_failed_derivatives(record["path"]):
+            record["status"] = "pending"
+            schedule_derivatives(menu_id, record["path"])
+    return records
+
+
+def _ordered_results(
+    menu_id: str,
+    files: list[tuple[str, str]],
+    records: dict[str, MenuImageRecord],
+) -> list[ImageUploadResult]:
+    """Results for (content hash, extension) pairs, in request order."""
+    results = []
+    for content_hash, extension in files:
+        record = records.get(content_hash)
+        if record is not None:
+            results.append(_to_upload_result(record))
+        else:
+            # Indexed concurrently by another request
+            path = content_path(menu_id, content_hash, extension)
+            results.append(ImageUploadResult(path=path, url=public_url_for(path)))
+    return results
+
+
+async def store_menu_images(menu_id: str, files: list[UploadFile]) -> list[ImageUploadResult]:
+    """
+    Validate uploaded files and store them for an owned menu (steps 3-7).
+    
+    Shared by image upload and menu creation; the caller has already
+    checked ownership.
+    
+    Raises:
+        HTTPException: 400 for validation errors, 500 for storage errors
+    """
+    _check_file_count(len(files))
+    
+    # Pre-validate all files before uploading any (no partial uploads)
+    validated_files: list[_ValidatedFile] = []
+    
+    for i, file in enumerate(files):
+        file_label = file.filename or f"file[{i}]"
+        
+        _check_file_type(file_label, file.content_type, file.filename)
+        _check_declared_size(file_label, file.size)
+        
+        # Only the header is read here; the body is streamed during upload
+        head = await file.read(SNIFF_BYTES)
+        info = _check_content(file_label, head)
+        
+        # First full pass (over the spooled file) names the object and
+        # enforces the size limit before anything is sent to storage
+        try:
+            content_hash = await _hash_file(file, head)
+        except ImageTooLargeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File '{file_label}' too large. Maximum: 5MB"
+            )
+        
+        validated_files.append(
+            _ValidatedFile(
+                label=file_label,
+                info=info,
+                content_hash=content_hash,
+                stream=LimitedStream(file, b"", MAX_FILE_SIZE_BYTES),
+            )
+        )
+    
+    # Step 6: Upload all validated files (concurrently, rolled back on failure)
+    try:
+        results = await _upload_all(menu_id, validated_files)
+    except ImageTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except CircuitOpenError:
+        raise  # 503 with Retry-After, from the app's handler
+    except StorageConfigError as e:
+        logger.error(f"Storage configuration error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Storage service is not configured. Please contact support."
+        )
+    except Exception as e:
+        logger.error(f"Storage upload failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to upload images. Please try again."
+        )
+    
+    return results
+
+
 # --- Endpoint ---
 
 @router.post("/{menu_id}/images", response_model=ImageUploadResponse)
@@ -121,11 +548,18 @@ async def upload_images(
     2. Menu ownership check
     3. File count check
     4. File type validation (MIME + extension)
-    5. File size validation
-    6. Upload to Supabase Storage
+    5. File size + content validation (declared size, magic bytes, dimensions,
+       then a hashing pass that also checks the actual size)
+    6. Upload to Supabase Storage at menus/{menu_id}/{sha256}.{ext}
+       (concurrent, skipped for content the menu already has, rolled back
+       on any failure)
+    7. Schedule WebP derivatives (background; see GET /{menu_id}/images)
     
     Failure behavior: First invalid file rejects entire request.
-    No partial uploads allowed.
+    No partial uploads allowed. Files are hashed chunk by chunk from the
+    spooled upload and then streamed to storage in chunks, so no file is
+    held in memory as a whole. Re-uploading identical bytes returns the
+    existing image without transferring it again.
     
     Args:
         menu_id: ID of the menu to upload images for
@@ -133,81 +567,498 @@ async def upload_images(
         files: List of image files to upload
         
     Returns:
-        ImageUploadResponse with list of uploaded image paths and URLs
+        ImageUploadResponse with list of uploaded image paths and URLs;
+        derivatives are still pending at this point
         
     Raises:
         HTTPException: 400 for validation errors
         HTTPException: 401 if not authenticated (handled by dependency)
-        HTTPException: 403 if not owner
-        HTTPException: 404 if menu not found
+        HTTPException: 404 if menu not found or not owned by the user
         HTTPException: 500 for storage errors
+        CircuitOpenError: If storage is failing (answered with 503)
     """
-    logger.info(f"Upload request: menu_id={menu_id}, user_id={user_id[:8]}..., file_count={len(files)}")
+    logger.info(f"Upload request: menu_id={menu_id}", extra={"menu_id": menu_id, "file_count": len(files)})
     
     # Step 2: Ownership check (Step 1 JWT is handled by CurrentUser dependency)
-    menu = _get_menu_or_404(menu_id)
-    _enforce_ownership(menu, user_id)
+    await _require_owned_menu(menu_id, user_id)
     
-    # Step 3: File count validation
-    if len(files) == 0:
+    # Steps 3-7
+    results = await store_menu_images(menu_id, files)
+    
+    logger.info(f"Upload successful: menu_id={menu_id}", extra={"menu_id": menu_id, "images": len(results)})
+    
+    return ImageUploadResponse(images=results)
+
+
+def _check_direct_files(files: list[DirectUploadFile]) -> list[str]:
+    """
+    Steps 3-5 for direct uploads, on the declared metadata only.
+    
+    Returns:
+        The extension of each file
+    """
+    _check_file_count(len(files))
+    extensions = []
+    for i, file in enumerate(files):
+        file_label = f"file[{i}]"
+        extensions.append(_check_file_type(file_label, file.content_type, None))
+        _check_declared_size(file_label, file.size)
+    return extensions
+
+
+def _is_direct_upload_path(menu_id: str, path: str, extension: str) -> bool:
+    """Whether path is a name the signing call could have issued for this menu and type."""
+    prefix, _, name = path.rpartition("/")
+    stem, _, ext = name.partition(".")
+    return prefix == f"menus/{menu_id}" and ext == extension and bool(_DIRECT_UPLOAD_NAME.match(stem))
+
+
+async def _verify_direct_upload(
+    file_label: str,
+    file: DirectUploadFile,
+    path: str,
+) -> str | None:
+    """
+    Check an uploaded object by size (HEAD) and magic bytes (range read).
+    
+    The payload itself is never read, so the declared SHA-256 stays
+    unverified: it is stored as the menu's de-duplication key only, and
+    OCR hashes the bytes it downloads instead of trusting it.
+    
+    Returns:
+        None if the object is valid, otherwise why it is not
+    """
+    async with _get_transfer_slots():
+        size = await object_size(path)
+        if size is None:
+            return f"File '{file_label}' was not uploaded"
+        if size != file.size or size > MAX_FILE_SIZE_BYTES:
+            return f"File '{file_label}' has {size} bytes, expected {file.size} (maximum: 5MB)"
+        head = await read_object_head(path, SNIFF_BYTES)
+    
+    try:
+        info = _check_content(file_label, head or b"")
+    except HTTPException as e:
+        return e.detail
+    if info.mime_type != file.content_type:
+        return f"File '{file_label}' is {info.mime_type}, not {file.content_type}"
+    return None
+
+
+@router.post("/{menu_id}/images/signed", response_model=DirectUploadResponse)
+async def sign_direct_uploads(
+    menu_id: str,
+    user_id: CurrentUser,
+    request: DirectUploadRequest,
+) -> DirectUploadResponse:
+    """
+    Issue signed URLs so the client uploads images straight to storage.
+    
+    Runs the upload endpoint's ownership, count, type and declared-size
+    checks, then signs one URL per new file at a server-chosen path
+    (menus/{menu_id}/{uuid}.{ext}). Content the menu already has (by
+    declared SHA-256) gets no URL and its existing path. The client PUTs
+    each file to its URL, then calls POST /{menu_id}/images/signed/complete
+    with the returned paths; image bytes never pass through the API.
+    
+    Raises:
+        HTTPException: 400 for invalid file metadata
+        HTTPException: 404 if menu not found or not owned by the user
+        HTTPException: 500 for storage errors
+        CircuitOpenError: If storage is failing (answered with 503)
+    """
+    await _require_owned_menu(menu_id, user_id)
+    extensions = _check_direct_files(request.files)
+    
+    paths: dict[str, str] = {}
+    for file, extension in zip(request.files, extensions):
+        paths.setdefault(file.sha256, direct_upload_path(menu_id, extension))
+    known = await images_repo.find_menu_images(menu_id, list(paths))
+    paths.update({content_hash: record["path"] for content_hash, record in known.items()})
+    
+    to_sign = [h for h in paths if h not in known]
+    try:
+        signed = dict(zip(
+            to_sign,
+            await asyncio.gather(*(create_signed_upload_url(paths[h]) for h in to_sign)),
+        ))
+    except CircuitOpenError:
+        raise  # 503 with Retry-After, from the app's handler
+    except StorageConfigError as e:
+        logger.error(f"Storage configuration error: {e}")
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No files provided"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Storage service is not configured. Please contact support."
         )
-    
-    if len(files) > MAX_FILE_COUNT:
+    except Exception as e:
+        logger.error(f"Signing uploads failed: {e}", extra={"menu_id": menu_id})
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Too many files. Maximum allowed: {MAX_FILE_COUNT}"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to prepare uploads. Please try again."
         )
     
-    # Pre-validate all files before uploading any (no partial uploads)
-    validated_files: list[tuple[bytes, str]] = []
+    logger.info(
+        f"Signed {len(signed)} direct upload(s) for menu_id={menu_id}",
+        extra={"menu_id": menu_id, "file_count": len(request.files)},
+    )
     
-    for i, file in enumerate(files):
-        file_label = file.filename or f"file[{i}]"
-        
-        # Step 4: MIME type validation
-        if file.content_type not in ALLOWED_MIME_TYPES:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid file type for '{file_label}': {file.content_type}. Allowed: {', '.join(ALLOWED_MIME_TYPES)}"
-            )
-        
-        # Extract and validate extension
-        extension = _get_extension(file.filename, file.content_type)
-        if not extension or extension not in ALLOWED_EXTENSIONS:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid file extension for '{file_label}'. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
+    return DirectUploadResponse(
+        uploads=[
+            DirectUploadTarget(
+                sha256=file.sha256,
+                path=paths[file.sha256],
+                upload_url=signed[file.sha256].url if file.sha256 in signed else None,
             )
-        
-        # Read file content
-        content = await file.read()
-        
-        # Step 5: Size validation
-        if len(content) > MAX_FILE_SIZE_BYTES:
-            size_mb = len(content) / (1024 * 1024)
+            for file in request.files
+        ],
+        expires_in=SIGNED_UPLOAD_EXPIRES_SECONDS,
+    )
+
+
+@router.post("/{menu_id}/images/signed/complete", response_model=ImageUploadResponse)
+async def complete_direct_uploads(
+    menu_id: str,
+    user_id: CurrentUser,
+    request: DirectUploadCompleteRequest,
+) -> ImageUploadResponse:
+    """
+    Verify directly uploaded images and add them to the menu.
+    
+    Takes the signing call's file list, each file with the path it was
+    given. Each new object is checked without downloading it: size from a
+    HEAD request, format and dimensions from the first 64KB (range read).
+    Objects that fail are deleted and the request is rejected; valid ones
+    stay in storage, so a retry only re-uploads the failures. On success
+    the images are indexed and their derivatives scheduled, as with a
+    regular upload.
+    
+    Raises:
+        HTTPException: 400 if any file is missing or invalid
+        HTTPException: 404 if menu not found or not owned by the user
+        HTTPException: 500 for storage errors
+        CircuitOpenError: If storage is failing (answered with 503)
+    """
+    await _require_owned_menu(menu_id, user_id)
+    extensions = _check_direct_files(request.files)
+    
+    unique: dict[str, tuple[str, DirectUploadedFile, str]] = {}
+    for i, (file, extension) in enumerate(zip(request.files, extensions)):
+        unique.setdefault(file.sha256, (f"file[{i}]", file, extension))
+    known = await images_repo.find_menu_images(menu_id, list(unique))
+    
+    to_verify: dict[str, tuple[str, DirectUploadedFile, str]] = {}
+    for content_hash, (label, file, extension) in unique.items():
+        if content_hash in known:
+            continue
+        if file.path is None or not _is_direct_upload_path(menu_id, file.path, extension):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File '{file_label}' too large: {size_mb:.2f}MB. Maximum: 5MB"
+                detail=f"File '{label}' needs the path returned by the signing call"
             )
-        
-        if len(content) == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File '{file_label}' is empty"
+        to_verify[content_hash] = (label, file, file.path)
+    
+    try:
+        problems = await asyncio.gather(
+            *(
+                _verify_direct_upload(label, file, path)
+                for label, file, path in to_verify.values()
             )
-        
-        validated_files.append((content, extension))
+        )
+        invalid = [
+            (path, problem)
+            for (_, _, path), problem in zip(to_verify.values(), problems)
+            if problem is not None
+        ]
+        if invalid:
+            # Missing objects are listed too; deleting them is a no-op
+            await delete_files([path for path, _ in invalid])
+    except CircuitOpenError:
+        raise  # 503 with Retry-After, from the app's handler
+    except StorageConfigError as e:
+        logger.error(f"Storage configuration error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Storage service is not configured. Please contact support."
+        )
+    except Exception as e:
+        logger.error(f"Verifying direct uploads failed: {e}", extra={"menu_id": menu_id})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to verify uploads. Please try again."
+        )
     
-    # Step 6: Upload all validated files
-    results: list[ImageUploadResult] = []
+    if invalid:
+        logger.warning(
+            f"Direct upload rejected for menu_id={menu_id}: {invalid[0][1]}",
+            extra={"menu_id": menu_id, "invalid": len(invalid)},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=invalid[0][1]
+        )
     
+    stored = [
+        _StoredFile(path=path, content_hash=content_hash, created=True)
+        for content_hash, (_, _, path) in to_verify.items()
+    ]
     try:
-        for content, extension in validated_files:
-            result = upload_file(menu_id, content, extension)
-            results.append(ImageUploadResult(path=result["path"], url=result["url"]))
+        records = await _index_images(menu_id, stored, known)
+        # Same declared content indexed meanwhile by a concurrent completion:
+        # answer with that image and drop this request's copy
+        raced = [s for s in stored if s.content_hash not in records]
+        if raced:
+            records.update(await images_repo.find_menu_images(menu_id, [s.content_hash for s in raced]))
+            await _rollback(menu_id, raced)
+    except Exception as e:
+        logger.error(f"Indexing direct uploads failed: {e}", extra={"menu_id": menu_id})
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save images. Please upload them again."
+        )
+    
+    logger.info(
+        f"Completed direct upload for menu_id={menu_id}",
+        extra={"menu_id": menu_id, "uploaded": len(stored), "reused": len(request.files) - len(stored)},
+    )
+    return ImageUploadResponse(
+        images=[
+            _to_upload_result(records[file.sha256]) if file.sha256 in records
+            else ImageUploadResult(path=file.path or "", url=public_url_for(file.path or ""))
+            for file in request.files
+        ]
+    )
+
+
+def _upload_headers(upload: UploadSession, offset: int) -> dict[str, str]:
+    return {
+        "Upload-Offset": str(offset),
+        "Upload-Length": str(upload.size),
+        "Cache-Control": "no-store",
+    }
+
+
+async def _get_upload(menu_id: str, upload_id: str, user_id: str) -> UploadSession:
+    """
+    Load one of the user's upload sessions for this menu.
+    
+    Raises:
+        HTTPException: 404 if the session does not exist, has expired or
+            belongs to another user or menu
+    """
+    upload = await get_session(user_id, upload_id)
+    if upload is None or upload.menu_id != menu_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return upload
+
+
+def _check_upload_content(upload: UploadSession, head: bytes) -> ImageInfo:
+    """Magic bytes and dimensions, and the sniffed type must match the declared one."""
+    info = _check_content("upload", head)
+    if info.mime_type != upload.content_type:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File 'upload' is {info.mime_type}, not {upload.content_type}"
+        )
+    return info
+
+
+@router.post(
+    "/{menu_id}/uploads",
+    response_model=ResumableUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_resumable_upload(
+    menu_id: str,
+    user_id: CurrentUser,
+    request: ResumableUploadRequest,
+    response: Response,
+) -> ResumableUploadResponse:
+    """
+    Start a resumable upload of one image.
+    
+    Runs the upload endpoint's ownership, type and declared-size checks.
+    The client then PATCHes chunks to the session (Location header), can
+    ask for the current offset with HEAD after a failure, and finishes
+    with POST .../complete. Sessions expire after
+    UPLOAD_SESSION_TTL_SECONDS.
+    
+    Raises:
+        HTTPException: 400 for invalid file metadata
+        HTTPException: 404 if menu not found or not owned by the user
+        HTTPException: 429 if the user has too many open sessions
+    """
+    await _require_owned_menu(menu_id, user_id)
+    extension = _check_file_type("upload", request.content_type, None)
+    _check_declared_size("upload", request.size)
+    
+    upload = await create_session(user_id, menu_id, request.content_type, extension, request.size)
+    if upload is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many unfinished uploads. Complete or cancel one first."
+        )
+    
+    logger.info(
+        f"Started resumable upload {upload.id} for menu_id={menu_id}",
+        extra={"menu_id": menu_id, "bytes": upload.size},
+    )
+    response.headers.update(_upload_headers(upload, 0))
+    response.headers["Location"] = f"/api/menus/{menu_id}/uploads/{upload.id}"
+    expires_at = upload.created_at + get_settings().UPLOAD_SESSION_TTL_SECONDS
+    return ResumableUploadResponse(
+        id=upload.id,
+        offset=0,
+        size=upload.size,
+        expires_at=datetime.fromtimestamp(expires_at, timezone.utc),
+    )
+
+
+@router.head("/{menu_id}/uploads/{upload_id}")
+async def get_resumable_upload_offset(menu_id: str, upload_id: str, user_id: CurrentUser) -> Response:
+    """
+    Report how many bytes of an upload the server has (Upload-Offset).
+    
+    Raises:
+        HTTPException: 404 if the upload does not exist or has expired
+    """
+    upload = await _get_upload(menu_id, upload_id, user_id)
+    return Response(headers=_upload_headers(upload, upload.offset))
+
+
+@router.patch("/{menu_id}/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def append_resumable_upload(
+    menu_id: str,
+    upload_id: str,
+    user_id: CurrentUser,
+    request: Request,
+    upload_offset: Annotated[int, Header(ge=0)],
+    content_type: Annotated[str | None, Header()] = None,
+) -> Response:
+    """
+    Append a chunk (the raw request body) at Upload-Offset.
+    
+    The body is written to the staging file as it arrives, so if the
+    connection drops, the bytes received until then are kept and the
+    client resumes from the offset HEAD reports. Once the first bytes are
+    in, they are checked like any upload and a session that is not a
+    supported image is dropped.
+    
+    Raises:
+        HTTPException: 400 if the content is not a valid image (session dropped)
+        HTTPException: 404 if the upload does not exist or has expired
+        HTTPException: 409 if Upload-Offset is not the current offset (the
+            response carries the current one) or another chunk is in flight
+        HTTPException: 413 if the body goes past the declared size
+        HTTPException: 415 if the body is not application/offset+octet-stream
+    """
+    if content_type != CHUNK_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Chunks must be sent as {CHUNK_CONTENT_TYPE}"
+        )
+    upload = await _get_upload(menu_id, upload_id, user_id)
+    
+    try:
+        offset = await append_chunk(upload, upload_offset, request.stream())
+    except UploadOffsetMismatchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload is at offset {e.offset}",
+            headers={"Upload-Offset": str(e.offset)},
+        )
+    except UploadSessionBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another chunk of this upload is in progress"
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+            headers={"Upload-Offset": str(upload.size)},
+        )
+    except ClientDisconnect:
+        logger.info(f"Client disconnected during upload {upload_id}", extra={"menu_id": menu_id})
+        return Response(status_code=status.HTTP_400_BAD_REQUEST)
+    
+    # Reject junk as soon as the header is in, not after the whole file
+    sniff_at = min(SNIFF_BYTES, upload.size)
+    if upload.offset < sniff_at <= offset:
+        try:
+            _check_upload_content(upload, await read_head(upload, SNIFF_BYTES))
+        except HTTPException:
+            await delete_session(user_id, upload_id)
+            raise
+    
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers=_upload_headers(upload, offset),
+    )
+
+
+@router.post("/{menu_id}/uploads/{upload_id}/complete", response_model=ImageUploadResponse)
+async def complete_resumable_upload(
+    menu_id: str,
+    upload_id: str,
+    user_id: CurrentUser,
+) -> ImageUploadResponse:
+    """
+    Finalize a fully received upload into the menu's images.
+    
+    The staged file is validated and hashed in one pass, then streamed to
+    its content-addressed path (skipped if the menu or storage already has
+    it), indexed, and its derivatives scheduled, exactly as a regular
+    upload. The session is removed on success; after a storage error it
+    is kept, so completing again does not need the bytes re-sent.
+    
+    Raises:
+        HTTPException: 400 if the content is not a valid image (session dropped)
+        HTTPException: 404 if the menu or upload does not exist
+        HTTPException: 409 if bytes are still missing (Upload-Offset tells
+            how many arrived) or a chunk is in flight
+        HTTPException: 500 for storage errors
+        CircuitOpenError: If storage is failing (answered with 503)
+    """
+    await _require_owned_menu(menu_id, user_id)
+    upload = await _get_upload(menu_id, upload_id, user_id)
+    if upload.offset != upload.size:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload is incomplete: {upload.offset} of {upload.size} bytes received",
+            headers={"Upload-Offset": str(upload.offset)},
+        )
+    
+    try:
+        async with locked_upload(upload) as staged:
+            content_hash, head = await hash_staged(staged, SNIFF_BYTES)
+            try:
+                info = _check_upload_content(upload, head)
+            except HTTPException:
+                await delete_session(user_id, upload_id)
+                raise
+            
+            known = await images_repo.find_menu_images(menu_id, [content_hash])
+            stored = []
+            if content_hash not in known:
+                path = content_path(menu_id, content_hash, info.extension)
+                created = not await object_exists(path)
+                if created:
+                    async with _get_transfer_slots():
+                        await upload_file(menu_id, iter_staged(staged), info.extension, content_hash)
+                stored.append(_StoredFile(path=path, content_hash=content_hash, created=created))
+            records = await _index_images(menu_id, stored, known)
+    except UploadSessionBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another chunk of this upload is in progress"
+        )
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise  # 503 with Retry-After, from the app's handler
     except StorageConfigError as e:
         logger.error(f"Storage configuration error: {e}")
         raise HTTPException(
@@ -215,12 +1066,47 @@ async def upload_images(
             detail="Storage service is not configured. Please contact support."
         )
     except Exception as e:
-        logger.error(f"Storage upload failed: {e}")
+        logger.error(f"Completing upload {upload_id} failed: {e}", extra={"menu_id": menu_id})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to upload images. Please try again."
+            detail="Failed to store the upload. Please try completing it again."
         )
     
-    logger.info(f"Upload successful: menu_id={menu_id}, uploaded={len(results)} images")
+    await delete_session(user_id, upload_id)
+    logger.info(
+        f"Completed resumable upload {upload_id} for menu_id={menu_id}",
+        extra={"menu_id": menu_id, "bytes": upload.size, "uploaded": sum(s.created for s in stored)},
+    )
+    return ImageUploadResponse(
+        images=_ordered_results(menu_id, [(content_hash, info.extension)], records)
+    )
+
+
+@router.delete("/{menu_id}/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_resumable_upload(menu_id: str, upload_id: str, user_id: CurrentUser) -> Response:
+    """
+    Abandon an upload and discard its staged bytes.
+    
+    Raises:
+        HTTPException: 404 if the upload does not exist or has expired
+    """
+    await _get_upload(menu_id, upload_id, user_id)
+    await delete_session(user_id, upload_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/{menu_id}/images", response_model=ImageUploadResponse)
+async def list_images(menu_id: str, user_id: CurrentUser) -> ImageUploadResponse:
+    """
+    List a menu's images with their derivative URLs.
     
-    return ImageUploadResponse(images=results)
+    Derivatives appear once generated (derivatives_status == "ready"); until
+    then clients should fall back to the original URL.
+    
+    Raises:
+        HTTPException: 404 if menu not found or not owned by the user
+    """
+    await _require_owned_menu(menu_id, user_id)
+    
+    images = await images_repo.list_menu_images(menu_id)
+    return ImageUploadResponse(images=[_to_upload_result(image) for image in images])
@@ -0,0 +1,58 @@
+"""
+Phase-7: Job status endpoint.
+Clients poll a job created by POST /api/menus until it finishes.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel
+
+from app.auth.dependencies import CurrentUser
+from app.db import jobs as jobs_repo
+
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+class JobResponse(BaseModel):
+    """Job state as reported to the owner."""
+    id: str
+    menu_id: str
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    stage: str | None
+    progress: int  # 0-100
+    result: dict[str, Any] | None
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, user_id: CurrentUser) -> JobResponse:
+    """
+    Get the status of a background job.
+    
+    Requires authentication. Only the owner can see their job.
+    """
+    job = await jobs_repo.get_owned_job(job_id, user_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    return JobResponse(
+        id=job["id"],
+        menu_id=job["menu_id"],
+        kind=job["kind"],
+        status=job["status"],
+        stage=job["stage"],
+        progress=job["progress"],
+        result=job["result"],
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+    )
@@ -1,13 +1,35 @@
 """
 Phase-2: Menu API routes with ownership enforcement.
 All routes require authentication and enforce owner_id checks.
+Phase-5: Backed by the menus table; ownership is part of every query.
+Writes use the menu version as ETag for optimistic concurrency (If-Match).
 """
 
-from fastapi import APIRouter, HTTPException, status
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Body, File, Header, HTTPException, Query, Response, UploadFile, status
 from pydantic import BaseModel
 
+from app.api.images import store_menu_images
 from app.auth.dependencies import CurrentUser
+from app.db import menus as menus_repo
+from app.db.menus import (
+    MenuRecord,
+    MenuSummaryRecord,
+    PatchNotApplicableError,
+    VersionConflictError,
+)
+from app.db import images as images_repo
+from app.jobs import JobImage, JobQueueFullError, enqueue_ocr_job, ensure_capacity
 from app.logging import logger
+from app.publishing import public_menu_url, refresh_public_menu, sync_public_menu
+from app.storage import content_hash_of
+from app.schemas import validate_menu_data
+from app.schemas.patch import JsonPatchOperation, PatchValidationError, compile_patch
 
 
 router = APIRouter(prefix="/api/menus", tags=["menus"])
@@ -21,109 +43,426 @@ class MenuBase(BaseModel):
     owner_id: str
     name: str
     status: str  # draft, published
+    version: int
+    data: dict[str, Any]
+
+
+class MenuJobAccepted(BaseModel):
+    """Response of menu creation and OCR re-runs: the job to poll and its menu."""
+    job_id: str
+    menu_id: str
+
+
+class OCRRerunRequest(BaseModel):
+    """Pages to re-read, in order; defaults to all menu images in upload order."""
+    image_paths: list[str] | None = None
+
+
+class MenuPatchResult(BaseModel):
+    """Compact response for PATCH: the new version only, not the document."""
+    id: str
+    version: int
+
+
+class MenuSummary(BaseModel):
+    """Menu summary for list responses (no menu content)."""
+    id: str
+    title: str
+    status: str  # draft, published
+    updated_at: datetime
+
+
+class MenuListResponse(BaseModel):
+    """One page of the current user's menus."""
+    items: list[MenuSummary]
+    next_cursor: str | None = None
 
 
 class MenuUpdate(BaseModel):
-    """Model for menu update requests."""
+    """
+    Model for menu update requests.
+    
+    `data` replaces the whole menu document and must validate against
+    menu schema v1; `name` sets data.title.
+    """
     name: str | None = None
+    data: dict[str, Any] | None = None
 
 
-# --- In-memory mock storage (placeholder until database is implemented) ---
-# This simulates ownership for Phase-2 testing only
+class PublishResponse(BaseModel):
+    """Response from the publish endpoint."""
+    public_url: str
 
-_mock_menus: dict[str, dict] = {
-    "menu-1": {
-        "id": "menu-1",
-        "owner_id": "placeholder-owner",  # Will be replaced by real user_id in tests
-        "name": "Test Menu",
-        "status": "draft",
-    }
-}
 
+# --- Helpers ---
+
+def _to_menu_base(menu: MenuRecord) -> MenuBase:
+    """Map a menus row to the API response model."""
+    return MenuBase(
+        id=menu["id"],
+        owner_id=menu["user_id"],
+        name=menu["data"].get("title", ""),
+        status="published" if menu["is_published"] else "draft",
+        version=menu["version"],
+        data=menu["data"],
+    )
 
-def _get_menu_or_404(menu_id: str) -> dict:
-    """Get menu from mock storage or raise 404."""
-    menu = _mock_menus.get(menu_id)
-    if not menu:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Menu not found"
-        )
-    return menu
 
+def _etag(version: int) -> str:
+    """ETag of a menu version."""
+    return f'"v{version}"'
 
-def _enforce_ownership(menu: dict, user_id: str) -> None:
+
+def _parse_if_match(if_match: str | None) -> int | None:
     """
-    Enforce that the current user owns the menu.
+    Extract the expected version from an If-Match header.
     
-    Raises:
-        HTTPException: 403 if user_id does not match menu.owner_id
+    Returns:
+        The version, None if the header is absent, or -1 if it is not one of
+        our ETags (which can never match, so the write is rejected as stale)
     """
-    # DEVELOPMENT ONLY: Auto-assign mock menu to current user
-    if menu["owner_id"] == "placeholder-owner":
-        menu["owner_id"] = user_id
-        logger.info(f"DEVELOPMENT: Auto-assigned {menu['id']} ownership to {user_id}")
-        return
+    if if_match is None:
+        return None
+    tag = if_match.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    if tag.startswith("v") and tag[1:].isdigit():
+        return int(tag[1:])
+    return -1
 
-    if menu["owner_id"] != user_id:
-        logger.warning(
-            f"Ownership violation: user {user_id[:8]}... attempted to access menu owned by {menu['owner_id'][:8]}..."
-        )
+
+def _version_conflict(e: VersionConflictError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Menu was modified by another request. Reload and try again.",
+        headers={"ETag": _etag(e.current_version)},
+    )
+
+
+def _encode_cursor(menu: MenuSummaryRecord) -> str:
+    """Opaque cursor pointing just after the given row."""
+    raw = json.dumps([menu["updated_at"].isoformat(), menu["id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Decode a cursor produced by _encode_cursor.
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, menu_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(updated_at), str(menu_id)
+    except (binascii.Error, ValueError, TypeError):
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to access this menu"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
 
 
+def _job_queue_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Menu processing is busy. Please try again shortly.",
+        headers={"Retry-After": "30"},
+    )
+
+
+def _menu_not_found() -> HTTPException:
+    """
+    404 for menus that do not exist or are not owned by the caller.
+    
+    The two cases are deliberately indistinguishable so menu IDs of other
+    users are not disclosed.
+    """
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Menu not found"
+    )
+
+
+# Data of a freshly created menu until its OCR job fills it in
+_EMPTY_MENU_DATA: dict[str, Any] = {"schema_version": 1, "categories": []}
+
+
 # --- Routes ---
 
+@router.post("/", response_model=MenuJobAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def create_menu(
+    user_id: CurrentUser,
+    files: Annotated[list[UploadFile], File(description="Menu page images")],
+) -> MenuJobAccepted:
+    """
+    Create a draft menu from images.
+    
+    Requires authentication. Stores the images (same validation as image
+    upload) and queues an OCR + parse job; returns 202 right away. Poll
+    GET /api/jobs/{job_id} for progress; on success the menu's data holds
+    the parsed menu.
+    
+    Raises:
+        HTTPException: 400 for invalid files
+        HTTPException: 503 if too many jobs are waiting
+    """
+    try:
+        ensure_capacity()
+    except JobQueueFullError:
+        raise _job_queue_busy()
+    
+    menu = await menus_repo.create_menu(user_id, _EMPTY_MENU_DATA)
+    if menu is None:
+        raise _menu_not_found()
+    menu_id = menu["id"]
+    
+    try:
+        images = await store_menu_images(menu_id, files)
+        job = await enqueue_ocr_job(
+            menu_id,
+            user_id,
+            [JobImage(path=image.path, content_hash=content_hash_of(image.path)) for image in images],
+            expected_version=menu["version"],
+        )
+    except Exception:
+        # No half-created menus: the draft goes away with its failed upload
+        await menus_repo.delete_menu(menu_id, user_id)
+        raise
+    
+    logger.info(f"Menu {menu_id} created by user {user_id[:8]}...: job {job['id']}")
+    
+    return MenuJobAccepted(job_id=job["id"], menu_id=menu_id)
+
+
 @router.get("/{menu_id}", response_model=MenuBase)
-async def get_menu(menu_id: str, user_id: CurrentUser) -> MenuBase:
+async def get_menu(menu_id: str, user_id: CurrentUser, response: Response) -> MenuBase:
     """
     Get a menu by ID.
     
     Requires authentication. Only the owner can access their menu.
+    The ETag header carries the menu version for later If-Match writes.
     """
-    menu = _get_menu_or_404(menu_id)
-    _enforce_ownership(menu, user_id)
+    menu = await menus_repo.get_owned_menu(menu_id, user_id)
+    if menu is None:
+        raise _menu_not_found()
     
-    return MenuBase(**menu)
+    response.headers["ETag"] = _etag(menu["version"])
+    return _to_menu_base(menu)
 
 
 @router.put("/{menu_id}", response_model=MenuBase)
 async def update_menu(
     menu_id: str,
     update: MenuUpdate,
-    user_id: CurrentUser
+    user_id: CurrentUser,
+    response: Response,
+    if_match: Annotated[str | None, Header()] = None,
 ) -> MenuBase:
     """
     Update a menu.
     
     Requires authentication. Only the owner can update their menu.
+    Menu data is validated against schema v1 by the precompiled validator;
+    violations return 422 with a JSON Pointer path per error.
+    With If-Match, a stale version is rejected with 409.
     """
-    menu = _get_menu_or_404(menu_id)
-    _enforce_ownership(menu, user_id)
+    expected_version = _parse_if_match(if_match)
+    
+    try:
+        if update.data is not None:
+            data = dict(update.data)
+            if update.name is not None:
+                data["title"] = update.name
+            
+            issues = validate_menu_data(data)
+            if issues:
+                logger.info(f"Menu {menu_id} update rejected: {len(issues)} schema error(s)")
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=issues
+                )
+            menu = await menus_repo.replace_menu_data(menu_id, user_id, data, expected_version)
+        elif update.name is not None:
+            menu = await menus_repo.update_menu_title(menu_id, user_id, update.name, expected_version)
+        else:
+            menu = await menus_repo.get_owned_menu(menu_id, user_id)
+    except VersionConflictError as e:
+        raise _version_conflict(e)
+    
+    if menu is None:
+        raise _menu_not_found()
     
-    # Apply updates
-    if update.name is not None:
-        menu["name"] = update.name
+    await sync_public_menu(menu)
     
     logger.info(f"Menu {menu_id} updated by user {user_id[:8]}...")
     
-    return MenuBase(**menu)
+    response.headers["ETag"] = _etag(menu["version"])
+    return _to_menu_base(menu)
+
+
+@router.patch("/{menu_id}", response_model=MenuPatchResult)
+async def patch_menu(
+    menu_id: str,
+    operations: Annotated[list[JsonPatchOperation], Body()],
+    user_id: CurrentUser,
+    response: Response,
+    if_match: Annotated[str | None, Header()] = None,
+) -> MenuPatchResult:
+    """
+    Partially update menu data with RFC 6902 JSON Patch operations.
+    
+    Requires authentication and If-Match with the menu's current ETag.
+    Only the values at the touched paths are validated against schema v1,
+    and the patch is applied inside Postgres, so neither request nor
+    response carries the whole document.
+    
+    Raises:
+        HTTPException: 404 if menu not found or not owned by the user
+        HTTPException: 409 if If-Match is stale, a test fails or a path is missing
+        HTTPException: 422 if an operation is malformed or violates the schema
+        HTTPException: 428 if If-Match is missing
+    """
+    expected_version = _parse_if_match(if_match)
+    if expected_version is None:
+        raise HTTPException(
+            status_code=status.HTTP_428_PRECONDITION_REQUIRED,
+            detail="If-Match header with the menu ETag is required"
+        )
+    
+    try:
+        steps = compile_patch(operations)
+    except PatchValidationError as e:
+        logger.info(f"Menu {menu_id} patch rejected: {len(e.issues)} error(s)")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.issues
+        )
+    
+    try:
+        menu = await menus_repo.apply_menu_patch(menu_id, user_id, expected_version, steps)
+    except VersionConflictError as e:
+        raise _version_conflict(e)
+    except PatchNotApplicableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    
+    if menu is None:
+        raise _menu_not_found()
+    
+    await sync_public_menu(menu)
+    
+    logger.info(f"Menu {menu_id} patched by user {user_id[:8]}...: {len(steps)} operation(s)")
+    
+    response.headers["ETag"] = _etag(menu["version"])
+    return MenuPatchResult(id=menu["id"], version=menu["version"])
 
 
-@router.get("/", response_model=list[MenuBase])
-async def list_user_menus(user_id: CurrentUser) -> list[MenuBase]:
+@router.post("/{menu_id}/ocr", response_model=MenuJobAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def rerun_menu_ocr(
+    menu_id: str,
+    user_id: CurrentUser,
+    request: OCRRerunRequest | None = None,
+) -> MenuJobAccepted:
     """
-    List all menus owned by the current user.
+    Re-read a menu from its images after pages were added or replaced.
+    
+    Requires authentication. Only pages whose OCR text or parse is not
+    cached yet are processed; the rest come from the cache and all pages
+    are merged again. The result replaces the menu data unless the menu is
+    edited before the job finishes.
+    
+    Raises:
+        HTTPException: 400 if an image path does not belong to the menu
+        HTTPException: 404 if menu not found or not owned by the user
+        HTTPException: 503 if too many jobs are waiting
+    """
+    menu = await menus_repo.get_owned_menu(menu_id, user_id)
+    if menu is None:
+        raise _menu_not_found()
+    
+    known = {image["path"]: image for image in await images_repo.list_menu_images(menu_id)}
+    paths = request.image_paths if request and request.image_paths is not None else list(known)
+    
+    unknown = [path for path in paths if path not in known]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Not an image of this menu: {unknown[0]}"
+        )
+    if not paths:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Menu has no images"
+        )
+    
+    try:
+        job = await enqueue_ocr_job(
+            menu_id,
+            user_id,
+            [JobImage(path=path, content_hash=content_hash_of(path)) for path in paths],
+            expected_version=menu["version"],
+        )
+    except JobQueueFullError:
+        raise _job_queue_busy()
+    
+    logger.info(f"OCR re-run for menu {menu_id} queued: job {job['id']}, pages={len(paths)}")
+    
+    return MenuJobAccepted(job_id=job["id"], menu_id=menu_id)
+
+
+@router.post("/{menu_id}/publish", response_model=PublishResponse)
+async def publish_menu(menu_id: str, user_id: CurrentUser) -> PublishResponse:
+    """
+    Publish a menu.
+    
+    Requires authentication. Only the owner can publish, and only through
+    this explicit action. Renders the public snapshot (JSON, gzip, brotli)
+    once here so public reads never serialize or compress.
+    """
+    menu = await menus_repo.publish_menu(menu_id, user_id)
+    if menu is None:
+        raise _menu_not_found()
+    
+    await refresh_public_menu(menu_id, menu["version"], menu["data"])
+    
+    logger.info(f"Menu {menu_id} published by user {user_id[:8]}...")
+    
+    return PublishResponse(public_url=public_menu_url(menu_id))
+
+
+@router.get("/", response_model=MenuListResponse)
+async def list_user_menus(
+    user_id: CurrentUser,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: str | None = None,
+) -> MenuListResponse:
+    """
+    List menus owned by the current user, most recently updated first.
     
     Requires authentication. Returns only menus where owner_id matches user_id.
+    Keyset-paginated: pass `next_cursor` from a response as `cursor` to get
+    the next page; `next_cursor` is null on the last page.
     """
-    user_menus = [
-        MenuBase(**menu)
-        for menu in _mock_menus.values()
-        if menu["owner_id"] == user_id
-    ]
+    after = _decode_cursor(cursor) if cursor else None
+    
+    # Fetch one extra row to know whether another page exists
+    menus = await menus_repo.list_owned_menu_summaries(user_id, limit + 1, after)
+    has_more = len(menus) > limit
+    menus = menus[:limit]
     
-    return user_menus
+    return MenuListResponse(
+        items=[
+            MenuSummary(
+                id=menu["id"],
+                title=menu["title"] or "",
+                status="published" if menu["is_published"] else "draft",
+                updated_at=menu["updated_at"],
+            )
+            for menu in menus
+        ],
+        next_cursor=_encode_cursor(menus[-1]) if has_more else None,
+    )
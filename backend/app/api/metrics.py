@@ -0,0 +1,16 @@
+"""
+Prometheus scrape endpoint.
+Serves the default registry in the text exposition format. Not under /api
+and not in the OpenAPI schema: it is for the scraper, not for clients.
+"""
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Current metric values (Prometheus text format)."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
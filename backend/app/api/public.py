@@ -0,0 +1,150 @@
+"""
+Phase-6: Public menu endpoint (customer QR scans).
+No authentication. Serves only published menus from precompressed
+snapshots written at publish time, cached in-process, with strong ETags,
+so repeat scans cost no database round-trip, no serialization and no
+compression; revalidations are answered with 304.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+
+from app.cache import public_menus
+from app.config import get_settings
+from app.db import menus as menus_repo
+from app.logging import logger
+from app.publishing import MenuSnapshot, read_snapshot, render_snapshot
+from app.storage.supabase import StorageConfigError
+
+
+router = APIRouter(prefix="/api/public/menus", tags=["public"])
+
+
+# Preferred content-codings, best first
+_ENCODING_PREFERENCE = ("br", "gzip")
+
+
+def _choose_encoding(accept_encoding: str | None, available: dict[str, bytes]) -> str:
+    """Pick the best precompressed variant the client accepts."""
+    if not accept_encoding:
+        return "identity"
+    
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qualities[token.strip().lower()] = q
+    
+    for encoding in _ENCODING_PREFERENCE:
+        q = qualities.get(encoding, qualities.get("*", 0.0))
+        if encoding in available and q > 0:
+            return encoding
+    return "identity"
+
+
+def _etag_for(snapshot: MenuSnapshot, encoding: str) -> str:
+    """Strong ETag per representation (each content-coding differs)."""
+    if encoding == "identity":
+        return f'"{snapshot.etag}"'
+    return f'"{snapshot.etag}-{encoding}"'
+
+
+def _etag_matches(if_none_match: str | None, snapshot: MenuSnapshot) -> bool:
+    """
+    Weak comparison of If-None-Match against any variant of the snapshot.
+    
+    A client revalidating one coding of the current version gets a 304
+    regardless of which coding we would pick now.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        tag = candidate.strip('"')
+        if tag == snapshot.etag or tag.startswith(f"{snapshot.etag}-"):
+            return True
+    return False
+
+
+async def _load_public_menu(menu_id: str) -> MenuSnapshot | None:
+    """
+    Load a published menu's snapshot on a cache miss.
+    
+    The published version comes from the database first, so unknown or
+    unpublished menus cost one query and no Storage reads, and only the
+    current version's snapshot is ever served. Versions without a stored
+    snapshot (e.g. storage unavailable at publish time, or a write still
+    in flight) are rendered from the database instead.
+    """
+    version = await menus_repo.get_published_version(menu_id)
+    if version is None:
+        return None
+    
+    try:
+        snapshot = await read_snapshot(menu_id, version)
+        if snapshot is not None:
+            return snapshot
+    except StorageConfigError:
+        pass
+    except Exception as e:
+        logger.warning(f"Public snapshot read failed for menu {menu_id}: {e}")
+    
+    data = await menus_repo.get_published_menu_data(menu_id)
+    if data is None:
+        return None
+    return await asyncio.to_thread(render_snapshot, data)
+
+
+@router.get("/{menu_id}")
+async def get_public_menu(menu_id: str, request: Request) -> Response:
+    """
+    Get a published menu's data.
+    
+    Returns the menu JSON (schema v1), brotli- or gzip-encoded according to
+    Accept-Encoding, with ETag, Vary and Cache-Control headers, or 304 if
+    If-None-Match matches the current version.
+    
+    Raises:
+        HTTPException: 404 if the menu does not exist or is not published
+    """
+    if not menus_repo.is_valid_id(menu_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Menu not found"
+        )
+    
+    snapshot = await public_menus.get_or_load(menu_id, lambda: _load_public_menu(menu_id))
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Menu not found"
+        )
+    
+    encoding = _choose_encoding(request.headers.get("accept-encoding"), snapshot.variants)
+    headers = {
+        "ETag": _etag_for(snapshot, encoding),
+        "Vary": "Accept-Encoding",
+        "Cache-Control": f"public, max-age={get_settings().PUBLIC_MENU_MAX_AGE_SECONDS}",
+    }
+    
+    if _etag_matches(request.headers.get("if-none-match"), snapshot):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=snapshot.variants[encoding],
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,133 @@
+"""
+QR code endpoints.
+Per SPECS, QR codes exist only for published menus; they encode the
+menu's public URL.
+"""
+
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from app.auth.dependencies import CurrentUser
+from app.config import get_settings
+from app.db import menus as menus_repo
+from app.logging import logger
+from app.qr import QRFormat, QROptions
+from app.qr.service import get_menu_qr, sheet_items, stream_sheets_zip
+
+
+router = APIRouter(prefix="/api", tags=["qr"])
+
+
+HexColor = Annotated[str, Field(pattern=r"^#[0-9a-fA-F]{6}$")]
+
+_MEDIA_TYPES = {"svg": "image/svg+xml", "png": "image/png"}
+
+
+class QRExportRequest(BaseModel):
+    """Bulk export of printable table cards."""
+    menu_ids: list[str] = Field(min_length=1)
+    format: QRFormat = "svg"
+    scale: int = Field(default=10, ge=1, le=40)
+    border: int = Field(default=4, ge=0, le=10)
+    dark: HexColor = "#000000"
+    light: HexColor | None = "#ffffff"
+
+
+@router.get("/menus/{menu_id}/qr")
+async def get_qr(
+    menu_id: str,
+    user_id: CurrentUser,
+    format: QRFormat = "svg",
+    scale: Annotated[int, Query(ge=1, le=40)] = 10,
+    border: Annotated[int, Query(ge=0, le=10)] = 4,
+    dark: Annotated[str, Query(pattern=r"^#[0-9a-fA-F]{6}$")] = "#000000",
+    light: Annotated[str | None, Query(pattern=r"^#[0-9a-fA-F]{6}$")] = "#ffffff",
+    transparent: bool = False,
+) -> Response:
+    """
+    QR code for a published menu's public URL (SVG or PNG).
+    
+    Requires authentication. Only the owner can fetch it. Renders are
+    memoized on disk by URL and options, so repeated requests are file reads.
+    
+    Raises:
+        HTTPException: 404 if menu not found or not owned by the user
+        HTTPException: 409 if the menu is not published
+    """
+    menu = await menus_repo.get_owned_menu(menu_id, user_id)
+    if menu is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Menu not found"
+        )
+    if not menu["is_published"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="QR codes are only available for published menus"
+        )
+    
+    options = QROptions(
+        format=format,
+        scale=scale,
+        border=border,
+        dark=dark,
+        light=None if transparent else light,
+    )
+    content = await get_menu_qr(menu["id"], options)
+    
+    return Response(
+        content=content,
+        media_type=_MEDIA_TYPES[format],
+        headers={
+            "Cache-Control": "private, max-age=86400",
+            "Content-Disposition": f'inline; filename="menu-{menu["id"][:8]}.{format}"',
+        },
+    )
+
+
+@router.post("/qr/export")
+async def export_qr_codes(request: QRExportRequest, user_id: CurrentUser) -> StreamingResponse:
+    """
+    Bulk export of QR codes as a ZIP, for printing table cards.
+    
+    Requires authentication. SVG exports are printable A6 cards (title, QR,
+    URL); PNG exports are bare QR codes. Rendering runs in parallel on the
+    worker pool and the ZIP streams while it progresses.
+    
+    Raises:
+        HTTPException: 400 if too many menus are requested
+        HTTPException: 404 if any menu is missing, not owned or not published
+    """
+    max_menus = get_settings().QR_EXPORT_MAX_MENUS
+    menu_ids = list(dict.fromkeys(request.menu_ids))
+    if len(menu_ids) > max_menus:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many menus. Maximum: {max_menus}"
+        )
+    
+    titles = await menus_repo.list_owned_published_titles(user_id, menu_ids)
+    missing = [menu_id for menu_id in menu_ids if menu_id not in titles]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Published menu not found: {missing[0]}"
+        )
+    
+    options = QROptions(
+        format=request.format,
+        scale=request.scale,
+        border=request.border,
+        dark=request.dark,
+        light=request.light,
+    )
+    logger.info(f"QR export requested by user {user_id[:8]}...: menus={len(menu_ids)}, format={request.format}")
+    
+    return StreamingResponse(
+        stream_sheets_zip(sheet_items(titles), options),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="menu-qr-codes.zip"'},
+    )
@@ -4,6 +4,6 @@ Provides JWT verification and user identity extraction.
 """
 
 from app.auth.dependencies import get_current_user
-from app.auth.jwt import verify_supabase_jwt
+from app.auth.jwt import get_token_cache_stats, verify_supabase_jwt
 
-__all__ = ["get_current_user", "verify_supabase_jwt"]
+__all__ = ["get_current_user", "get_token_cache_stats", "verify_supabase_jwt"]
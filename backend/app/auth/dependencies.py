@@ -9,6 +9,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.auth.jwt import verify_supabase_jwt
+from app.logging import user_var
 
 
 # HTTP Bearer token extractor
@@ -33,7 +34,7 @@ async def get_current_user(
     token = credentials.credentials
     
     # Verify the JWT and get payload
-    payload = verify_supabase_jwt(token)
+    payload = await verify_supabase_jwt(token)
     
     # Extract user ID from 'sub' claim
     user_id = payload.get("sub")
@@ -44,6 +45,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Log lines for the rest of the request carry the user prefix
+    user_var.set(user_id[:8])
     return user_id
 
 
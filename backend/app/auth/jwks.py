@@ -0,0 +1,183 @@
+"""
+Phase-2: Async JWKS key store for asymmetric (RS256/ES256) JWT verification.
+Keys are indexed by kid, prefetched at startup and refreshed in the
+background. Fetches never block the event loop, and a failed refresh keeps
+serving the last known-good keys. With an outbound policy, fetches are
+retried within a timeout budget and skipped while the JWKS circuit is open.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable
+
+import httpx
+import jwt
+from jwt import PyJWK
+
+from app.logging import logger
+from app.resilience import CircuitOpenError, OutboundPolicy
+
+
+class JWKSUnavailableError(Exception):
+    """Raised when no keys could ever be loaded from the JWKS endpoint."""
+    pass
+
+
+class JWKSKeyStore:
+    """
+    In-memory JWKS keyed by kid.
+    
+    - start(): prefetch once and launch the periodic refresh task
+    - get_signing_key(kid): served from memory; an unknown kid triggers a
+      single-flight refetch (all concurrent callers share one request),
+      rate-limited by min_refetch_interval
+    - on_rotate: called whenever the set of kids changes
+    - policy: optional retry/circuit-breaker policy for fetches, each
+      bounded by fetch_timeout
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        refresh_interval: float,
+        min_refetch_interval: float,
+        on_rotate: Callable[[], None] | None = None,
+        policy: OutboundPolicy | None = None,
+        fetch_timeout: float = 5.0,
+    ) -> None:
+        self.jwks_url = jwks_url
+        self.refresh_interval = refresh_interval
+        self.min_refetch_interval = min_refetch_interval
+        self.on_rotate = on_rotate
+        self.policy = policy
+        self.fetch_timeout = fetch_timeout
+        self._keys: dict[str, PyJWK] = {}
+        self._loaded = False
+        self._last_attempt: float | None = None
+        self._inflight: asyncio.Task[bool] | None = None
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(self.fetch_timeout))
+        return self._client
+
+    async def start(self) -> None:
+        """Prefetch keys and start background refresh. Never raises."""
+        await self.refresh()
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        """Stop background refresh and close the HTTP client."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            # Retry sooner while the store has never loaded successfully
+            delay = self.refresh_interval if self._loaded else self.min_refetch_interval
+            await asyncio.sleep(delay)
+            await self.refresh()
+
+    async def refresh(self) -> bool:
+        """
+        Refetch the key set, sharing one in-flight request between callers.
+        
+        Returns:
+            True if the fetch succeeded, False if it failed (old keys kept)
+        """
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._fetch())
+            self._inflight.add_done_callback(self._clear_inflight)
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, _task: asyncio.Task[bool]) -> None:
+        self._inflight = None
+
+    async def _fetch(self) -> bool:
+        self._last_attempt = time.monotonic()
+        try:
+            if self.policy is None:
+                response = await self._get_client().get(self.jwks_url)
+            else:
+                response = await self.policy.request(
+                    lambda: self._get_client().get(self.jwks_url), budget=self.fetch_timeout
+                )
+            response.raise_for_status()
+            keys = self._parse(response.json())
+        except CircuitOpenError as e:
+            logger.warning(f"JWKS refresh skipped, keeping {len(self._keys)} known key(s): {e}")
+            return False
+        except (httpx.HTTPError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"JWKS refresh failed, keeping {len(self._keys)} known key(s): {e}")
+            return False
+        
+        if not keys:
+            logger.error("JWKS refresh returned no usable signing keys; keeping previous keys")
+            return False
+        
+        rotated = self._loaded and keys.keys() != self._keys.keys()
+        self._keys = keys
+        self._loaded = True
+        logger.info(f"JWKS loaded: {len(keys)} key(s)")
+        
+        if rotated and self.on_rotate is not None:
+            logger.info("JWKS keys rotated")
+            self.on_rotate()
+        return True
+
+    @staticmethod
+    def _parse(data: Any) -> dict[str, PyJWK]:
+        """Build a kid -> PyJWK map, skipping keys that are malformed or cannot sign."""
+        keys: dict[str, PyJWK] = {}
+        entries = data.get("keys") if isinstance(data, dict) else None
+        for jwk in entries if isinstance(entries, list) else []:
+            if not isinstance(jwk, dict):
+                logger.warning(f"Skipping malformed JWKS entry: {type(jwk).__name__}")
+                continue
+            kid = jwk.get("kid")
+            if not isinstance(kid, str) or not kid or jwk.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[kid] = PyJWK(jwk)
+            except jwt.PyJWTError as e:
+                logger.warning(f"Skipping unusable JWKS key {kid}: {e}")
+        return keys
+
+    async def get_signing_key(self, kid: str) -> PyJWK:
+        """
+        Return the key for kid, refetching once if it is unknown.
+        
+        Raises:
+            jwt.InvalidTokenError: If kid is still unknown after a refetch
+            JWKSUnavailableError: If no keys have ever been loaded
+        """
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        
+        # Unknown kid: join an in-flight fetch, or start one unless the last
+        # attempt was less than min_refetch_interval ago
+        if (
+            self._inflight is not None
+            or self._last_attempt is None
+            or time.monotonic() - self._last_attempt >= self.min_refetch_interval
+        ):
+            await self.refresh()
+            key = self._keys.get(kid)
+            if key is not None:
+                return key
+        
+        if not self._loaded:
+            raise JWKSUnavailableError("JWKS could not be loaded")
+        raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
@@ -1,22 +1,39 @@
 """
 Phase-2: JWT verification using Supabase JWKS or JWT Secret.
 Supports both RS256 (default) and HS256 (legacy/secret) algorithms.
+Verified payloads are cached per token until the token expires.
 """
 
+import hashlib
 import os
+import time
 from typing import Any
 from functools import lru_cache
 
-import httpx
 import jwt
-from jwt import PyJWKClient
 from fastapi import HTTPException, status
 
+from app.auth.jwks import JWKSKeyStore, JWKSUnavailableError
+from app.cache import CacheStats, LRUCache
+from app.config import get_settings
 from app.logging import logger
+from app.metrics import ADMISSION_REJECTIONS, JWT_VERIFY_DURATION
+from app.resilience import get_policy
 
 
-# Cache the JWKS client to avoid repeated fetches
-_jwks_client: PyJWKClient | None = None
+# Verified payloads keyed by SHA-256 of the raw token
+_token_cache: LRUCache[bytes, dict[str, Any]] = LRUCache(
+    max_entries=get_settings().JWT_CACHE_MAX_ENTRIES
+)
+
+
+# Uncached verifications in progress (they may wait on a JWKS fetch)
+_pending_verifications = 0
+
+
+def get_token_cache_stats() -> CacheStats:
+    """Return hit/miss counters of the verified-token cache."""
+    return _token_cache.stats()
 
 
 def _get_supabase_url() -> str:
@@ -27,12 +44,50 @@ def _get_supabase_url() -> str:
     return url
 
 
+def _on_keys_rotated() -> None:
+    """Drop cached payloads that may have been signed by a retired key."""
+    logger.info(f"Dropping {len(_token_cache)} cached token(s) after JWKS rotation")
+    _token_cache.clear()
+
+
 @lru_cache(maxsize=1)
-def _get_jwks_client() -> PyJWKClient:
-    """Get cached JWKS client for Supabase public keys (RS256)."""
-    supabase_url = _get_supabase_url()
-    jwks_url = f"{supabase_url}/auth/v1/.well-known/jwks.json"
-    return PyJWKClient(jwks_url)
+def _get_jwks_store() -> JWKSKeyStore:
+    """Get the shared JWKS key store for Supabase public keys (RS256/ES256)."""
+    settings = get_settings()
+    jwks_url = settings.SUPABASE_JWKS_URL
+    if not jwks_url:
+        jwks_url = f"{_get_supabase_url()}/auth/v1/.well-known/jwks.json"
+    return JWKSKeyStore(
+        jwks_url,
+        refresh_interval=settings.JWKS_REFRESH_INTERVAL_SECONDS,
+        min_refetch_interval=settings.JWKS_MIN_REFETCH_SECONDS,
+        on_rotate=_on_keys_rotated,
+        policy=get_policy(
+            "jwks",
+            attempts=settings.OUTBOUND_RETRY_ATTEMPTS,
+            backoff_base=settings.OUTBOUND_RETRY_BASE_SECONDS,
+            backoff_max=settings.OUTBOUND_RETRY_MAX_SECONDS,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_SECONDS,
+        ),
+        fetch_timeout=settings.JWKS_FETCH_TIMEOUT_SECONDS,
+    )
+
+
+async def start_jwks() -> None:
+    """Prefetch JWKS and start background refresh (skipped if unconfigured)."""
+    try:
+        store = _get_jwks_store()
+    except ValueError as e:
+        logger.warning(f"JWKS not configured: {e}")
+        return
+    await store.start()
+
+
+async def close_jwks() -> None:
+    """Stop JWKS background refresh."""
+    if _get_jwks_store.cache_info().currsize:
+        await _get_jwks_store().close()
 
 
 def _get_jwt_secret() -> str:
@@ -46,11 +101,15 @@ def _get_jwt_secret() -> str:
     return secret
 
 
-def verify_supabase_jwt(token: str) -> dict[str, Any]:
+async def verify_supabase_jwt(token: str) -> dict[str, Any]:
     """
     Verify a Supabase JWT and return the decoded payload.
     Auto-detects algorithm (RS256 or HS256) from token header.
     
+    Successful verifications are cached (keyed by token digest) until the
+    token's exp claim, so repeated requests with the same token skip the
+    signature check. The returned dict is shared; do not mutate it.
+    
     Args:
         token: The JWT string to verify
         
@@ -59,7 +118,47 @@ def verify_supabase_jwt(token: str) -> dict[str, Any]:
         
     Raises:
         HTTPException: 401 if token is invalid, expired, or malformed
+        HTTPException: 503 if signing keys have never been loaded, or if
+            too many uncached verifications are already pending
     """
+    global _pending_verifications
+    started = time.perf_counter()
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        JWT_VERIFY_DURATION.labels("cached").observe(time.perf_counter() - started)
+        return cached
+    
+    # Shed instead of queueing behind a slow JWKS endpoint; cached tokens
+    # (the common case) never get here
+    if _pending_verifications >= get_settings().AUTH_MAX_PENDING_VERIFICATIONS:
+        ADMISSION_REJECTIONS.labels("auth_pending").inc()
+        logger.warning(f"JWT verification shed: {_pending_verifications} pending")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service busy",
+            headers={"Retry-After": "1"},
+        )
+    
+    outcome = "rejected"
+    _pending_verifications += 1
+    try:
+        payload = await _decode_token(token)
+        outcome = "verified"
+    finally:
+        _pending_verifications -= 1
+        JWT_VERIFY_DURATION.labels(outcome).observe(time.perf_counter() - started)
+    
+    # Only tokens with an expiry are cached; entries never outlive it
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > time.time():
+        _token_cache.set(cache_key, payload, expires_at=float(exp))
+    
+    return payload
+
+
+async def _decode_token(token: str) -> dict[str, Any]:
+    """Verify the token's signature and claims (no caching)."""
     try:
         # Decode header to check algorithm without verifying signature yet
         header = jwt.get_unverified_header(token)
@@ -80,8 +179,10 @@ def verify_supabase_jwt(token: str) -> dict[str, Any]:
             )
         elif algorithm in ["RS256", "ES256"]:
             # Use JWKS for Asymmetric algorithms (RSA or ECDSA)
-            jwks_client = _get_jwks_client()
-            signing_key = jwks_client.get_signing_key_from_jwt(token)
+            kid = header.get("kid")
+            if not kid:
+                raise jwt.InvalidTokenError("Token header is missing 'kid'")
+            signing_key = await _get_jwks_store().get_signing_key(kid)
             payload = jwt.decode(
                 token,
                 signing_key.key,
@@ -96,7 +197,7 @@ def verify_supabase_jwt(token: str) -> dict[str, Any]:
                 detail=f"Unsupported JWT algorithm: {algorithm}",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-            
+        
         return payload
 
     except jwt.ExpiredSignatureError:
@@ -120,10 +221,9 @@ def verify_supabase_jwt(token: str) -> dict[str, Any]:
             detail="Authentication configuration error",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except httpx.HTTPError as e:
-        logger.error(f"Failed to fetch JWKS: {e}")
+    except JWKSUnavailableError as e:
+        logger.error(f"JWKS unavailable: {e}")
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Authentication service unavailable",
-            headers={"WWW-Authenticate": "Bearer"},
         )
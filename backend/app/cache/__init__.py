@@ -0,0 +1,8 @@
+"""
+In-process caches.
+Bounded LRU caches with per-entry expiry and hit/miss counters.
+"""
+
+from app.cache.lru import CacheStats, LRUCache
+
+__all__ = ["CacheStats", "LRUCache"]
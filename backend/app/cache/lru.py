@@ -0,0 +1,85 @@
+"""
+Bounded LRU cache with optional per-entry expiry.
+Not thread-safe: intended for use from the event loop thread only.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypedDict, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheStats(TypedDict):
+    """Counters exposed for observability."""
+    size: int
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Least-recently-used cache holding at most max_entries items.
+    
+    Each entry may carry an absolute expiry (Unix time); expired entries
+    are treated as misses and dropped on access.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[K, tuple[V, float | None]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, expires_at: float | None = None) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> None:
+        """Remove a single entry if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries. Counters are kept."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> CacheStats:
+        """Return current size and hit/miss/eviction counters."""
+        return CacheStats(
+            size=len(self._entries),
+            max_entries=self.max_entries,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
@@ -0,0 +1,233 @@
+"""
+Phase-6: Cache of public (published) menu snapshots.
+Holds the precompressed response bytes per menu, loads each menu at most
+once per version (concurrent misses share one load), and is invalidated by
+menu writes.
+
+Two tiers: an in-process LRU in front of the shared Redis tier (when
+REDIS_URL is set), so a menu warmed by one worker is a hit for every
+other. Invalidations delete the shared entry and are broadcast so all
+workers drop their local copy; both tiers expire entries after
+PUBLIC_MENU_CACHE_TTL_SECONDS, which bounds staleness if a broadcast is
+missed.
+
+Misses (unknown or unpublished menus) are remembered in-process for
+PUBLIC_MENU_NEGATIVE_TTL_SECONDS, so repeated scans of a dead QR code do
+not each cost a database query. Invalidation (e.g.
+publishing) drops them like any other entry.
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, TypedDict
+
+from redis.exceptions import RedisError
+
+from app.cache import shared
+from app.cache.lru import CacheStats, LRUCache
+from app.config import get_settings
+from app.logging import logger
+
+if TYPE_CHECKING:
+    from app.publishing import MenuSnapshot
+
+
+_settings = get_settings()
+_cache: "LRUCache[str, MenuSnapshot]" = LRUCache(
+    max_entries=_settings.PUBLIC_MENU_CACHE_MAX_ENTRIES
+)
+# Menus known to have no public snapshot (value is always True)
+_missing: "LRUCache[str, bool]" = LRUCache(
+    max_entries=_settings.PUBLIC_MENU_CACHE_MAX_ENTRIES
+)
+
+# Menus invalidated while a load was in flight; that load must not be cached
+_stale_loads: set[str] = set()
+_inflight: "dict[str, asyncio.Task[MenuSnapshot | None]]" = {}
+
+_INVALIDATION_CHANNEL = "public_menu:invalidate"
+
+# Bumped on every invalidation; a load only fills the shared tier if the
+# generation it started under is still current (see _STORE_IF_CURRENT)
+_GENERATION_TTL_SECONDS = 86400
+
+# KEYS: entry, generation; ARGV: generation seen, ttl ms, field/value pairs
+_STORE_IF_CURRENT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class SharedTierStats(TypedDict):
+    """Counters of the shared (Redis) tier, consulted on local misses."""
+    enabled: bool
+    hits: int
+    misses: int
+    errors: int
+
+
+_shared_stats = SharedTierStats(enabled=False, hits=0, misses=0, errors=0)
+
+
+def _entry_key(menu_id: str) -> str:
+    return f"public_menu:{menu_id}"
+
+
+def _generation_key(menu_id: str) -> str:
+    return f"public_menu:{menu_id}:generation"
+
+
+async def get_or_load(
+    menu_id: str,
+    loader: "Callable[[], Awaitable[MenuSnapshot | None]]",
+) -> "MenuSnapshot | None":
+    """
+    Return the cached snapshot, or load it once via loader().
+
+    Concurrent misses for the same menu await a single load. A None from
+    the loader (missing or unpublished menu) is cached briefly, locally only.
+    """
+    snapshot = _cache.get(menu_id)
+    if snapshot is not None:
+        return snapshot
+    if _missing.get(menu_id):
+        return None
+
+    task = _inflight.get(menu_id)
+    if task is None:
+        task = asyncio.create_task(_load(menu_id, loader))
+        _inflight[menu_id] = task
+        task.add_done_callback(lambda _: _inflight.pop(menu_id, None))
+    return await asyncio.shield(task)
+
+
+async def _load(
+    menu_id: str,
+    loader: "Callable[[], Awaitable[MenuSnapshot | None]]",
+) -> "MenuSnapshot | None":
+    _stale_loads.discard(menu_id)
+    snapshot, generation = await _read_shared(menu_id)
+    if snapshot is None:
+        snapshot = await loader()
+        if snapshot is None:
+            if menu_id in _stale_loads:
+                _stale_loads.discard(menu_id)
+            else:
+                _missing.set(
+                    menu_id,
+                    True,
+                    expires_at=time.time() + _settings.PUBLIC_MENU_NEGATIVE_TTL_SECONDS,
+                )
+            return None
+        await _write_shared(menu_id, snapshot, generation)
+
+    if menu_id in _stale_loads:
+        _stale_loads.discard(menu_id)
+    else:
+        _cache.set(
+            menu_id,
+            snapshot,
+            expires_at=time.time() + _settings.PUBLIC_MENU_CACHE_TTL_SECONDS,
+        )
+    return snapshot
+
+
+async def _read_shared(menu_id: str) -> "tuple[MenuSnapshot | None, bytes]":
+    """Shared-tier entry (None on miss or error) and the current generation."""
+    # Deferred: app.publishing imports this module
+    from app.publishing import MenuSnapshot
+
+    client = shared.get_client()
+    if client is None:
+        return None, b""
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(_entry_key(menu_id))
+            pipe.get(_generation_key(menu_id))
+            fields, generation = await pipe.execute()
+    except RedisError as e:
+        _shared_stats["errors"] += 1
+        logger.warning(f"Shared cache read failed for menu {menu_id}: {e}")
+        return None, b""
+
+    generation = generation or b""
+    etag = fields.pop(b"etag", None)
+    if etag is None or b"identity" not in fields:
+        _shared_stats["misses"] += 1
+        return None, generation
+    _shared_stats["hits"] += 1
+    variants = {encoding.decode(): body for encoding, body in fields.items()}
+    return MenuSnapshot(etag=etag.decode(), variants=variants), generation
+
+
+async def _write_shared(menu_id: str, snapshot: "MenuSnapshot", generation: bytes) -> None:
+    """Fill the shared tier unless the menu was invalidated since the read."""
+    client = shared.get_client()
+    if client is None:
+        return
+    fields: list[str | bytes] = ["etag", snapshot.etag]
+    for encoding, body in snapshot.variants.items():
+        fields += [encoding, body]
+    ttl_ms = int(_settings.PUBLIC_MENU_CACHE_TTL_SECONDS * 1000)
+    try:
+        await client.eval(
+            _STORE_IF_CURRENT, 2, _entry_key(menu_id), _generation_key(menu_id),
+            generation, ttl_ms, *fields,
+        )
+    except RedisError as e:
+        _shared_stats["errors"] += 1
+        logger.warning(f"Shared cache write failed for menu {menu_id}: {e}")
+
+
+def _drop_local(menu_id: str) -> None:
+    if menu_id in _inflight:
+        _stale_loads.add(menu_id)
+    _cache.pop(menu_id)
+    _missing.pop(menu_id)
+
+
+def _drop_all_local() -> None:
+    _stale_loads.update(_inflight)
+    _cache.clear()
+    _missing.clear()
+
+
+shared.subscribe(_INVALIDATION_CHANNEL, _drop_local, _drop_all_local)
+
+
+async def invalidate(menu_id: str) -> None:
+    """
+    Drop a menu's cached snapshot everywhere; call after any write to that menu.
+
+    The local copy is always dropped. If Redis is unreachable, other
+    workers keep serving their copy until it expires.
+    """
+    _drop_local(menu_id)
+    client = shared.get_client()
+    if client is None:
+        return
+    try:
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.incr(_generation_key(menu_id))
+            pipe.expire(_generation_key(menu_id), _GENERATION_TTL_SECONDS)
+            pipe.delete(_entry_key(menu_id))
+            pipe.publish(_INVALIDATION_CHANNEL, menu_id)
+            await pipe.execute()
+    except RedisError as e:
+        _shared_stats["errors"] += 1
+        logger.error(f"Shared cache invalidation failed for menu {menu_id}: {e}")
+
+
+def get_stats() -> CacheStats:
+    """Return hit/miss counters of the in-process tier."""
+    return _cache.stats()
+
+
+def get_shared_stats() -> SharedTierStats:
+    """Return hit/miss/error counters of the shared tier."""
+    return SharedTierStats(**{**_shared_stats, "enabled": shared.get_client() is not None})
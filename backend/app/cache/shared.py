@@ -0,0 +1,109 @@
+"""
+Shared cache tier (Redis), common to all API workers and nodes.
+Optional: without REDIS_URL there is no client and callers fall back to
+their in-process cache alone. Besides the shared store, a pub/sub
+listener delivers invalidation broadcasts to handlers registered with
+subscribe(), so every worker drops its in-process copy of a changed entry.
+
+Redis is a cache here, never a source of truth: callers treat any
+RedisError as a miss, and a short socket timeout keeps a slow Redis from
+slowing down reads.
+"""
+
+import asyncio
+from typing import Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import get_settings
+from app.logging import logger
+
+
+_client: Redis | None = None
+_listener: asyncio.Task[None] | None = None
+
+# channel -> (on_message(payload), on_resync())
+_handlers: dict[str, tuple[Callable[[str], None], Callable[[], None]]] = {}
+
+
+def _create_client(url: str, timeout: float | None) -> Redis:
+    return Redis.from_url(
+        url,
+        socket_timeout=timeout,
+        socket_connect_timeout=timeout,
+        health_check_interval=30,
+    )
+
+
+async def start_shared_cache() -> None:
+    """Connect to Redis and start the invalidation listener (skipped if unconfigured)."""
+    global _client, _listener
+    settings = get_settings()
+    if not settings.REDIS_URL:
+        logger.info("Shared cache disabled (REDIS_URL not set)")
+        return
+
+    _client = _create_client(settings.REDIS_URL, settings.REDIS_TIMEOUT_SECONDS)
+    try:
+        await _client.ping()
+        logger.info("Shared cache ready")
+    except RedisError as e:
+        # Not fatal: reads fall back to the loader and the client reconnects
+        logger.error(f"Shared cache unreachable at startup: {e}")
+    if _handlers:
+        _listener = asyncio.create_task(_listen(settings.REDIS_URL))
+
+
+async def close_shared_cache() -> None:
+    """Stop the listener and close the Redis connection pool."""
+    global _client, _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> Redis | None:
+    """The shared Redis client, or None when the shared tier is disabled."""
+    return _client
+
+
+def subscribe(channel: str, on_message: Callable[[str], None], on_resync: Callable[[], None]) -> None:
+    """
+    Route broadcasts on channel to on_message (call before startup).
+
+    on_resync runs whenever the subscription is (re)established: messages
+    published while disconnected are lost, so local state derived from
+    them must be dropped.
+    """
+    _handlers[channel] = (on_message, on_resync)
+
+
+async def _listen(url: str) -> None:
+    # Dedicated connection without a read timeout: a quiet channel is normal
+    client = _create_client(url, timeout=None)
+    delay = 1.0
+    try:
+        while True:
+            try:
+                async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(*_handlers)
+                    for _, on_resync in _handlers.values():
+                        on_resync()
+                    delay = 1.0
+                    async for message in pubsub.listen():
+                        on_message, _ = _handlers[message["channel"].decode()]
+                        on_message(message["data"].decode())
+            except (RedisError, OSError) as e:
+                logger.warning(f"Shared cache subscription lost, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+    finally:
+        await client.aclose()
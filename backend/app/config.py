@@ -2,6 +2,8 @@
 Environment configuration with validation.
 """
 
+import os
+import tempfile
 from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,8 +14,25 @@ class Settings(BaseSettings):
     # Core settings
     ENV: str
     LOG_LEVEL: str
+    LOG_SAMPLE_RATES: dict[str, float] = {}  # INFO sampling per module, e.g. {"supabase": 0.1}
     FRONTEND_ORIGIN: str
     
+    # Postgres (menus table)
+    DATABASE_URL: str | None = None
+    DATABASE_POOL_MIN_SIZE: int = 1
+    DATABASE_POOL_MAX_SIZE: int = 10
+
+    # Public menu read path
+    PUBLIC_MENU_BASE_URL: str | None = None  # Defaults to {FRONTEND_ORIGIN}/m
+    PUBLIC_MENU_CACHE_MAX_ENTRIES: int = 1000
+    PUBLIC_MENU_CACHE_TTL_SECONDS: float = 300.0  # Bounds staleness across workers
+    PUBLIC_MENU_NEGATIVE_TTL_SECONDS: float = 10.0  # How long "not found" is remembered per process
+    PUBLIC_MENU_MAX_AGE_SECONDS: int = 60  # Cache-Control max-age for clients/CDN
+
+    # Shared cache tier across workers/nodes (optional)
+    REDIS_URL: str | None = None
+    REDIS_TIMEOUT_SECONDS: float = 0.25  # A slower Redis counts as a miss
+
     # Supabase Auth & Storage
     SUPABASE_URL: str | None = None
     SUPABASE_ANON_KEY: str | None = None
@@ -21,6 +40,66 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_ROLE_KEY: str | None = None
     SUPABASE_STORAGE_BUCKET: str | None = None
 
+    # JWKS key store (asymmetric JWTs)
+    SUPABASE_JWKS_URL: str | None = None  # Defaults to {SUPABASE_URL}/auth/v1/.well-known/jwks.json
+    JWKS_REFRESH_INTERVAL_SECONDS: float = 600.0
+    JWKS_MIN_REFETCH_SECONDS: float = 30.0  # Throttle for unknown-kid refetches
+    JWKS_FETCH_TIMEOUT_SECONDS: float = 5.0  # Budget per key set fetch, retries included
+
+    # Verified JWT cache (entries expire at the token's exp claim)
+    JWT_CACHE_MAX_ENTRIES: int = 10000
+
+    # Storage HTTP client (shared connection pool)
+    STORAGE_MAX_CONNECTIONS: int = 20
+    STORAGE_TIMEOUT_SECONDS: float = 30.0  # Budget per transfer (upload/download of a file)
+    STORAGE_CALL_TIMEOUT_SECONDS: float = 5.0  # Budget per metadata call (HEAD, range read, sign, delete)
+    STORAGE_UPLOAD_CONCURRENCY: int = 3  # Parallel storage transfers per process (all requests)
+
+    # Outbound calls to Supabase (per upstream, per process)
+    OUTBOUND_RETRY_ATTEMPTS: int = 3  # Idempotent calls only
+    OUTBOUND_RETRY_BASE_SECONDS: float = 0.1  # Backoff before jitter: base * 2^retry
+    OUTBOUND_RETRY_MAX_SECONDS: float = 1.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Failed attempts in a row that open the circuit
+    CIRCUIT_RESET_SECONDS: float = 30.0  # Fail fast this long before probing again
+
+    # Admission control (per process)
+    UPLOAD_RATE_PER_MINUTE: float = 12.0  # Token refill per user
+    UPLOAD_BURST: int = 5  # Uploads a user may send back to back
+    UPLOAD_MAX_INFLIGHT_BYTES: int = 128 * 1024 * 1024  # Declared body bytes across requests
+    UPLOAD_BUSY_RETRY_AFTER_SECONDS: int = 5
+    AUTH_MAX_PENDING_VERIFICATIONS: int = 100  # Uncached JWT checks in flight before shedding (503)
+
+    # Resumable uploads (staged on this node's disk)
+    UPLOAD_STAGING_DIR: str = os.path.join(tempfile.gettempdir(), "dijital-menum-uploads")
+    UPLOAD_SESSION_TTL_SECONDS: int = 24 * 60 * 60
+    UPLOAD_MAX_SESSIONS_PER_USER: int = 20
+    UPLOAD_SWEEP_INTERVAL_SECONDS: float = 3600.0
+
+    # CPU worker processes (image derivatives)
+    WORKER_PROCESSES: int = 2
+    WORKER_MAX_TASKS_PER_CHILD: int = 100  # Recycle workers to cap Pillow memory growth
+    DERIVATIVE_STALE_SECONDS: float = 600.0  # Pending derivatives untouched this long are rescheduled
+
+    # Background jobs (OCR + parse)
+    JOB_WORKERS: int = 2  # Concurrent jobs per API process
+    JOB_QUEUE_MAX_PENDING: int = 100  # New jobs are refused (503) beyond this
+    JOB_LEASE_SECONDS: float = 120.0  # Running jobs without a heartbeat this long are recovered
+    JOB_MAX_ATTEMPTS: int = 3  # Claims before a job whose worker keeps dying is failed
+    OCR_PROVIDER: str = "fake"
+
+    # QR codes
+    QR_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "dijital-menum-qr")  # On-disk render memo
+    QR_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # Least recently used renders are evicted beyond this
+    QR_EXPORT_MAX_MENUS: int = 500
+    QR_EXPORT_BATCH_SIZE: int = 25  # Menus per worker task
+
+    # Per-request profiling (off unless a token or a sample rate is set)
+    PROFILING_TOKEN: str | None = None  # Requests sending X-Profile-Token: <token> are profiled
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of all requests profiled
+    PROFILING_OUTPUT_DIR: str = os.path.join(tempfile.gettempdir(), "dijital-menum-profiles")
+    PROFILING_MAX_CONCURRENT: int = 2  # Further requests run unprofiled
+    PROFILING_INTERVAL_SECONDS: float = 0.001
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
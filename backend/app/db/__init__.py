@@ -0,0 +1,8 @@
+"""
+Phase-5: Postgres access.
+Lifespan-managed asyncpg pool and the menus repository.
+"""
+
+from app.db.pool import DatabaseConfigError, close_db, get_pool, start_db
+
+__all__ = ["DatabaseConfigError", "close_db", "get_pool", "start_db"]
@@ -0,0 +1,187 @@
+"""
+Phase-5: Menu images repository over the `menu_images` table.
+One row per stored original, tracking its resized WebP derivatives.
+Originals are content-addressed, so (menu_id, content_hash) doubles as the
+per-menu index used to de-duplicate uploads.
+Callers check menu ownership before touching these rows.
+"""
+
+from datetime import datetime
+from typing import Any, Literal, TypedDict
+
+from app.db.menus import _parse_uuid
+from app.db.pool import get_pool
+
+
+DerivativeStatus = Literal["pending", "ready", "failed"]
+
+
+class MenuImageRecord(TypedDict):
+    """Row of the menu_images table."""
+    path: str
+    content_hash: str | None
+    status: DerivativeStatus
+    derivatives: dict[str, str]  # width -> storage path
+    created_at: datetime
+
+
+_IMAGE_COLUMNS = "path, content_hash, status, derivatives, created_at"
+
+
+def _to_record(row: Any) -> MenuImageRecord:
+    return MenuImageRecord(
+        path=row["path"],
+        content_hash=row["content_hash"],
+        status=row["status"],
+        derivatives=row["derivatives"],
+        created_at=row["created_at"],
+    )
+
+
+async def find_menu_images(menu_id: str, content_hashes: list[str]) -> dict[str, MenuImageRecord]:
+    """
+    Look up already stored originals of a menu by content hash.
+    
+    Returns:
+        Mapping of content hash to record, for the hashes that are known
+    """
+    menu_uuid = _parse_uuid(menu_id)
+    if menu_uuid is None or not content_hashes:
+        return {}
+    
+    rows = await get_pool().fetch(
+        f"""
+        SELECT {_IMAGE_COLUMNS}
+        FROM menu_images
+        WHERE menu_id = $1 AND content_hash = ANY($2::text[])
+        """,
+        menu_uuid,
+        content_hashes,
+    )
+    return {row["content_hash"]: _to_record(row) for row in rows}
+
+
+async def find_indexed_paths(paths: list[str]) -> set[str]:
+    """The subset of storage paths that have an index row (in any menu)."""
+    if not paths:
+        return set()
+    rows = await get_pool().fetch(
+        "SELECT path FROM menu_images WHERE path = ANY($1::text[])",
+        paths,
+    )
+    return {row["path"] for row in rows}
+
+
+async def add_menu_images(menu_id: str, images: list[tuple[str, str]]) -> list[MenuImageRecord]:
+    """
+    Record stored originals, keeping existing rows untouched.
+    
+    Args:
+        menu_id: Owning menu
+        images: (path, content_hash) pairs
+        
+    Returns:
+        The rows that were newly inserted (derivatives pending)
+    """
+    menu_uuid = _parse_uuid(menu_id)
+    if menu_uuid is None or not images:
+        return []
+    
+    rows = await get_pool().fetch(
+        f"""
+        INSERT INTO menu_images (menu_id, path, content_hash)
+        SELECT $1, path, content_hash
+        FROM unnest($2::text[], $3::text[]) AS new(path, content_hash)
+        ON CONFLICT DO NOTHING
+        RETURNING {_IMAGE_COLUMNS}
+        """,
+        menu_uuid,
+        [path for path, _ in images],
+        [content_hash for _, content_hash in images],
+    )
+    return [_to_record(row) for row in rows]
+
+
+async def retry_failed_derivatives(path: str) -> bool:
+    """Reset a failed original to pending; True if it was failed."""
+    result = await get_pool().execute(
+        """
+        UPDATE menu_images
+        SET status = 'pending', updated_at = NOW()
+        WHERE path = $1 AND status = 'failed'
+        """,
+        path,
+    )
+    return result == "UPDATE 1"
+
+
+async def claim_stale_pending(stale_seconds: float, limit: int) -> list[tuple[str, str]]:
+    """
+    Claim pending originals not touched for stale_seconds (their task was lost).
+
+    Claiming bumps updated_at, so concurrent callers (other processes)
+    never reschedule the same original twice within stale_seconds.
+
+    Returns:
+        (menu_id, path) of each claimed original
+    """
+    rows = await get_pool().fetch(
+        """
+        UPDATE menu_images
+        SET updated_at = NOW()
+        WHERE path IN (
+            SELECT path FROM menu_images
+            WHERE status = 'pending' AND updated_at < NOW() - make_interval(secs => $1)
+            ORDER BY updated_at
+            LIMIT $2
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING menu_id, path
+        """,
+        stale_seconds,
+        limit,
+    )
+    return [(str(row["menu_id"]), row["path"]) for row in rows]
+
+
+async def mark_derivatives_ready(path: str, derivatives: dict[str, str]) -> None:
+    """Store derivative paths for an original and mark it ready."""
+    await get_pool().execute(
+        """
+        UPDATE menu_images
+        SET derivatives = $2, status = 'ready', updated_at = NOW()
+        WHERE path = $1
+        """,
+        path,
+        derivatives,
+    )
+
+
+async def mark_derivatives_failed(path: str) -> None:
+    """Mark derivative generation for an original as failed."""
+    await get_pool().execute(
+        """
+        UPDATE menu_images
+        SET status = 'failed', updated_at = NOW()
+        WHERE path = $1
+        """,
+        path,
+    )
+
+
+async def list_menu_images(menu_id: str) -> list[MenuImageRecord]:
+    """List a menu's images, oldest first."""
+    menu_uuid = _parse_uuid(menu_id)
+    if menu_uuid is None:
+        return []
+
+    rows = await get_pool().fetch(
+        f"""
+        SELECT {_IMAGE_COLUMNS}
+        FROM menu_images
+        WHERE menu_id = $1
+        ORDER BY created_at, path
+        """,
+        menu_uuid,
+    )
+    return [_to_record(row) for row in rows]
@@ -0,0 +1,207 @@
+"""
+Phase-7: Jobs repository over the `menu_jobs` table.
+State transitions are single conditional UPDATEs, so a job is claimed by
+exactly one worker even if several API processes hold it in their queues.
+"""
+
+from datetime import datetime
+from typing import Any, Literal, TypedDict
+
+from app.db.menus import _parse_uuid
+from app.db.pool import get_pool
+
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobRecord(TypedDict):
+    """Row of the menu_jobs table."""
+    id: str
+    menu_id: str
+    user_id: str
+    kind: str
+    status: JobStatus
+    stage: str | None
+    progress: int
+    payload: dict[str, Any]
+    result: dict[str, Any] | None
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+
+
+_JOB_COLUMNS = (
+    "id, menu_id, user_id, kind, status, stage, progress, payload, result, error, "
+    "created_at, updated_at"
+)
+
+
+def _to_record(row: Any) -> JobRecord:
+    return JobRecord(
+        id=str(row["id"]),
+        menu_id=str(row["menu_id"]),
+        user_id=str(row["user_id"]),
+        kind=row["kind"],
+        status=row["status"],
+        stage=row["stage"],
+        progress=row["progress"],
+        payload=row["payload"],
+        result=row["result"],
+        error=row["error"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
+
+
+async def create_job(menu_id: str, user_id: str, kind: str, payload: dict[str, Any]) -> JobRecord:
+    """Insert a queued job."""
+    row = await get_pool().fetchrow(
+        f"""
+        INSERT INTO menu_jobs (menu_id, user_id, kind, payload)
+        VALUES ($1, $2, $3, $4)
+        RETURNING {_JOB_COLUMNS}
+        """,
+        _parse_uuid(menu_id),
+        _parse_uuid(user_id),
+        kind,
+        payload,
+    )
+    return _to_record(row)
+
+
+async def get_owned_job(job_id: str, user_id: str) -> JobRecord | None:
+    """Fetch a job owned by user_id; None if missing or not owned."""
+    job_uuid, user_uuid = _parse_uuid(job_id), _parse_uuid(user_id)
+    if job_uuid is None or user_uuid is None:
+        return None
+
+    row = await get_pool().fetchrow(
+        f"SELECT {_JOB_COLUMNS} FROM menu_jobs WHERE id = $1 AND user_id = $2",
+        job_uuid,
+        user_uuid,
+    )
+    return _to_record(row) if row else None
+
+
+async def claim_job(job_id: str) -> JobRecord | None:
+    """
+    Move a queued job to running.
+
+    Returns:
+        The job, or None if it is no longer queued (claimed elsewhere)
+    """
+    row = await get_pool().fetchrow(
+        f"""
+        UPDATE menu_jobs
+        SET status = 'running', stage = 'starting', attempts = attempts + 1, updated_at = NOW()
+        WHERE id = $1 AND status = 'queued'
+        RETURNING {_JOB_COLUMNS}
+        """,
+        _parse_uuid(job_id),
+    )
+    return _to_record(row) if row else None
+
+
+async def update_progress(job_id: str, stage: str, progress: int) -> None:
+    """Record the current stage of a running job."""
+    await get_pool().execute(
+        """
+        UPDATE menu_jobs
+        SET stage = $2, progress = $3, updated_at = NOW()
+        WHERE id = $1 AND status = 'running'
+        """,
+        _parse_uuid(job_id),
+        stage,
+        progress,
+    )
+
+
+async def touch_job(job_id: str) -> None:
+    """Renew a running job's lease (heartbeat on updated_at)."""
+    await get_pool().execute(
+        "UPDATE menu_jobs SET updated_at = NOW() WHERE id = $1 AND status = 'running'",
+        _parse_uuid(job_id),
+    )
+
+
+async def finish_job(
+    job_id: str,
+    status: Literal["succeeded", "failed"],
+    result: dict[str, Any] | None = None,
+    error: str | None = None,
+) -> None:
+    """Store the outcome of a running job."""
+    await get_pool().execute(
+        """
+        UPDATE menu_jobs
+        SET status = $2,
+            stage = NULL,
+            progress = CASE WHEN $2 = 'succeeded' THEN 100 ELSE progress END,
+            result = $3,
+            error = $4,
+            updated_at = NOW()
+        WHERE id = $1 AND status = 'running'
+        """,
+        _parse_uuid(job_id),
+        status,
+        result,
+        error,
+    )
+
+
+async def requeue_job(job_id: str) -> None:
+    """Put an interrupted running job back in the queue (not counted as an attempt)."""
+    await get_pool().execute(
+        """
+        UPDATE menu_jobs
+        SET status = 'queued', stage = NULL, progress = 0, attempts = attempts - 1, updated_at = NOW()
+        WHERE id = $1 AND status = 'running'
+        """,
+        _parse_uuid(job_id),
+    )
+
+
+async def list_queued_job_ids() -> list[str]:
+    """IDs of queued jobs, oldest first (recovered at startup)."""
+    rows = await get_pool().fetch(
+        "SELECT id FROM menu_jobs WHERE status = 'queued' ORDER BY created_at"
+    )
+    return [str(row["id"]) for row in rows]
+
+
+async def recover_expired_jobs(lease_seconds: float, max_attempts: int) -> tuple[list[str], int]:
+    """
+    Release running jobs whose lease expired (their worker died).
+
+    Jobs with attempts left go back to queued; the rest are failed.
+
+    Returns:
+        (IDs of re-queued jobs, number of failed jobs)
+    """
+    # Re-queued rows get a fresh updated_at, so the second UPDATE skips them
+    pool = get_pool()
+    requeued = await pool.fetch(
+        """
+        UPDATE menu_jobs
+        SET status = 'queued', stage = NULL, progress = 0, updated_at = NOW()
+        WHERE status = 'running'
+          AND updated_at < NOW() - make_interval(secs => $1)
+          AND attempts < $2
+        RETURNING id
+        """,
+        lease_seconds,
+        max_attempts,
+    )
+    failed = await pool.fetch(
+        """
+        UPDATE menu_jobs
+        SET status = 'failed', stage = NULL,
+            error = 'Processing was interrupted. Please try again.',
+            updated_at = NOW()
+        WHERE status = 'running'
+          AND updated_at < NOW() - make_interval(secs => $1)
+        RETURNING id
+        """,
+        lease_seconds,
+    )
+    return [str(row["id"]) for row in requeued], len(failed)
@@ -0,0 +1,530 @@
+"""
+Phase-5: Menus repository over the `menus` table.
+Ownership is enforced inside every query (WHERE id = $1 AND user_id = $2),
+so an owned lookup is a single indexed round-trip.
+"""
+
+import json
+import uuid
+from datetime import datetime
+from typing import Any, TypedDict
+
+from app.db.pool import get_pool
+from app.schemas.patch import PatchStep
+
+
+class VersionConflictError(Exception):
+    """Raised when a write's expected version is not the stored version."""
+
+    def __init__(self, current_version: int) -> None:
+        super().__init__(f"Menu was modified (current version {current_version})")
+        self.current_version = current_version
+
+
+class PatchNotApplicableError(Exception):
+    """Raised when a JSON Patch test fails or a target path does not exist."""
+    pass
+
+
+class MenuSummaryRecord(TypedDict):
+    """Summary columns used by menu listing."""
+    id: str
+    title: str | None
+    is_published: bool
+    updated_at: datetime
+
+
+class MenuRecord(TypedDict):
+    """Row of the menus table."""
+    id: str
+    user_id: str
+    data: dict[str, Any]
+    is_published: bool
+    version: int
+    created_at: datetime
+    updated_at: datetime
+
+
+_MENU_COLUMNS = "id, user_id, data, is_published, version, created_at, updated_at"
+
+
+def _parse_uuid(value: str) -> uuid.UUID | None:
+    """Parse a UUID path/claim value; None if it is not a valid UUID."""
+    try:
+        return uuid.UUID(value)
+    except (ValueError, AttributeError):
+        return None
+
+
+def is_valid_id(value: str) -> bool:
+    """Return True if value can be a menu ID (cheap pre-check before I/O)."""
+    return _parse_uuid(value) is not None
+
+
+def _to_record(row: Any) -> MenuRecord:
+    return MenuRecord(
+        id=str(row["id"]),
+        user_id=str(row["user_id"]),
+        data=row["data"],
+        is_published=row["is_published"],
+        version=row["version"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
+
+
+async def get_owned_menu(menu_id: str, user_id: str) -> MenuRecord | None:
+    """
+    Fetch a menu owned by user_id.
+    
+    Returns:
+        The menu, or None if it does not exist or belongs to someone else
+    """
+    menu_uuid, user_uuid = _parse_uuid(menu_id), _parse_uuid(user_id)
+    if menu_uuid is None or user_uuid is None:
+        return None
+    
+    row = await get_pool().fetchrow(
+        f"SELECT {_MENU_COLUMNS} FROM menus WHERE id = $1 AND user_id = $2",
+        menu_uuid,
+        user_uuid,
+    )
+    return _to_record(row) if row else None
+
+
+async def get_published_menu_data(menu_id: str) -> dict[str, Any] | None:
+    """
+    Fetch the data of a published menu (public read path, no ownership).
+    
+    Returns:
+        The menu data, or None if it does not exist or is not published
+    """
+    menu_uuid = _parse_uuid(menu_id)
+    if menu_uuid is None:
+        return None
+    
+    return await get_pool().fetchval(
+        "SELECT data FROM menus WHERE id = $1 AND is_published",
+        menu_uuid,
+    )
+
+
+async def get_published_version(menu_id: str) -> int | None:
+    """
+    Current version of a published menu (public read path, no ownership).
+    
+    Returns:
+        The version, or None if the menu does not exist or is not published
+    """
+    menu_uuid = _parse_uuid(menu_id)
+    if menu_uuid is None:
+        return None
+    
+    return await get_pool().fetchval(
+        "SELECT version FROM menus WHERE id = $1 AND is_published",
+        menu_uuid,
+    )
+
+
+async def _raise_if_stale(
+    menu_uuid: uuid.UUID,
+    user_uuid: uuid.UUID,
+    expected_version: int | None,
+) -> None:
+    """
+    After a conditional write matched no row, tell "not found" from "stale".
+    
+    Raises:
+        VersionConflictError: If the menu exists at another version
+    """
+    if expected_version is None:
+        return
+    current = await get_pool().fetchval(
+        "SELECT version FROM menus WHERE id = $1 AND user_id = $2",
+        menu_uuid,
+        user_uuid,
+    )
+    if current is not None and current != expected_version:
+        raise VersionConflictError(current)
+
+
+async def replace_menu_data(
+    menu_id: str,
+    user_id: str,
+    data: dict[str, Any],
+    expected_version: int | None = None,
+) -> MenuRecord | None:
+    """
+    Replace the data document of an owned menu (caller validates it).
+    
+    Args:
+        expected_version: If given, only update when the stored version matches
+    
+    Returns:
+        The updated menu, or None if it does not exist or is not owned
+        
+    Raises:
+        VersionConflictError: If expected_version is stale
+    """
+    menu_uuid, user_uuid = _parse_uuid(menu_id), _parse_uuid(user_id)
+    if menu_uuid is None or user_uuid is None:
+        return None
+    
+    row = await get_pool().fetchrow(
+        f"""
+        UPDATE menus
+        SET data = $3::jsonb,
+            version = version + 1,
+            updated_at = NOW()
+        WHERE id = $1 AND user_id = $2 AND ($4::int IS NULL OR version = $4)
+        RETURNING {_MENU_COLUMNS}
+        """,
+        menu_uuid,
+        user_uuid,
+        data,
+        expected_version,
+    )
+    if row is None:
+        await _raise_if_stale(menu_uuid, user_uuid, expected_version)
+        return None
+    return _to_record(row)
+
+
+async def create_menu(user_id: str, data: dict[str, Any]) -> MenuRecord | None:
+    """
+    Insert a new draft menu owned by user_id (caller validates data).
+    
+    Returns:
+        The created menu, or None if user_id is not a valid UUID
+    """
+    user_uuid = _parse_uuid(user_id)
+    if user_uuid is None:
+        return None
+    
+    row = await get_pool().fetchrow(
+        f"""
+        INSERT INTO menus (user_id, data)
+        VALUES ($1, $2::jsonb)
+        RETURNING {_MENU_COLUMNS}
+        """,
+        user_uuid,
+        data,
+    )
+    return _to_record(row)
+
+
+async def delete_menu(menu_id: str, user_id: str) -> bool:
+    """Delete an owned menu; True if a row was deleted."""
+    menu_uuid, user_uuid = _parse_uuid(menu_id), _parse_uuid(user_id)
+    if menu_uuid is None or user_uuid is None:
+        return False
+    
+    result = await get_pool().execute(
+        "DELETE FROM menus WHERE id = $1 AND user_id = $2",
+        menu_uuid,
+        user_uuid,
+    )
+    return result == "DELETE 1"
+
+
+async def publish_menu(menu_id: str, user_id: str) -> MenuRecord | None:
+    """
+    Mark an owned menu as published (explicit owner action only).
+    
+    Returns:
+        The published menu, or None if it does not exist or is not owned
+    """
+    menu_uuid, user_uuid = _parse_uuid(menu_id), _parse_uuid(user_id)
+    if menu_uuid is None or user_uuid is None:
+        return None
+    
+    row = await get_pool().fetchrow(
+        f"""
+        UPDATE menus
+        SET is_published = TRUE,
+            updated_at = NOW()
+        WHERE id = $1 AND user_id = $2
+        RETURNING {_MENU_COLUMNS}
+        """,
+        menu_uuid,
+        user_uuid,
+    )
+    return _to_record(row) if row else None
+
+
+async def owns_menu(menu_id: str, user_id: str) -> bool:
+    """Return True if the menu exists and belongs to user_id."""
+    menu_uuid, user_uuid = _parse_uuid(menu_id), _parse_uuid(user_id)
+    if menu_uuid is None or user_uuid is None:
+        return False
+    
+    found = await get_pool().fetchval(
+        "SELECT EXISTS (SELECT 1 FROM menus WHERE id = $1 AND user_id = $2)",
+        menu_uuid,
+        user_uuid,
+    )
+    return bool(found)
+
+
+async def update_menu_title(
+    menu_id: str,
+    user_id: str,
+    title: str,
+    expected_version: int | None = None,
+) -> MenuRecord | None:
+    """
+    Set data.title on an owned menu.
+    
+    Args:
+        expected_version: If given, only update when the stored version matches
+    
+    Returns:
+        The updated menu, or None if it does not exist or is not owned
+        
+    Raises:
+        VersionConflictError: If expected_version is stale
+    """
+    menu_uuid, user_uuid = _parse_uuid(menu_id), _parse_uuid(user_id)
+    if menu_uuid is None or user_uuid is None:
+        return None
+    
+    row = await get_pool().fetchrow(
+        f"""
+        UPDATE menus
+        SET data = jsonb_set(data, '{{title}}', to_jsonb($3::text)),
+            version = version + 1,
+            updated_at = NOW()
+        WHERE id = $1 AND user_id = $2 AND ($4::int IS NULL OR version = $4)
+        RETURNING {_MENU_COLUMNS}
+        """,
+        menu_uuid,
+        user_uuid,
+        title,
+        expected_version,
+    )
+    if row is None:
+        await _raise_if_stale(menu_uuid, user_uuid, expected_version)
+        return None
+    return _to_record(row)
+
+
+def _compile_patch_sql(steps: list[PatchStep], params: list[Any]) -> tuple[str, str]:
+    """
+    Build a CTE chain that applies the steps to menus.data in Postgres.
+    
+    Each CTE reads the previous document `d` and filters on the step's
+    preconditions (path exists, test value equal, array index in range),
+    so a failing step empties the chain and the final UPDATE matches no row.
+    Values travel as JSON text parameters; params is extended in place.
+    
+    Returns:
+        (WITH clause, name of the CTE holding the final document)
+    """
+    ctes: list[str] = ["s0 AS (SELECT data AS d FROM menus WHERE id = $1 AND user_id = $2 AND version = $3)"]
+    
+    def param(value: Any, cast: str) -> str:
+        params.append(value)
+        return f"${len(params)}::{cast}"
+    
+    def push(select_sql: str) -> str:
+        name = f"s{len(ctes)}"
+        ctes.append(f"{name} AS ({select_sql})")
+        return name
+    
+    def add(prev: str, step: PatchStep, value_sql: str, extra_where: str = "TRUE") -> str:
+        path, parent = step.path, step.path[:-1]
+        if not path:
+            return push(f"SELECT {value_sql} AS d FROM {prev} WHERE {extra_where}")
+        parent_sql = param(parent, "text[]")
+        if step.parent_is_array and path[-1] == "-":
+            return push(
+                f"SELECT jsonb_set(d, {parent_sql}, (d #> {parent_sql}) || jsonb_build_array({value_sql})) AS d "
+                f"FROM {prev} WHERE jsonb_typeof(d #> {parent_sql}) = 'array' AND {extra_where}"
+            )
+        path_sql = param(path, "text[]")
+        if step.parent_is_array:
+            index_sql = param(int(path[-1]), "int")
+            return push(
+                f"SELECT jsonb_insert(d, {path_sql}, {value_sql}) AS d "
+                f"FROM {prev} WHERE jsonb_array_length(d #> {parent_sql}) >= {index_sql} AND {extra_where}"
+            )
+        return push(
+            f"SELECT jsonb_set(d, {path_sql}, {value_sql}, true) AS d "
+            f"FROM {prev} WHERE jsonb_typeof(d #> {parent_sql}) = 'object' AND {extra_where}"
+        )
+    
+    current = "s0"
+    for step in steps:
+        if step.op == "add":
+            current = add(current, step, param(json.dumps(step.value), "text::jsonb"))
+        elif step.op == "remove":
+            path_sql = param(step.path, "text[]")
+            current = push(f"SELECT d #- {path_sql} AS d FROM {current} WHERE d #> {path_sql} IS NOT NULL")
+        elif step.op == "replace":
+            value_sql = param(json.dumps(step.value), "text::jsonb")
+            if not step.path:
+                current = push(f"SELECT {value_sql} AS d FROM {current}")
+            else:
+                path_sql = param(step.path, "text[]")
+                current = push(
+                    f"SELECT jsonb_set(d, {path_sql}, {value_sql}, false) AS d "
+                    f"FROM {current} WHERE d #> {path_sql} IS NOT NULL"
+                )
+        elif step.op == "test":
+            path_sql = param(step.path, "text[]")
+            value_sql = param(json.dumps(step.value), "text::jsonb")
+            current = push(f"SELECT d FROM {current} WHERE d #> {path_sql} = {value_sql}")
+        elif step.op == "copy":
+            from_sql = param(step.from_path, "text[]")
+            current = add(current, step, f"(d #> {from_sql})", f"d #> {from_sql} IS NOT NULL")
+        else:  # move: remove the source, then add the removed value at the target
+            from_sql = param(step.from_path, "text[]")
+            removed = push(
+                f"SELECT d #- {from_sql} AS d, d #> {from_sql} AS moved "
+                f"FROM {current} WHERE d #> {from_sql} IS NOT NULL"
+            )
+            current = add(removed, step, "moved")
+    
+    return "WITH " + ",\n".join(ctes), current
+
+
+async def apply_menu_patch(
+    menu_id: str,
+    user_id: str,
+    expected_version: int,
+    steps: list[PatchStep],
+) -> MenuRecord | None:
+    """
+    Apply validated JSON Patch steps to an owned menu inside Postgres.
+    
+    The whole patch runs as one UPDATE (jsonb_set / jsonb_insert / #-), so
+    only the patch travels to the database and the document is rewritten
+    once. The row must still be at expected_version.
+    
+    Returns:
+        The updated menu, or None if it does not exist or is not owned
+        
+    Raises:
+        VersionConflictError: If expected_version is stale
+        PatchNotApplicableError: If a test failed or a path does not exist
+    """
+    menu_uuid, user_uuid = _parse_uuid(menu_id), _parse_uuid(user_id)
+    if menu_uuid is None or user_uuid is None:
+        return None
+    
+    params: list[Any] = [menu_uuid, user_uuid, expected_version]
+    with_sql, final = _compile_patch_sql(steps, params)
+    
+    row = await get_pool().fetchrow(
+        f"""
+        {with_sql}
+        UPDATE menus
+        SET data = {final}.d,
+            version = menus.version + 1,
+            updated_at = NOW()
+        FROM {final}
+        WHERE menus.id = $1 AND menus.user_id = $2 AND menus.version = $3
+        RETURNING {", ".join(f"menus.{c}" for c in _MENU_COLUMNS.split(", "))}
+        """,
+        *params,
+    )
+    if row is not None:
+        return _to_record(row)
+    
+    current = await get_pool().fetchval(
+        "SELECT version FROM menus WHERE id = $1 AND user_id = $2",
+        menu_uuid,
+        user_uuid,
+    )
+    if current is None:
+        return None
+    if current != expected_version:
+        raise VersionConflictError(current)
+    raise PatchNotApplicableError("A test operation failed or a target path does not exist")
+
+
+async def list_owned_published_titles(user_id: str, menu_ids: list[str]) -> dict[str, str | None]:
+    """
+    Titles of the given menus that are owned by user_id and published.
+    
+    Returns:
+        Mapping of menu ID to title; missing, foreign and draft menus are absent
+    """
+    user_uuid = _parse_uuid(user_id)
+    menu_uuids = [u for u in map(_parse_uuid, menu_ids) if u is not None]
+    if user_uuid is None or not menu_uuids:
+        return {}
+    
+    rows = await get_pool().fetch(
+        """
+        SELECT id, title
+        FROM menus
+        WHERE user_id = $1 AND id = ANY($2::uuid[]) AND is_published
+        """,
+        user_uuid,
+        menu_uuids,
+    )
+    return {str(row["id"]): row["title"] for row in rows}
+
+
+async def list_owned_menu_summaries(
+    user_id: str,
+    limit: int,
+    after: tuple[datetime, str] | None = None,
+) -> list[MenuSummaryRecord]:
+    """
+    List summaries of menus owned by user_id, most recently updated first.
+    
+    Keyset pagination on (updated_at, id): pass the last row of the previous
+    page as `after` to get the next one. Served from the covering index
+    idx_menus_user_updated_id without touching the JSONB data column.
+    
+    Args:
+        user_id: Owner
+        limit: Maximum number of rows to return
+        after: (updated_at, id) of the last row already returned, if any
+    """
+    user_uuid = _parse_uuid(user_id)
+    if user_uuid is None:
+        return []
+    
+    if after is None:
+        rows = await get_pool().fetch(
+            """
+            SELECT id, title, is_published, updated_at
+            FROM menus
+            WHERE user_id = $1
+            ORDER BY updated_at DESC, id DESC
+            LIMIT $2
+            """,
+            user_uuid,
+            limit,
+        )
+    else:
+        after_updated_at, after_id = after
+        after_uuid = _parse_uuid(after_id)
+        if after_uuid is None:
+            return []
+        rows = await get_pool().fetch(
+            """
+            SELECT id, title, is_published, updated_at
+            FROM menus
+            WHERE user_id = $1 AND (updated_at, id) < ($2, $3)
+            ORDER BY updated_at DESC, id DESC
+            LIMIT $4
+            """,
+            user_uuid,
+            after_updated_at,
+            after_uuid,
+            limit,
+        )
+    
+    return [
+        MenuSummaryRecord(
+            id=str(row["id"]),
+            title=row["title"],
+            is_published=row["is_published"],
+            updated_at=row["updated_at"],
+        )
+        for row in rows
+    ]
@@ -0,0 +1,85 @@
+"""
+Phase-7: OCR cache repository over the `ocr_pages` table.
+Keyed by (image content hash, provider); holds the normalized text and the
+cached parse of each page.
+"""
+
+from typing import Any, TypedDict
+
+from app.db.pool import get_pool
+
+
+class OCRPageRecord(TypedDict):
+    """Row of the ocr_pages table."""
+    content_hash: str
+    text: str
+    parsed: dict[str, Any] | None
+    parser_version: int | None
+
+
+async def get_cached_pages(content_hashes: list[str], provider: str) -> dict[str, OCRPageRecord]:
+    """
+    Look up cached OCR results for several images in one query.
+    
+    Returns:
+        Mapping of content hash to record, for the hashes that are cached
+    """
+    if not content_hashes:
+        return {}
+    
+    rows = await get_pool().fetch(
+        """
+        SELECT content_hash, text, parsed, parser_version
+        FROM ocr_pages
+        WHERE provider = $1 AND content_hash = ANY($2::text[])
+        """,
+        provider,
+        content_hashes,
+    )
+    return {
+        row["content_hash"]: OCRPageRecord(
+            content_hash=row["content_hash"],
+            text=row["text"],
+            parsed=row["parsed"],
+            parser_version=row["parser_version"],
+        )
+        for row in rows
+    }
+
+
+async def save_ocr_text(content_hash: str, provider: str, text: str) -> None:
+    """Cache the OCR text of an image (an existing parse is dropped if the text changed)."""
+    await get_pool().execute(
+        """
+        INSERT INTO ocr_pages (content_hash, provider, text)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (content_hash, provider) DO UPDATE
+        SET text = EXCLUDED.text,
+            parsed = CASE WHEN ocr_pages.text = EXCLUDED.text THEN ocr_pages.parsed END,
+            parser_version = CASE WHEN ocr_pages.text = EXCLUDED.text THEN ocr_pages.parser_version END,
+            updated_at = NOW()
+        """,
+        content_hash,
+        provider,
+        text,
+    )
+
+
+async def save_page_parse(
+    content_hash: str,
+    provider: str,
+    parser_version: int,
+    parsed: dict[str, Any],
+) -> None:
+    """Cache the parse of a page whose text is already cached."""
+    await get_pool().execute(
+        """
+        UPDATE ocr_pages
+        SET parsed = $3, parser_version = $4, updated_at = NOW()
+        WHERE content_hash = $1 AND provider = $2
+        """,
+        content_hash,
+        provider,
+        parsed,
+        parser_version,
+    )
@@ -0,0 +1,76 @@
+"""
+Phase-5: asyncpg connection pool.
+Created once at application startup and shared by all requests.
+"""
+
+import json
+
+import asyncpg
+
+from app.config import get_settings
+from app.logging import logger
+
+
+class DatabaseConfigError(Exception):
+    """Raised when the database is used but DATABASE_URL is not configured."""
+    pass
+
+
+_pool: asyncpg.Pool | None = None
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Decode/encode JSON and JSONB columns as Python objects."""
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog",
+        )
+
+
+async def start_db() -> None:
+    """
+    Open the connection pool at application startup.
+    
+    Missing DATABASE_URL is logged, not raised, so the API can still start;
+    menu routes will then fail with DatabaseConfigError.
+    """
+    global _pool
+    settings = get_settings()
+    if not settings.DATABASE_URL:
+        logger.warning("Database not configured: DATABASE_URL is not set")
+        return
+    
+    _pool = await asyncpg.create_pool(
+        settings.DATABASE_URL,
+        min_size=settings.DATABASE_POOL_MIN_SIZE,
+        max_size=settings.DATABASE_POOL_MAX_SIZE,
+        init=_init_connection,
+    )
+    logger.info(
+        f"Database pool ready (min={settings.DATABASE_POOL_MIN_SIZE}, max={settings.DATABASE_POOL_MAX_SIZE})"
+    )
+
+
+async def close_db() -> None:
+    """Close the connection pool at application shutdown."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_pool() -> asyncpg.Pool:
+    """
+    Return the shared pool.
+    
+    Raises:
+        DatabaseConfigError: If the pool was not started
+    """
+    if _pool is None:
+        raise DatabaseConfigError(
+            "Database is not available. Set DATABASE_URL before using menu features."
+        )
+    return _pool
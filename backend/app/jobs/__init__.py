@@ -0,0 +1,22 @@
+"""
+Phase-7: Background jobs (OCR + parse).
+Uploads enqueue a job and return immediately; a bounded pool of in-process
+workers runs it and records progress in menu_jobs for polling.
+"""
+
+from app.jobs.ocr import FakeOCRProvider, OCRError, OCRProvider, OCRResult, get_ocr_provider
+from app.jobs.queue import JobImage, JobQueueFullError, close_jobs, enqueue_ocr_job, ensure_capacity, start_jobs
+
+__all__ = [
+    "FakeOCRProvider",
+    "JobImage",
+    "JobQueueFullError",
+    "OCRError",
+    "OCRProvider",
+    "OCRResult",
+    "close_jobs",
+    "enqueue_ocr_job",
+    "ensure_capacity",
+    "get_ocr_provider",
+    "start_jobs",
+]
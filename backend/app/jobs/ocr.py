@@ -0,0 +1,103 @@
+"""
+Phase-7: OCR provider interface.
+Providers turn one image into normalized text: one line per visual line,
+whitespace collapsed, no blank lines. The provider is chosen by
+OCR_PROVIDER; "fake" is deterministic and needs no network.
+"""
+
+import hashlib
+from functools import lru_cache
+from typing import NamedTuple, Protocol
+
+from app.config import get_settings
+
+
+class OCRResult(NamedTuple):
+    """Normalized OCR output of one image (page)."""
+    text: str
+    provider: str
+
+
+class OCRError(Exception):
+    """Raised when a provider cannot read an image."""
+    pass
+
+
+class OCRProvider(Protocol):
+    """Reads text from an image."""
+
+    name: str
+
+    async def extract_text(self, image: bytes, mime_type: str) -> OCRResult:
+        ...
+
+
+def normalize_text(raw: str) -> str:
+    """Apply the normalized OCR text format every provider must produce."""
+    lines = (" ".join(line.split()) for line in raw.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+# Pages returned by the fake provider, picked by image hash
+_FAKE_PAGES = (
+    """
+    Cafe Deluxe
+    Kahveler
+    Espresso 25
+    Americano 30
+    Latte 35
+    Tatlılar
+    Cheesecake 60
+    Brownie 55
+    """,
+    """
+    Başlangıçlar
+    Mercimek Çorbası 45
+    Humus 50
+    Ana Yemekler
+    Adana Kebap 180
+    Izgara Köfte 160
+    """,
+    """
+    Soğuk İçecekler
+    Limonata 40
+    Ayran 20
+    Soda 15
+    """,
+)
+
+
+class FakeOCRProvider:
+    """
+    Deterministic stand-in for local development and tests.
+
+    The same image bytes always produce the same page of menu text.
+    """
+
+    name = "fake"
+
+    async def extract_text(self, image: bytes, mime_type: str) -> OCRResult:
+        if not image:
+            raise OCRError("Empty image")
+        index = hashlib.sha256(image).digest()[0] % len(_FAKE_PAGES)
+        return OCRResult(text=normalize_text(_FAKE_PAGES[index]), provider=self.name)
+
+
+_PROVIDERS: dict[str, type[OCRProvider]] = {
+    FakeOCRProvider.name: FakeOCRProvider,
+}
+
+
+@lru_cache(maxsize=1)
+def get_ocr_provider() -> OCRProvider:
+    """
+    Return the configured provider (created once).
+
+    Raises:
+        OCRError: If OCR_PROVIDER names an unknown provider
+    """
+    name = get_settings().OCR_PROVIDER
+    provider_cls = _PROVIDERS.get(name)
+    if provider_cls is None:
+        raise OCRError(f"Unknown OCR provider '{name}'. Available: {', '.join(_PROVIDERS)}")
+    return provider_cls()
@@ -0,0 +1,110 @@
+"""
+Phase-7: Menu text parser.
+Turns normalized OCR text into schema v1 menu data with a line-based
+heuristic (a stand-in for the LLM parsing step; same contract):
+
+- a line ending in a price is an item ("Latte 35", "Latte ...... 35,50 TL")
+- any other line starts a category
+- a first line directly followed by another non-item line is the title
+
+Pages are parsed independently (so each page's parse can be cached by its
+text) and then merged: items at the top of a page continue the previous
+page's last category, and categories with the same name are combined.
+"""
+
+import re
+from typing import Any, NamedTuple, TypedDict
+
+from app.schemas import MenuValidationIssue, validate_menu_data
+
+
+# Bump when parsing rules change; cached page parses of older versions are ignored
+PARSER_VERSION = 1
+
+_ITEM_LINE = re.compile(
+    r"^(?P<name>.*?\S)[\s.·:-]*(?P<price>\d+(?:[.,]\d{1,2})?)\s*(?:TL|₺)?$",
+    re.IGNORECASE,
+)
+
+DEFAULT_CATEGORY = "Menü"
+
+
+class PageParse(TypedDict):
+    """Parse of a single page, before merging."""
+    title: str | None
+    leading_items: list[dict[str, Any]]  # Items before the page's first category
+    categories: list[dict[str, Any]]
+
+
+class ParseResult(NamedTuple):
+    """Parsed menu data and any schema issues (data is flagged if issues exist)."""
+    data: dict[str, Any]
+    item_count: int
+    issues: list[MenuValidationIssue]
+
+
+def _parse_price(text: str) -> int | float:
+    value = float(text.replace(",", "."))
+    return int(value) if value.is_integer() else value
+
+
+def parse_page(text: str) -> PageParse:
+    """Parse one page of normalized OCR text."""
+    lines = [line for line in text.splitlines() if line]
+    page = PageParse(title=None, leading_items=[], categories=[])
+
+    for i, line in enumerate(lines):
+        match = _ITEM_LINE.match(line)
+        if match is None:
+            next_is_header = i + 1 < len(lines) and _ITEM_LINE.match(lines[i + 1]) is None
+            if i == 0 and next_is_header:
+                page["title"] = line
+            else:
+                page["categories"].append({"name": line, "items": []})
+            continue
+
+        item = {"name": match["name"], "price": _parse_price(match["price"])}
+        if page["categories"]:
+            page["categories"][-1]["items"].append(item)
+        else:
+            page["leading_items"].append(item)
+
+    return page
+
+
+def merge_pages(pages: list[PageParse]) -> ParseResult:
+    """
+    Merge page parses, in page order, into one menu.
+
+    Returns:
+        ParseResult; a result without items or with issues is best-effort
+        partial data that must not be saved as-is
+    """
+    data: dict[str, Any] = {"schema_version": 1, "categories": []}
+    categories: list[dict[str, Any]] = []
+    by_name: dict[str, dict[str, Any]] = {}
+
+    def category(name: str) -> dict[str, Any]:
+        if name not in by_name:
+            by_name[name] = {"name": name, "items": []}
+            categories.append(by_name[name])
+        return by_name[name]
+
+    for index, page in enumerate(pages):
+        if index == 0 and page["title"]:
+            data["title"] = page["title"]
+        if page["leading_items"]:
+            target = categories[-1] if categories else category(DEFAULT_CATEGORY)
+            target["items"].extend(page["leading_items"])
+        for parsed in page["categories"]:
+            category(parsed["name"])["items"].extend(parsed["items"])
+
+    # Headers without items (e.g. page footers) are noise
+    data["categories"] = [c for c in categories if c["items"]]
+    item_count = sum(len(c["items"]) for c in data["categories"])
+    return ParseResult(data=data, item_count=item_count, issues=validate_menu_data(data))
+
+
+def parse_menu_text(pages: list[str]) -> ParseResult:
+    """Parse and merge normalized OCR pages into one menu."""
+    return merge_pages([parse_page(text) for text in pages])
@@ -0,0 +1,318 @@
+"""
+Phase-7: In-process job queue.
+Job state lives in menu_jobs; this module only holds queued job IDs and a
+fixed number of worker tasks, so at most JOB_WORKERS jobs run at once per
+API process and request latency never depends on OCR time.
+
+A running job holds a lease: its worker bumps updated_at every quarter
+of JOB_LEASE_SECONDS. If the process dies (crash, SIGKILL) the lease
+expires, and the next recovery pass (at startup, then every lease period,
+in any process) puts the job back in the queue, or fails it after
+JOB_MAX_ATTEMPTS claims.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, TypedDict
+
+from app.config import get_settings
+from app.db import jobs as jobs_repo
+from app.db import menus as menus_repo
+from app.db import ocr as ocr_repo
+from app.db.jobs import JobRecord
+from app.db.ocr import OCRPageRecord
+from app.db.menus import VersionConflictError
+from app.jobs.ocr import OCRError, get_ocr_provider
+from app.jobs.parser import PARSER_VERSION, PageParse, merge_pages, parse_page
+from app.logging import logger
+from app.publishing import sync_public_menu
+from app.storage import download_object
+
+
+OCR_JOB = "ocr_parse"
+
+
+class JobImage(TypedDict):
+    """One page of an OCR job, in page order."""
+    path: str
+    # SHA-256 computed by the server (the path is content-addressed); None
+    # otherwise (direct uploads, legacy originals): the job hashes the bytes
+    content_hash: str | None
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many jobs are already waiting."""
+    pass
+
+
+class JobFailedError(Exception):
+    """Raised inside a job to fail it with a message (and optional result)."""
+
+    def __init__(self, message: str, result: dict[str, Any] | None = None) -> None:
+        super().__init__(message)
+        self.result = result
+
+
+_queue: asyncio.Queue[str] | None = None
+_workers: list[asyncio.Task[None]] = []
+_reaper: asyncio.Task[None] | None = None
+
+
+async def _recover_expired() -> int:
+    """Re-queue (or fail) jobs whose lease expired; queue them here."""
+    settings = get_settings()
+    requeued, failed = await jobs_repo.recover_expired_jobs(
+        settings.JOB_LEASE_SECONDS, settings.JOB_MAX_ATTEMPTS
+    )
+    if requeued or failed:
+        logger.warning(f"Recovered jobs with an expired lease: requeued={len(requeued)}, failed={failed}")
+    if _queue is not None:
+        for job_id in requeued:
+            _queue.put_nowait(job_id)
+    return len(requeued)
+
+
+async def _reap_loop() -> None:
+    interval = get_settings().JOB_LEASE_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await _recover_expired()
+        except Exception as e:
+            logger.warning(f"Could not recover expired jobs: {e}")
+
+
+async def start_jobs() -> None:
+    """Start worker tasks and re-queue jobs left over from a previous run."""
+    global _queue, _reaper
+    settings = get_settings()
+    _queue = asyncio.Queue()
+    _workers.extend(
+        asyncio.create_task(_worker(), name=f"job-worker-{i}")
+        for i in range(settings.JOB_WORKERS)
+    )
+
+    try:
+        # Expired leases first: those jobs are then listed as queued below
+        await _recover_expired()
+        pending = await jobs_repo.list_queued_job_ids()
+    except Exception as e:
+        logger.warning(f"Could not recover queued jobs: {e}")
+        pending = []
+    # _recover_expired already queued its jobs, but a duplicate ID is
+    # harmless: claim_job only succeeds while the job is queued
+    for job_id in pending:
+        _queue.put_nowait(job_id)
+    _reaper = asyncio.create_task(_reap_loop(), name="job-reaper")
+    logger.info(f"Job workers ready (workers={settings.JOB_WORKERS}, recovered={len(pending)})")
+
+
+async def close_jobs() -> None:
+    """Stop workers; a job interrupted mid-run is put back in the queue."""
+    global _queue, _reaper
+    tasks = [*_workers, *([_reaper] if _reaper is not None else [])]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _workers.clear()
+    _reaper = None
+    _queue = None
+
+
+def ensure_capacity() -> None:
+    """
+    Check that a new job can be accepted (call before creating anything).
+
+    Raises:
+        JobQueueFullError: If JOB_QUEUE_MAX_PENDING jobs are already waiting
+        RuntimeError: If the queue was not started
+    """
+    if _queue is None:
+        raise RuntimeError("Job queue is not running")
+    if _queue.qsize() >= get_settings().JOB_QUEUE_MAX_PENDING:
+        raise JobQueueFullError("Too many jobs are waiting")
+
+
+async def enqueue_ocr_job(
+    menu_id: str,
+    user_id: str,
+    images: list[JobImage],
+    expected_version: int,
+) -> JobRecord:
+    """
+    Create an OCR + parse job for a menu's images and queue it.
+
+    Args:
+        images: Pages in order
+        expected_version: Menu version the result may overwrite; if the menu
+            is edited meanwhile, the job fails instead of clobbering the edit
+    """
+    ensure_capacity()
+    job = await jobs_repo.create_job(
+        menu_id,
+        user_id,
+        OCR_JOB,
+        {"images": images, "expected_version": expected_version},
+    )
+    if _queue is not None:
+        _queue.put_nowait(job["id"])
+    logger.info(f"Queued job {job['id']}: kind={OCR_JOB}, menu_id={menu_id}, images={len(images)}")
+    return job
+
+
+async def _worker() -> None:
+    assert _queue is not None
+    queue = _queue
+    while True:
+        job_id = await queue.get()
+        try:
+            await _run(job_id)
+        except Exception as e:
+            logger.error(f"Job {job_id} crashed: {e}")
+        finally:
+            queue.task_done()
+
+
+async def _run(job_id: str) -> None:
+    job = await jobs_repo.claim_job(job_id)
+    if job is None:
+        return  # Claimed by another process, or no longer queued
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    heartbeat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        result = await _run_ocr_job(job)
+    except asyncio.CancelledError:
+        await asyncio.shield(jobs_repo.requeue_job(job_id))
+        raise
+    except JobFailedError as e:
+        logger.warning(f"Job {job_id} failed: {e}")
+        await jobs_repo.finish_job(job_id, "failed", result=e.result, error=str(e))
+        return
+    except Exception as e:
+        logger.error(f"Job {job_id} failed unexpectedly: {e}")
+        await jobs_repo.finish_job(job_id, "failed", error="Processing failed. Please try again.")
+        return
+    finally:
+        heartbeat.cancel()
+
+    await jobs_repo.finish_job(job_id, "succeeded", result=result)
+    logger.info(
+        f"Job {job_id} succeeded",
+        extra={"job_id": job_id, "menu_id": job["menu_id"], "duration_ms": round((loop.time() - started) * 1000, 1)},
+    )
+
+
+async def _heartbeat(job_id: str) -> None:
+    """Renew a running job's lease until cancelled."""
+    interval = get_settings().JOB_LEASE_SECONDS / 4
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await jobs_repo.touch_job(job_id)
+        except Exception as e:
+            logger.warning(f"Job {job_id}: heartbeat failed: {e}")
+
+
+async def _ocr_page(image: JobImage, provider_name: str) -> tuple[OCRPageRecord, bool]:
+    """
+    OCR one image and cache the text.
+
+    Images without a trusted hash are hashed here, from the downloaded
+    bytes, and looked up in the cache before running OCR.
+
+    Returns:
+        (page record, whether OCR ran)
+    """
+    data = await download_object(image["path"])
+    if data is None:
+        raise JobFailedError(f"Image {image['path']} is missing from storage")
+    content_hash = image["content_hash"]
+    if content_hash is None:
+        content_hash = hashlib.sha256(data).hexdigest()
+        cached = await ocr_repo.get_cached_pages([content_hash], provider_name)
+        if content_hash in cached:
+            return cached[content_hash], False
+    try:
+        ocr = await get_ocr_provider().extract_text(data, _mime_type(image["path"]))
+    except OCRError as e:
+        raise JobFailedError(f"OCR failed for {image['path']}: {e}")
+    await ocr_repo.save_ocr_text(content_hash, provider_name, ocr.text)
+    return OCRPageRecord(content_hash=content_hash, text=ocr.text, parsed=None, parser_version=None), True
+
+
+async def _run_ocr_job(job: JobRecord) -> dict[str, Any]:
+    """
+    OCR and parse every page, merge, and save it as the menu's data.
+
+    Both steps go through the ocr_pages cache, so a re-run after adding or
+    replacing one page only OCRs and parses that page.
+    """
+    images: list[JobImage] = job["payload"]["images"]
+    provider = get_ocr_provider()
+
+    cached = await ocr_repo.get_cached_pages(
+        [image["content_hash"] for image in images if image["content_hash"]],
+        provider.name,
+    )
+
+    pages: list[PageParse] = []
+    texts: list[str] = []
+    ocr_runs = parse_runs = 0
+    for i, image in enumerate(images):
+        record = cached.get(image["content_hash"] or "")
+        if record is None:
+            await jobs_repo.update_progress(
+                job["id"], f"ocr {i + 1}/{len(images)}", int(80 * i / len(images))
+            )
+            record, ocr_ran = await _ocr_page(image, provider.name)
+            ocr_runs += ocr_ran
+        content_hash, text = record["content_hash"], record["text"]
+        parsed = record["parsed"] if record["parser_version"] == PARSER_VERSION else None
+
+        if parsed is None:
+            parsed = parse_page(text)
+            await ocr_repo.save_page_parse(content_hash, provider.name, PARSER_VERSION, parsed)
+            parse_runs += 1
+        pages.append(PageParse(**parsed))
+        texts.append(text)
+
+    logger.info(
+        f"Job {job['id']}: pages={len(images)}, ocr_runs={ocr_runs}, parse_runs={parse_runs}",
+        extra={"job_id": job["id"], "menu_id": job["menu_id"]},
+    )
+
+    await jobs_repo.update_progress(job["id"], "merge", 90)
+    merged = merge_pages(pages)
+    if merged.item_count == 0 or merged.issues:
+        # Raw OCR + best-effort partial JSON, flagged, per the parsing rules
+        raise JobFailedError(
+            "Could not recognize a menu in the images",
+            result={"partial": True, "data": merged.data, "ocr_text": texts, "issues": merged.issues},
+        )
+
+    await jobs_repo.update_progress(job["id"], "save", 95)
+    try:
+        menu = await menus_repo.replace_menu_data(
+            job["menu_id"],
+            job["user_id"],
+            merged.data,
+            expected_version=job["payload"]["expected_version"],
+        )
+    except VersionConflictError:
+        raise JobFailedError(
+            "Menu was edited while it was being processed",
+            result={"partial": False, "data": merged.data},
+        )
+    if menu is None:
+        raise JobFailedError("Menu no longer exists")
+    # Same post-write hook as PUT/PATCH: a published menu's snapshot follows
+    await sync_public_menu(menu)
+
+    return {"menu_id": job["menu_id"], "version": menu["version"], "data": merged.data}
+
+
+def _mime_type(path: str) -> str:
+    extension = path.rsplit(".", 1)[-1].lower()
+    return {"png": "image/png", "webp": "image/webp"}.get(extension, "image/jpeg")
@@ -1,15 +1,109 @@
 """
 Centralized logging configuration.
 Phase-1: Structured JSON output, no print() usage.
+
+Records are serialized with json.dumps (messages may contain any
+character) and handed to a background thread through a queue, so logging
+from a request never blocks the event loop on stdout. Request-scoped
+fields (request id, user prefix) come from context variables; call sites
+add their own via `extra`:
+
+    logger.info("Stored image", extra={"menu_id": menu_id, "duration_ms": 12.3})
 """
 
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
 from app.config import get_settings
 
 
+# Set per request (middleware) and per authenticated user (auth dependency)
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+user_var: ContextVar[str | None] = ContextVar("user", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, message, module, context and extras."""
+
+    def __init__(self) -> None:
+        super().__init__(datefmt="%Y-%m-%dT%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "module": record.module,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Copy request-scoped context onto the record (runs in the caller's context)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.user = user_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of INFO/DEBUG records per module.
+
+    Rates map a module (e.g. "supabase") or logger name to the fraction
+    kept; warnings and errors are never dropped.
+    """
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rates.get(record.module, self.rates.get(record.name))
+        return rate is None or random.random() < rate
+
+
+class _JSONQueueHandler(QueueHandler):
+    """Enqueue records as-is; formatting happens on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve args now (they may be mutated later) but keep the record
+        # structured instead of pre-formatting it like QueueHandler does
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: QueueListener | None = None
+
+
 def setup_logging() -> logging.Logger:
     """Configure and return the application logger."""
+    global _listener
     settings = get_settings()
 
     # Create logger
@@ -20,17 +114,22 @@ def setup_logging() -> logging.Logger:
     if logger.handlers:
         return logger
 
-    # Console handler with structured format
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(settings.LOG_LEVEL.upper())
-
-    # Structured log format
-    formatter = logging.Formatter(
-        fmt='{"time": "%(asctime)s", "level": "%(levelname)s", "message": "%(message)s", "module": "%(module)s"}',
-        datefmt="%Y-%m-%dT%H:%M:%S"
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    # stdout is written only by the listener thread
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
+
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = _JSONQueueHandler(records)
+    queue_handler.setLevel(settings.LOG_LEVEL.upper())
+    queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+    queue_handler.addFilter(ContextFilter())
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = QueueListener(records, stream_handler, respect_handler_level=False)
+    _listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(_listener.stop)
 
     return logger
 
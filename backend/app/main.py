@@ -7,14 +7,60 @@ Phase-1: Single instance, CORS, health endpoint only.
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+import math
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import get_settings
 from app.logging import logger
 from app.api.health import router as health_router
 from app.api.menus import router as menus_router
 from app.api.images import router as images_router
+from app.api.public import router as public_router
+from app.api.jobs import router as jobs_router
+from app.api.qr import router as qr_router
+from app.api.metrics import router as metrics_router
+from app.auth.jwt import close_jwks, start_jwks
+from app.cache.shared import close_shared_cache, start_shared_cache
+from app.db import DatabaseConfigError, close_db, start_db
+from app.jobs import close_jobs, start_jobs
+from app.media.pipeline import close_pipeline, start_pipeline
+from app.middleware import (
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    RequestIdMiddleware,
+    UploadAdmissionMiddleware,
+)
+from app.resilience import CircuitOpenError
+from app.storage import close_storage, start_storage
+from app.uploads import close_uploads, start_uploads
+from app.workers import close_workers, start_workers
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open shared resources on startup and release them on shutdown."""
+    await start_db()
+    await start_storage()
+    await start_shared_cache()
+    await start_jwks()
+    await start_workers()
+    await start_pipeline()
+    await start_jobs()
+    await start_uploads()
+    yield
+    await close_uploads()
+    await close_jobs()
+    await close_pipeline()
+    await close_workers()
+    await close_jwks()
+    await close_shared_cache()
+    await close_storage()
+    await close_db()
 
 
 def create_app() -> FastAPI:
@@ -24,9 +70,13 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Dijital Menum API",
         description="QR Code Menu MVP - Phase 1",
-        version="0.1.0"
+        version="0.1.0",
+        lifespan=lifespan,
     )
 
+    # Innermost, so early rejections still get CORS headers
+    app.add_middleware(UploadAdmissionMiddleware)
+
     # CORS configuration - no wildcards
     allowed_origins = [settings.FRONTEND_ORIGIN]
 
@@ -41,14 +91,47 @@ def create_app() -> FastAPI:
         CORSMiddleware,
         allow_origins=allowed_origins,
         allow_credentials=True,
-        allow_methods=["GET", "POST", "PUT", "DELETE"],
+        allow_methods=["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"],
         allow_headers=["*"],
+        expose_headers=["ETag", "Location", "Retry-After", "Upload-Length", "Upload-Offset", "X-Request-ID"],
     )
 
+    # Opt-in; not installed at all unless configured
+    if settings.PROFILING_TOKEN or settings.PROFILING_SAMPLE_RATE > 0:
+        app.add_middleware(ProfilingMiddleware)
+
+    # Latency is measured around everything but the request id assignment
+    app.add_middleware(MetricsMiddleware)
+
+    # Outermost: every log line of a request carries its id
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.exception_handler(DatabaseConfigError)
+    async def database_config_error_handler(request: Request, exc: DatabaseConfigError) -> JSONResponse:
+        logger.error(f"Database configuration error: {exc}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Database is not configured. Please contact support."},
+        )
+
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open_handler(request: Request, exc: CircuitOpenError) -> JSONResponse:
+        # Fail fast while an upstream is down instead of waiting out its timeout
+        logger.warning(f"Request failed fast: {exc}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "A backing service is temporarily unavailable. Please retry shortly."},
+            headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        )
+
     # Include routers
     app.include_router(health_router)
     app.include_router(menus_router)  # Phase-2: Menu routes with auth
     app.include_router(images_router)  # Phase-4: Image upload
+    app.include_router(public_router)  # Phase-6: Public menu reads
+    app.include_router(jobs_router)  # Phase-7: Background job status
+    app.include_router(qr_router)  # QR codes for published menus
+    app.include_router(metrics_router)  # Prometheus scrape endpoint
 
     logger.info(f"Application started in {settings.ENV} mode")
 
@@ -0,0 +1,13 @@
+"""
+Image handling helpers.
+Header sniffing and size-limited streaming for uploaded images.
+"""
+
+from app.media.validation import (
+    ImageInfo,
+    ImageTooLargeError,
+    LimitedStream,
+    sniff_image,
+)
+
+__all__ = ["ImageInfo", "ImageTooLargeError", "LimitedStream", "sniff_image"]
@@ -0,0 +1,64 @@
+"""
+Resized WebP derivatives of uploaded images.
+Pure CPU work with no application imports, so it can run in a spawned
+worker process (see app.workers) without loading settings or I/O clients.
+"""
+
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+
+# Fixed derivative widths in pixels (phone list view, phone detail, desktop)
+DERIVATIVE_WIDTHS = (320, 640, 1280)
+
+WEBP_QUALITY = 80
+
+# Same bound as upload validation; Pillow refuses anything larger
+Image.MAX_IMAGE_PIXELS = 40_000_000
+
+
+def derivative_path(original_path: str, width: int) -> str:
+    """Storage path of a derivative: menus/{menu_id}/{name}_w{width}.webp"""
+    stem = original_path.rsplit(".", 1)[0]
+    return f"{stem}_w{width}.webp"
+
+
+def render_derivatives(original: bytes, widths: tuple[int, ...] = DERIVATIVE_WIDTHS) -> dict[int, bytes]:
+    """
+    Decode an image once and encode a WebP per target width.
+
+    Widths above the original are clamped to it (images are never
+    upscaled); widths that clamp to the same size share the same bytes.
+
+    Args:
+        original: Encoded JPEG, PNG or WebP bytes
+        widths: Target widths in pixels
+
+    Returns:
+        Mapping of requested width to WebP bytes
+    """
+    with Image.open(BytesIO(original)) as image:
+        # JPEG: let the decoder downscale by 1/2..1/8 while decoding
+        image.draft("RGB", (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(image)
+        mode = "RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB"
+        image = image.convert(mode)
+
+    encoded: dict[int, bytes] = {}
+    by_size: dict[tuple[int, int], bytes] = {}
+    source = image
+    # Largest first, each step resizing the previous result (cheaper than
+    # resizing the full original every time)
+    for width in sorted(set(widths), reverse=True):
+        target_width = min(width, image.width)
+        size = (target_width, max(1, round(image.height * target_width / image.width)))
+        if size not in by_size:
+            if source.size != size:
+                source = source.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            buffer = BytesIO()
+            source.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+            by_size[size] = buffer.getvalue()
+        encoded[width] = by_size[size]
+
+    return {width: encoded[width] for width in widths}
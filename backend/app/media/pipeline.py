@@ -0,0 +1,113 @@
+"""
+Post-upload derivative pipeline.
+After an upload is stored, the original is fetched back, resized into WebP
+derivatives in the worker process pool and written next to it; the result
+is recorded in menu_images. Runs detached from the upload request.
+
+A task cut off by a shutdown or crash leaves its row 'pending'; a sweep
+(at startup, then every DERIVATIVE_STALE_SECONDS) reschedules rows that
+stayed pending that long. Generation is idempotent (upserts), so a
+duplicate run only costs time.
+"""
+
+import asyncio
+import time
+
+from app.config import get_settings
+from app.db import images as images_repo
+from app.logging import logger
+from app.media.derivatives import DERIVATIVE_WIDTHS, derivative_path, render_derivatives
+from app.storage import download_object, put_object
+from app.workers import run_in_process, spawn_background
+
+
+_RECOVERY_BATCH = 100  # Originals rescheduled per sweep
+
+_sweeper: asyncio.Task[None] | None = None
+
+
+def schedule_derivatives(menu_id: str, path: str) -> None:
+    """Queue derivative generation for a stored original (returns immediately)."""
+    spawn_background(_generate(menu_id, path), name=f"derivatives:{path}")
+
+
+async def _generate(menu_id: str, path: str) -> None:
+    started = time.perf_counter()
+    try:
+        original = await download_object(path)
+        if original is None:
+            raise FileNotFoundError(f"Original {path} not found in storage")
+
+        rendered = await run_in_process(render_derivatives, original, DERIVATIVE_WIDTHS)
+
+        # Widths clamped to the original size share one object
+        paths: dict[str, str] = {}
+        uploads: dict[str, bytes] = {}
+        for width, body in rendered.items():
+            first_width = next(w for w, b in rendered.items() if b is body)
+            paths[str(width)] = derivative_path(path, first_width)
+            uploads[paths[str(width)]] = body
+        await asyncio.gather(*(
+            put_object(object_path, body, "image/webp", upsert=True)
+            for object_path, body in uploads.items()
+        ))
+        await images_repo.mark_derivatives_ready(path, paths)
+    except Exception as e:
+        logger.error(f"Derivatives failed for {path}: {e}", extra={"menu_id": menu_id})
+        try:
+            await images_repo.mark_derivatives_failed(path)
+        except Exception as db_error:
+            logger.error(f"Could not record derivative failure for {path}: {db_error}")
+        return
+
+    duration_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        f"Derivatives ready for {path}",
+        extra={
+            "menu_id": menu_id,
+            "original_bytes": len(original),
+            "webp_bytes": sum(len(b) for b in uploads.values()),
+            "duration_ms": round(duration_ms, 1),
+        },
+    )
+
+
+async def _reschedule_stale() -> None:
+    stale_seconds = get_settings().DERIVATIVE_STALE_SECONDS
+    while True:
+        stale = await images_repo.claim_stale_pending(stale_seconds, _RECOVERY_BATCH)
+        for menu_id, path in stale:
+            schedule_derivatives(menu_id, path)
+        if stale:
+            logger.warning(f"Rescheduled {len(stale)} stale pending derivative(s)")
+        if len(stale) < _RECOVERY_BATCH:
+            return
+        # Let this batch through the worker pool before claiming more
+        await asyncio.sleep(stale_seconds / 10)
+
+
+async def _sweep_loop() -> None:
+    while True:
+        try:
+            await _reschedule_stale()
+        except Exception as e:
+            logger.warning(f"Could not reschedule stale derivatives: {e}")
+        await asyncio.sleep(get_settings().DERIVATIVE_STALE_SECONDS)
+
+
+async def start_pipeline() -> None:
+    """Start rescheduling derivatives left pending by a previous run."""
+    global _sweeper
+    _sweeper = asyncio.create_task(_sweep_loop(), name="derivative-recovery")
+
+
+async def close_pipeline() -> None:
+    """Stop the recovery sweep (in-flight derivatives are cancelled by close_workers)."""
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        try:
+            await _sweeper
+        except asyncio.CancelledError:
+            pass
+        _sweeper = None
@@ -0,0 +1,143 @@
+"""
+Streaming image validation.
+Identifies images by magic bytes and reads pixel dimensions from the header,
+so files can be rejected from their first chunk without reading the body.
+"""
+
+import struct
+from typing import AsyncIterator, NamedTuple, Protocol
+
+
+# First chunk read from each upload; large enough for typical JPEG EXIF headers
+SNIFF_BYTES = 64 * 1024
+
+# Chunk size used when piping an upload into storage
+STREAM_CHUNK_BYTES = 256 * 1024
+
+
+class ImageInfo(NamedTuple):
+    """Format and dimensions detected from an image header."""
+    format: str  # jpeg, png, webp
+    mime_type: str
+    extension: str
+    width: int | None
+    height: int | None
+
+
+class ImageTooLargeError(Exception):
+    """Raised while streaming when a file exceeds its byte limit."""
+    pass
+
+
+class AsyncReadable(Protocol):
+    """Anything with an async read(size) method, e.g. UploadFile."""
+    async def read(self, size: int = -1) -> bytes: ...
+
+
+def _sniff_png(head: bytes) -> ImageInfo | None:
+    if not head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return None
+    width = height = None
+    # IHDR is always the first chunk: length(4) type(4) width(4) height(4)
+    if len(head) >= 24 and head[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", head[16:24])
+    return ImageInfo("png", "image/png", "png", width, height)
+
+
+def _sniff_webp(head: bytes) -> ImageInfo | None:
+    if len(head) < 12 or head[0:4] != b"RIFF" or head[8:12] != b"WEBP":
+        return None
+    width = height = None
+    chunk = head[12:16]
+    if chunk == b"VP8 " and len(head) >= 30:
+        # Lossy: 14-bit dimensions after the 3-byte frame tag and start code
+        w, h = struct.unpack("<HH", head[26:30])
+        width, height = w & 0x3FFF, h & 0x3FFF
+    elif chunk == b"VP8L" and len(head) >= 25:
+        # Lossless: 14-bit (width - 1) and (height - 1) packed after signature byte
+        bits = int.from_bytes(head[21:25], "little")
+        width, height = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    elif chunk == b"VP8X" and len(head) >= 30:
+        # Extended: 24-bit (width - 1) and (height - 1)
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+    return ImageInfo("webp", "image/webp", "webp", width, height)
+
+
+# Start-of-frame markers carry dimensions; C4 (DHT), C8 (JPG), CC (DAC) do not
+_JPEG_SOF_MARKERS = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF,
+}
+
+
+def _sniff_jpeg(head: bytes) -> ImageInfo | None:
+    if not head.startswith(b"\xff\xd8\xff"):
+        return None
+    width = height = None
+    pos = 2
+    # Walk marker segments until a start-of-frame or the end of the chunk
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            break
+        marker = head[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        if marker == 0xD8 or 0xD0 <= marker <= 0xD7:  # Standalone markers
+            pos += 2
+            continue
+        (length,) = struct.unpack(">H", head[pos + 2:pos + 4])
+        if marker in _JPEG_SOF_MARKERS:
+            if pos + 9 <= len(head):
+                height, width = struct.unpack(">HH", head[pos + 5:pos + 9])
+            break
+        if marker == 0xDA:  # Start of scan: no SOF before image data
+            break
+        pos += 2 + length
+    return ImageInfo("jpeg", "image/jpeg", "jpg", width, height)
+
+
+def sniff_image(head: bytes) -> ImageInfo | None:
+    """
+    Identify an image from its first bytes.
+    
+    Args:
+        head: Leading bytes of the file (SNIFF_BYTES is enough in practice)
+        
+    Returns:
+        ImageInfo for JPEG, PNG or WebP content, or None if the bytes are not
+        one of the supported formats. Width/height are None when the header
+        does not fit in the given bytes.
+    """
+    return _sniff_jpeg(head) or _sniff_png(head) or _sniff_webp(head)
+
+
+class LimitedStream:
+    """
+    Async byte stream over a readable that enforces a maximum size.
+    
+    Yields an already-read head first, then the rest of the source in
+    fixed-size chunks, so only one chunk is held in memory at a time.
+    Raises ImageTooLargeError as soon as more than max_bytes were read.
+    """
+
+    def __init__(self, source: AsyncReadable, head: bytes, max_bytes: int) -> None:
+        self.source = source
+        self.head = head
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def _count(self, chunk: bytes) -> bytes:
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self.max_bytes:
+            raise ImageTooLargeError(
+                f"File exceeds {self.max_bytes} bytes"
+            )
+        return chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        if self.head:
+            yield self._count(self.head)
+        while chunk := await self.source.read(STREAM_CHUNK_BYTES):
+            yield self._count(chunk)
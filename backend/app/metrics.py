@@ -0,0 +1,82 @@
+"""
+Prometheus metrics.
+Metric objects live here so any module can record into them; the HTTP
+middleware (app.middleware.metrics) and the /metrics endpoint read the
+default registry. Label values are bounded: routes are path templates,
+never raw paths.
+"""
+
+from typing import AsyncIterable
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+# Seconds; covers cached reads (sub-ms) up to slow multi-file uploads
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route"],
+    buckets=_LATENCY_BUCKETS,
+)
+HTTP_REQUESTS = Counter(
+    "http_requests",
+    "HTTP responses by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+    ["method"],
+)
+
+JWT_VERIFY_DURATION = Histogram(
+    "jwt_verify_duration_seconds",
+    "verify_supabase_jwt latency by outcome (cached, verified, rejected).",
+    ["outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+STORAGE_UPLOAD_DURATION = Histogram(
+    "storage_upload_duration_seconds",
+    "upload_file latency, including streaming the request body.",
+    ["outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections",
+    "Requests refused before any work was done, by reason.",
+    ["reason"],
+)
+UPLOAD_BYTES_IN_FLIGHT = Gauge(
+    "upload_bytes_in_flight",
+    "Declared upload bytes currently admitted.",
+)
+CIRCUIT_STATE = Gauge(
+    "circuit_breaker_state",
+    "Outbound circuit breaker state (0 closed, 1 half-open, 2 open).",
+    ["breaker"],
+)
+CIRCUIT_REJECTIONS = Counter(
+    "circuit_breaker_rejections",
+    "Outbound calls failed fast because the circuit was open.",
+    ["breaker"],
+)
+OUTBOUND_RETRIES = Counter(
+    "outbound_retries",
+    "Retried outbound call attempts, by upstream.",
+    ["breaker"],
+)
+STORAGE_BYTES = Counter(
+    "storage_bytes",
+    "Bytes transferred to and from object storage.",
+    ["direction"],
+)
+
+
+async def count_uploaded(chunks: AsyncIterable[bytes]) -> AsyncIterable[bytes]:
+    """Pass a streamed upload body through, counting bytes as they are sent."""
+    counter = STORAGE_BYTES.labels("upload")
+    async for chunk in chunks:
+        counter.inc(len(chunk))
+        yield chunk
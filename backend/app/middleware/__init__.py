@@ -0,0 +1,17 @@
+"""
+ASGI middleware.
+Plain ASGI (not BaseHTTPMiddleware), so streaming responses pass through
+untouched and no extra task is created per request.
+"""
+
+from app.middleware.admission import UploadAdmissionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.request_id import RequestIdMiddleware
+
+__all__ = [
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+    "RequestIdMiddleware",
+    "UploadAdmissionMiddleware",
+]
@@ -0,0 +1,128 @@
+"""
+Admission control for uploads.
+Runs before the request body is read, so excess uploads are refused
+without spooling up to 25MB first:
+
+- per user: token bucket keyed by the JWT subject (429 + Retry-After)
+- per process: cap on upload bytes in flight, sized by Content-Length
+  (503 + Retry-After)
+
+Resumable upload chunks (PATCH) count against the byte cap only: the
+session that receives them was rate limited when it was created, and a
+client resuming after a dropped connection must not be throttled for it.
+
+Everything else, including the public read path, passes straight through.
+"""
+
+import math
+import re
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.admission import ByteBudget, RateLimiter
+from app.auth.jwt import verify_supabase_jwt
+from app.config import get_settings
+from app.logging import logger, user_var
+from app.metrics import ADMISSION_REJECTIONS, UPLOAD_BYTES_IN_FLIGHT
+
+
+# POST routes that carry image bodies or start a resumable upload
+_UPLOAD_ROUTES = re.compile(r"^/api/menus/(?:[^/]+/(?:images|uploads))?$")
+
+# PATCH route that appends a chunk to a resumable upload
+_CHUNK_ROUTE = re.compile(r"^/api/menus/[^/]+/uploads/[^/]+$")
+
+# Reserved when Content-Length is absent: 5 files x 5MB plus multipart framing
+_UNKNOWN_LENGTH_BYTES = 26 * 1024 * 1024
+
+# Reserved for a chunk without Content-Length: a whole (5MB) image
+_UNKNOWN_CHUNK_BYTES = 5 * 1024 * 1024
+
+
+def _bearer_token(scope: Scope) -> str | None:
+    authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
+
+
+def _content_length(scope: Scope) -> int | None:
+    value = dict(scope["headers"]).get(b"content-length")
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class UploadAdmissionMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        settings = get_settings()
+        self.limiter = RateLimiter(
+            rate=settings.UPLOAD_RATE_PER_MINUTE / 60,
+            burst=settings.UPLOAD_BURST,
+        )
+        self.budget = ByteBudget(settings.UPLOAD_MAX_INFLIGHT_BYTES)
+        self.busy_retry_after = settings.UPLOAD_BUSY_RETRY_AFTER_SECONDS
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] == "PATCH" and _CHUNK_ROUTE.match(scope["path"]):
+            await self._admit_bytes(scope, receive, send, _content_length(scope) or _UNKNOWN_CHUNK_BYTES)
+            return
+        if scope["method"] != "POST" or not _UPLOAD_ROUTES.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        token = _bearer_token(scope)
+        if token is None:
+            # The route's auth dependency answers with the usual 401
+            await self.app(scope, receive, send)
+            return
+        try:
+            user_id = (await verify_supabase_jwt(token)).get("sub")
+        except HTTPException as e:
+            await JSONResponse({"detail": e.detail}, e.status_code, e.headers)(scope, receive, send)
+            return
+        if not user_id:
+            await self.app(scope, receive, send)
+            return
+        user_var.set(user_id[:8])
+
+        wait = self.limiter.acquire(user_id)
+        if wait:
+            ADMISSION_REJECTIONS.labels("user_rate").inc()
+            logger.warning(f"Upload rate limit hit for user {user_id[:8]}...")
+            await self._reject(scope, receive, send, 429, "Too many uploads. Please slow down.", wait)
+            return
+
+        await self._admit_bytes(scope, receive, send, _content_length(scope) or _UNKNOWN_LENGTH_BYTES)
+
+    async def _admit_bytes(self, scope: Scope, receive: Receive, send: Send, size: int) -> None:
+        if not self.budget.try_reserve(size):
+            ADMISSION_REJECTIONS.labels("inflight_bytes").inc()
+            logger.warning(f"Upload shed: {self.budget.in_flight} bytes in flight, {size} requested")
+            await self._reject(
+                scope, receive, send, 503, "Server is busy with other uploads. Please retry shortly.",
+                self.busy_retry_after,
+            )
+            return
+
+        UPLOAD_BYTES_IN_FLIGHT.inc(size)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.budget.release(size)
+            UPLOAD_BYTES_IN_FLIGHT.dec(size)
+
+    @staticmethod
+    async def _reject(
+        scope: Scope, receive: Receive, send: Send, status_code: int, detail: str, retry_after: float
+    ) -> None:
+        headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+        await JSONResponse({"detail": detail}, status_code, headers)(scope, receive, send)
@@ -0,0 +1,48 @@
+"""
+Per-route request metrics.
+Records latency, status counts and in-flight requests for every HTTP
+request. The route label is the matched path template (e.g.
+/api/menus/{menu_id}); requests that match no route share one label so
+scanners cannot blow up label cardinality.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS, HTTP_REQUESTS_IN_PROGRESS
+
+
+_UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500  # If the app raises before starting a response
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            in_progress.dec()
+            # The router stores the matched route in the (shared) scope
+            route = getattr(scope.get("route"), "path", _UNMATCHED_ROUTE)
+            HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
@@ -0,0 +1,89 @@
+"""
+Opt-in per-request profiling.
+Runs pyinstrument around a request and writes a speedscope profile
+(https://www.speedscope.app) to PROFILING_OUTPUT_DIR. A request is
+profiled when it carries the admin X-Profile-Token header or is picked by
+PROFILING_SAMPLE_RATE, and only while fewer than PROFILING_MAX_CONCURRENT
+profiles are running; everything else passes through untouched.
+"""
+
+import asyncio
+import os
+import random
+import re
+import secrets
+import time
+
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.logging import logger, request_id_var
+
+
+_FILE_NAME_UNSAFE = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        settings = get_settings()
+        self.token = (settings.PROFILING_TOKEN or "").encode("latin-1")
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.output_dir = settings.PROFILING_OUTPUT_DIR
+        self.max_concurrent = settings.PROFILING_MAX_CONCURRENT
+        self.interval = settings.PROFILING_INTERVAL_SECONDS
+        self.active = 0
+
+    def _requested(self, scope: Scope) -> bool:
+        if not self.token:
+            return False
+        sent = dict(scope["headers"]).get(b"x-profile-token", b"")
+        return secrets.compare_digest(sent, self.token)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = self._requested(scope)
+        sampled = not requested and random.random() < self.sample_rate
+        if not (requested or sampled) or self.active >= self.max_concurrent:
+            await self.app(scope, receive, send)
+            return
+
+        slug = _FILE_NAME_UNSAFE.sub("-", scope["path"]).strip("-")[:60] or "root"
+        request_id = request_id_var.get() or secrets.token_hex(8)
+        file_name = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{request_id}"
+
+        async def send_with_profile_name(message: Message) -> None:
+            # Only the admin who asked learns where the profile went
+            if requested and message["type"] == "http.response.start":
+                header = (b"x-profile-id", file_name.encode("latin-1"))
+                message["headers"] = [*message.get("headers", []), header]
+            await send(message)
+
+        # async_mode="enabled": only this request's task is attributed, even
+        # while other requests run on the same loop
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        self.active += 1
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_name)
+        finally:
+            profiler.stop()
+            self.active -= 1
+            try:
+                # Rendering walks every sample; keep it off the event loop
+                path = await asyncio.to_thread(self._write, profiler, file_name)
+                logger.info(f"Request profile written: {path}", extra={"sampled": sampled})
+            except OSError as e:
+                logger.warning(f"Could not write request profile {file_name}: {e}")
+
+    def _write(self, profiler: Profiler, file_name: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{file_name}.speedscope.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profiler.output(SpeedscopeRenderer()))
+        return path
@@ -0,0 +1,22 @@
+"""
+Phase-6: Publishing.
+Pre-renders published menus into precompressed snapshots at write time.
+"""
+
+from app.publishing.snapshot import (
+    MenuSnapshot,
+    read_snapshot,
+    refresh_public_menu,
+    render_snapshot,
+    sync_public_menu,
+)
+from app.publishing.urls import public_menu_url
+
+__all__ = [
+    "MenuSnapshot",
+    "public_menu_url",
+    "read_snapshot",
+    "refresh_public_menu",
+    "render_snapshot",
+    "sync_public_menu",
+]
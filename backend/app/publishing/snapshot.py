@@ -0,0 +1,151 @@
+"""
+Phase-6: Precompressed public menu snapshots.
+A published menu is serialized once and stored as identity, gzip and brotli
+variants next to its images (menus/{menu_id}/public/v{version}/). Public
+reads serve these bytes as-is, so no per-scan serialization or compression
+happens.
+
+Snapshots are keyed by menu version, and a version's data never changes,
+so concurrent writers never overwrite each other's objects and a read
+never mixes variants of two versions. Readers take the version from the
+database, so an older snapshot finishing its write late is never served.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+from typing import Any, NamedTuple
+
+import brotli
+
+from app.cache import public_menus
+from app.db.menus import MenuRecord
+from app.logging import logger
+from app.storage import delete_files, download_object, put_object
+
+
+class MenuSnapshot(NamedTuple):
+    """Serialized menu in every supported content-coding."""
+    etag: str  # Hex digest of the identity bytes (unquoted)
+    variants: dict[str, bytes]  # identity, gzip, br
+
+
+# Object name and content type for each content-coding
+_VARIANT_FILES = {
+    "identity": ("menu.json", "application/json"),
+    "gzip": ("menu.json.gz", "application/gzip"),
+    "br": ("menu.json.br", "application/octet-stream"),
+}
+
+
+def _snapshot_path(menu_id: str, version: int, encoding: str) -> str:
+    return f"menus/{menu_id}/public/v{version}/{_VARIANT_FILES[encoding][0]}"
+
+
+def _legacy_snapshot_path(menu_id: str, encoding: str) -> str:
+    # Unversioned layout used before snapshots were keyed by version
+    return f"menus/{menu_id}/public/{_VARIANT_FILES[encoding][0]}"
+
+
+def render_snapshot(data: dict[str, Any]) -> MenuSnapshot:
+    """
+    Serialize menu data and compress it at maximum ratio.
+    
+    CPU-bound; call via asyncio.to_thread from async code.
+    """
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return MenuSnapshot(
+        etag=hashlib.sha256(body).hexdigest()[:32],
+        variants={
+            "identity": body,
+            "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+            "br": brotli.compress(body, quality=11, mode=brotli.MODE_TEXT),
+        },
+    )
+
+
+async def write_snapshot(menu_id: str, version: int, data: dict[str, Any]) -> MenuSnapshot:
+    """
+    Render a snapshot of one menu version and store all its variants.
+    
+    Raises:
+        StorageConfigError: If storage is not configured
+        httpx.HTTPError: If any upload fails
+    """
+    snapshot = await asyncio.to_thread(render_snapshot, data)
+    await asyncio.gather(
+        *(
+            put_object(
+                _snapshot_path(menu_id, version, encoding),
+                content,
+                _VARIANT_FILES[encoding][1],
+                upsert=True,
+            )
+            for encoding, content in snapshot.variants.items()
+        )
+    )
+    logger.info(
+        f"Public snapshot written for menu {menu_id} v{version}: "
+        + ", ".join(f"{enc}={len(body)}B" for enc, body in snapshot.variants.items())
+    )
+    return snapshot
+
+
+async def read_snapshot(menu_id: str, version: int) -> MenuSnapshot | None:
+    """
+    Load the stored snapshot of one menu version.
+    
+    Returns:
+        The snapshot, or None if none was written for this version. Missing
+        compressed variants are skipped (identity is always present).
+        
+    Raises:
+        StorageConfigError: If storage is not configured
+        httpx.HTTPError: For storage errors other than a missing object
+    """
+    encodings = list(_VARIANT_FILES)
+    contents = await asyncio.gather(
+        *(download_object(_snapshot_path(menu_id, version, enc)) for enc in encodings)
+    )
+    variants = {enc: body for enc, body in zip(encodings, contents) if body is not None}
+    identity = variants.get("identity")
+    if identity is None:
+        return None
+    return MenuSnapshot(
+        etag=hashlib.sha256(identity).hexdigest()[:32],
+        variants=variants,
+    )
+
+
+async def refresh_public_menu(menu_id: str, version: int, data: dict[str, Any]) -> None:
+    """
+    Render the public snapshot of a published menu version and drop cached copies.
+    
+    If the write fails, public reads find no snapshot for this version and
+    render from the database instead. The previous version's snapshot is
+    removed once this one is stored (best effort).
+    """
+    try:
+        await write_snapshot(menu_id, version, data)
+    except Exception as e:
+        logger.error(f"Public snapshot write failed for menu {menu_id} v{version}: {e}")
+    else:
+        try:
+            await delete_files(
+                [_snapshot_path(menu_id, version - 1, enc) for enc in _VARIANT_FILES]
+                + [_legacy_snapshot_path(menu_id, enc) for enc in _VARIANT_FILES]
+            )
+        except Exception as e:
+            logger.warning(f"Could not remove old snapshot for menu {menu_id}: {e}")
+    finally:
+        await public_menus.invalidate(menu_id)
+
+
+async def sync_public_menu(menu: MenuRecord) -> None:
+    """Keep the public read path in sync after any change to a menu's data."""
+    # Published menus are re-rendered so the public snapshot stays current
+    if menu["is_published"]:
+        await refresh_public_menu(menu["id"], menu["version"], menu["data"])
+    else:
+        await public_menus.invalidate(menu["id"])
@@ -0,0 +1,12 @@
+"""
+Public links to published menus (what QR codes encode).
+"""
+
+from app.config import get_settings
+
+
+def public_menu_url(menu_id: str) -> str:
+    """Customer-facing URL of a menu: {PUBLIC_MENU_BASE_URL}/{menu_id}."""
+    settings = get_settings()
+    base_url = settings.PUBLIC_MENU_BASE_URL or f"{settings.FRONTEND_ORIGIN}/m"
+    return f"{base_url.rstrip('/')}/{menu_id}"
@@ -0,0 +1,9 @@
+"""
+QR codes for published menus.
+Only the dependency-free renderer is exported here, because spawned worker
+processes import this package; the async service lives in app.qr.service.
+"""
+
+from app.qr.render import QRFormat, QROptions, SheetItem, render_qr, render_sheets
+
+__all__ = ["QRFormat", "QROptions", "SheetItem", "render_qr", "render_sheets"]
@@ -0,0 +1,198 @@
+"""
+QR code rendering (SVG / PNG) with an on-disk memo.
+No application imports: runs both in the API process (via a thread) and in
+spawned worker processes for bulk export. The memo is keyed by the encoded
+URL and every render option, so any process can reuse any other's output.
+A hit bumps the file's mtime, so prune_memo can evict least recently used
+renders once the memo outgrows its byte budget.
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+import time
+from typing import Callable, Literal, NamedTuple
+from xml.sax.saxutils import escape
+
+import segno
+
+
+# Part of the memo key; bump when rendering output changes
+RENDER_VERSION = 1
+
+# Temp files younger than this may still be being written
+_TMP_GRACE_SECONDS = 60
+
+QRFormat = Literal["svg", "png"]
+
+
+class QROptions(NamedTuple):
+    """Render options (all of them are part of the memo key)."""
+    format: QRFormat = "svg"
+    scale: int = 10  # Pixels (PNG) / user units (SVG) per module
+    border: int = 4  # Quiet zone in modules
+    dark: str = "#000000"
+    light: str | None = "#ffffff"  # None: transparent background
+
+
+class SheetItem(NamedTuple):
+    """One printable table card in a bulk export."""
+    name: str  # File name inside the ZIP (without extension)
+    url: str
+    title: str
+
+
+def memo_key(kind: str, url: str, options: QROptions, title: str = "") -> str:
+    raw = f"{RENDER_VERSION}|{kind}|{url}|{title}|{'|'.join(map(str, options))}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _memoized(cache_dir: str, key: str, extension: str, render: Callable[[], bytes]) -> bytes:
+    path = os.path.join(cache_dir, key[:2], f"{key}.{extension}")
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)  # Mark as recently used
+        return data
+    except FileNotFoundError:
+        pass  # Not rendered yet, or evicted
+
+    data = render()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write-then-rename so concurrent readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return data
+
+
+def prune_memo(cache_dir: str, max_bytes: int) -> int:
+    """
+    Evict least recently used renders until the memo fits in max_bytes.
+
+    Prunes down to 90% of max_bytes, so the next few renders do not
+    trigger another pass. Safe to run while other processes read and
+    write the memo: a reader that loses a file just renders it again.
+
+    Returns:
+        Number of files removed
+    """
+    now = time.time()
+    entries: list[tuple[float, int, str]] = []  # (mtime, size, path)
+    try:
+        shards = os.scandir(cache_dir)
+    except FileNotFoundError:
+        return 0
+    with shards:
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard.path) as files:
+                for entry in files:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if entry.name.endswith(".tmp") and stat.st_mtime > now - _TMP_GRACE_SECONDS:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return 0
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes * 0.9:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass  # Evicted by another process
+        total -= size
+    return removed
+
+
+def _make(url: str) -> segno.QRCode:
+    return segno.make_qr(url, error="m", boost_error=True)
+
+
+def render_qr(url: str, options: QROptions) -> bytes:
+    """Render a bare QR code for url."""
+    buffer = io.BytesIO()
+    _make(url).save(
+        buffer,
+        kind=options.format,
+        scale=options.scale,
+        border=options.border,
+        dark=options.dark,
+        light=options.light,
+    )
+    return buffer.getvalue()
+
+
+def render_qr_cached(cache_dir: str, url: str, options: QROptions) -> bytes:
+    """render_qr through the on-disk memo."""
+    key = memo_key("qr", url, options)
+    return _memoized(cache_dir, key, options.format, lambda: render_qr(url, options))
+
+
+def render_sheet_svg(url: str, title: str, options: QROptions) -> bytes:
+    """
+    Render a printable A6 table card: title, QR code and URL caption.
+
+    The QR is drawn as a single vector path so it stays sharp at any
+    print size.
+    """
+    qr = _make(url)
+    width_mm, height_mm = 105, 148
+    size = qr.symbol_size(scale=1, border=options.border)[0]
+    qr_mm = 80
+    module = qr_mm / size
+    x0, y0 = (width_mm - qr_mm) / 2, 30
+
+    path = []
+    for row, cells in enumerate(qr.matrix_iter(scale=1, border=options.border)):
+        for col, dark in enumerate(cells):
+            if dark:
+                path.append(f"M{col},{row}h1v1h-1z")
+
+    light = options.light or "none"
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width_mm}mm" height="{height_mm}mm" '
+        f'viewBox="0 0 {width_mm} {height_mm}">'
+        f'<rect width="100%" height="100%" fill="{light}"/>'
+        f'<text x="{width_mm / 2}" y="20" font-family="sans-serif" font-size="8" '
+        f'text-anchor="middle">{escape(title)}</text>'
+        f'<path transform="translate({x0} {y0}) scale({module:.5f})" fill="{options.dark}" '
+        f'd="{"".join(path)}"/>'
+        f'<text x="{width_mm / 2}" y="{y0 + qr_mm + 12}" font-family="sans-serif" font-size="4" '
+        f'text-anchor="middle">{escape(url)}</text>'
+        "</svg>"
+    )
+    return svg.encode("utf-8")
+
+
+def render_sheets(cache_dir: str, items: list[SheetItem], options: QROptions) -> list[tuple[str, bytes]]:
+    """
+    Render a batch of export entries (worker-process entry point).
+
+    SVG exports are printable cards; PNG exports are bare QR codes at the
+    requested scale.
+
+    Returns:
+        (file name, bytes) per item
+    """
+    rendered = []
+    for item in items:
+        if options.format == "svg":
+            key = memo_key("sheet", item.url, options, item.title)
+            data = _memoized(
+                cache_dir, key, "svg", lambda: render_sheet_svg(item.url, item.title, options)
+            )
+        else:
+            data = render_qr_cached(cache_dir, item.url, options)
+        rendered.append((f"{item.name}.{options.format}", data))
+    return rendered
@@ -0,0 +1,125 @@
+"""
+QR codes for published menus.
+Single codes are rendered (or read from the disk memo) in a thread; bulk
+exports are split into batches rendered on the worker process pool and
+streamed back as a ZIP while later batches are still rendering.
+Every option combination is a separate memo entry, so after renders the
+memo is pruned to QR_CACHE_MAX_BYTES (at most once a minute per process).
+"""
+
+import asyncio
+import re
+import time
+import zipfile
+from typing import AsyncIterator
+
+from app.config import get_settings
+from app.logging import logger
+from app.publishing import public_menu_url
+from app.qr.render import QROptions, SheetItem, prune_memo, render_qr_cached, render_sheets
+from app.workers import run_in_process, spawn_background
+
+
+_PRUNE_INTERVAL_SECONDS = 60.0
+
+_last_prune = 0.0
+
+
+async def _prune() -> None:
+    settings = get_settings()
+    try:
+        removed = await asyncio.to_thread(prune_memo, settings.QR_CACHE_DIR, settings.QR_CACHE_MAX_BYTES)
+    except OSError as e:
+        logger.warning(f"QR memo prune failed: {e}")
+        return
+    if removed:
+        logger.info(f"Evicted {removed} QR render(s) from the memo")
+
+
+def _maybe_prune() -> None:
+    """Prune the memo in the background, at most once per interval."""
+    global _last_prune
+    now = time.monotonic()
+    if now - _last_prune >= _PRUNE_INTERVAL_SECONDS:
+        _last_prune = now
+        spawn_background(_prune(), name="qr-memo-prune")
+
+
+async def get_menu_qr(menu_id: str, options: QROptions) -> bytes:
+    """QR code encoding the menu's public URL."""
+    data = await asyncio.to_thread(
+        render_qr_cached, get_settings().QR_CACHE_DIR, public_menu_url(menu_id), options
+    )
+    _maybe_prune()
+    return data
+
+
+def _file_name(menu_id: str, title: str | None) -> str:
+    slug = re.sub(r"[^\w]+", "-", (title or "menu").lower()).strip("-")[:40] or "menu"
+    return f"{slug}-{menu_id[:8]}"
+
+
+def sheet_items(titles: dict[str, str | None]) -> list[SheetItem]:
+    """Export entries for menus (ID -> title), in a stable order."""
+    return [
+        SheetItem(name=_file_name(menu_id, title), url=public_menu_url(menu_id), title=title or "")
+        for menu_id, title in sorted(titles.items(), key=lambda item: (item[1] or "", item[0]))
+    ]
+
+
+class _ZipChunks:
+    """Write-only sink for ZipFile; drained after each entry batch."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_sheets_zip(items: list[SheetItem], options: QROptions) -> AsyncIterator[bytes]:
+    """
+    Render export entries in parallel and yield ZIP bytes as batches finish.
+
+    The sink is not seekable, so ZipFile writes data descriptors and the
+    archive can be sent before it is complete. Batches still pending when
+    the client disconnects are cancelled.
+    """
+    _maybe_prune()  # Room for this export's renders
+    settings = get_settings()
+    size = settings.QR_EXPORT_BATCH_SIZE
+    batches = [items[i:i + size] for i in range(0, len(items), size)]
+    tasks = [
+        asyncio.ensure_future(run_in_process(render_sheets, settings.QR_CACHE_DIR, batch, options))
+        for batch in batches
+    ]
+    # PNG is already compressed; SVG text deflates well
+    compression = zipfile.ZIP_DEFLATED if options.format == "svg" else zipfile.ZIP_STORED
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    sink = _ZipChunks()
+    try:
+        with zipfile.ZipFile(sink, "w", compression=compression) as archive:  # type: ignore[arg-type]
+            for next_batch in asyncio.as_completed(tasks):
+                for name, data in await next_batch:
+                    archive.writestr(zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0)), data, compression)
+                yield sink.drain()
+        yield sink.drain()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    logger.info(
+        f"QR export streamed: menus={len(items)}, batches={len(batches)}, "
+        f"duration_ms={(loop.time() - started) * 1000:.1f}"
+    )
@@ -0,0 +1,25 @@
+"""
+Resilience for outbound calls.
+Timeout budgets, jittered retries and circuit breakers that keep a slow or
+failing upstream (Supabase Storage, JWKS) from tying up every request.
+"""
+
+from app.resilience.policy import (
+    Admission,
+    BreakerStats,
+    CircuitBreaker,
+    CircuitOpenError,
+    OutboundPolicy,
+    get_breaker_stats,
+    get_policy,
+)
+
+__all__ = [
+    "Admission",
+    "BreakerStats",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "OutboundPolicy",
+    "get_breaker_stats",
+    "get_policy",
+]
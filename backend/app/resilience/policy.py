@@ -0,0 +1,253 @@
+"""
+Outbound call policy: timeout budget, jittered retries, circuit breaker.
+Wraps HTTP calls to upstream services (Supabase Storage, JWKS) so a slow
+or failing upstream costs each request a bounded amount of time:
+
+- timeout budget: one deadline per call, retries included
+- retries: only for idempotent calls, on transport errors, timeouts,
+  429 and 5xx, with exponential backoff and full jitter
+- circuit breaker: after consecutive failures, calls fail immediately
+  with CircuitOpenError until a cool-down passes; then one probe call is
+  let through and its outcome closes or re-opens the circuit. Outcomes of
+  calls admitted before the last state change (e.g. a slow call that was
+  let through while closed) are ignored
+
+Not thread-safe: intended for use from the event loop thread only.
+Breakers are per process; with several workers each trips on its own.
+"""
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Literal, NamedTuple, TypedDict
+
+import httpx
+
+from app.logging import logger
+from app.metrics import CIRCUIT_REJECTIONS, CIRCUIT_STATE, OUTBOUND_RETRIES
+
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+_STATE_VALUES: dict[BreakerState, int] = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class Admission(NamedTuple):
+    """Which breaker state let an attempt through; hand it back with the outcome."""
+    state: BreakerState  # closed, or half_open for the probe
+    generation: int  # Breaker state changes seen before this attempt
+
+
+class BreakerStats(TypedDict):
+    """Snapshot of one circuit breaker, for health output."""
+    state: BreakerState
+    consecutive_failures: int
+    retry_in: float  # Seconds until a probe is allowed (0 unless open)
+    rejected: int  # Calls failed fast since startup
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed -> open after failure_threshold failed attempts in a row;
+    open -> half_open once reset_timeout has passed; half_open lets a
+    single probe through: success closes the circuit, failure re-opens it.
+    Every state change starts a new generation, and an outcome only counts
+    if its attempt was admitted in the current one.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state: BreakerState = "closed"
+        self.consecutive_failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._generation = 0
+        CIRCUIT_STATE.labels(name).set(0)
+
+    def _set_state(self, state: BreakerState) -> None:
+        if state != self.state:
+            logger.warning(
+                f"Circuit '{self.name}' {self.state} -> {state}",
+                extra={"breaker": self.name, "failures": self.consecutive_failures},
+            )
+            self._generation += 1
+            self._probing = False
+        self.state = state
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+    def _retry_in(self) -> float:
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def _is_current(self, admission: Admission) -> bool:
+        return admission.generation == self._generation
+
+    def acquire(self) -> Admission:
+        """
+        Admit one attempt.
+
+        Returns:
+            The admission, to pass to record_success/record_failure (or
+            release_probe if the attempt ends without a verdict)
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or a probe is already out
+        """
+        if self.state == "open" and self._retry_in() == 0:
+            self._set_state("half_open")
+        if self.state == "closed":
+            return Admission("closed", self._generation)
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return Admission("half_open", self._generation)
+        self.rejected += 1
+        CIRCUIT_REJECTIONS.labels(self.name).inc()
+        raise CircuitOpenError(self.name, self._retry_in() or 1.0)
+
+    def record_success(self, admission: Admission) -> None:
+        if not self._is_current(admission):
+            return
+        self.consecutive_failures = 0
+        self._set_state("closed")
+
+    def record_failure(self, admission: Admission) -> None:
+        if not self._is_current(admission):
+            return
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state("open")
+
+    def release_probe(self, admission: Admission) -> None:
+        """Give the probe slot back without a verdict (e.g. the caller was cancelled)."""
+        if self._is_current(admission) and admission.state == "half_open":
+            self._probing = False
+
+    def stats(self) -> BreakerStats:
+        return BreakerStats(
+            state=self.state,
+            consecutive_failures=self.consecutive_failures,
+            retry_in=round(self._retry_in(), 1) if self.state == "open" else 0.0,
+            rejected=self.rejected,
+        )
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+class OutboundPolicy:
+    """
+    Timeout budget, retries and circuit breaker for calls to one upstream.
+
+    Calls return the upstream's response unchanged, so callers keep their
+    own status handling (e.g. 404 meaning "missing"). 4xx answers other
+    than 429 count as success: the upstream is healthy, the request was not.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        attempts: int,
+        backoff_base: float,
+        backoff_max: float,
+    ) -> None:
+        self.breaker = breaker
+        self.attempts = max(1, attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _backoff(self, retry: int) -> float:
+        # Full jitter: spreads out retries of callers that failed together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry))
+
+    async def request(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        budget: float,
+        idempotent: bool = True,
+    ) -> httpx.Response:
+        """
+        Call send() within budget seconds, retrying if idempotent.
+
+        Non-idempotent calls (and calls with a streamed body, which cannot
+        be replayed) get a single attempt.
+
+        Returns:
+            The last response (possibly a retryable error status once
+            attempts or budget are exhausted)
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            asyncio.TimeoutError: If the budget ran out during an attempt
+            httpx.TransportError: If the last attempt failed to connect or read
+        """
+        deadline = time.monotonic() + budget
+        attempts = self.attempts if idempotent else 1
+        for attempt in range(attempts):
+            admission = self.breaker.acquire()
+            try:
+                response = await asyncio.wait_for(send(), max(0.0, deadline - time.monotonic()))
+            except (httpx.TransportError, asyncio.TimeoutError) as e:
+                self.breaker.record_failure(admission)
+                failure: httpx.Response | Exception = e
+            except BaseException:
+                self.breaker.release_probe(admission)
+                raise
+            else:
+                if not _is_retryable_status(response.status_code):
+                    self.breaker.record_success(admission)
+                    return response
+                self.breaker.record_failure(admission)
+                failure = response
+
+            delay = self._backoff(attempt)
+            if attempt + 1 == attempts or time.monotonic() + delay >= deadline:
+                break
+            OUTBOUND_RETRIES.labels(self.breaker.name).inc()
+            logger.info(
+                f"Retrying {self.breaker.name} call in {delay * 1000:.0f}ms",
+                extra={"breaker": self.breaker.name, "attempt": attempt + 1},
+            )
+            await asyncio.sleep(delay)
+
+        if isinstance(failure, httpx.Response):
+            return failure
+        raise failure
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_policy(
+    name: str,
+    *,
+    attempts: int,
+    backoff_base: float,
+    backoff_max: float,
+    failure_threshold: int,
+    reset_timeout: float,
+) -> OutboundPolicy:
+    """A policy around the process-wide breaker for upstream `name` (created once)."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+    return OutboundPolicy(breaker, attempts, backoff_base, backoff_max)
+
+
+def get_breaker_stats() -> dict[str, BreakerStats]:
+    """State of every circuit breaker, by upstream name."""
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
@@ -0,0 +1,8 @@
+"""
+Menu data schemas.
+Typed, precompiled validators equivalent to /contracts/menu.schema.v*.json.
+"""
+
+from app.schemas.menu_v1 import MenuValidationIssue, validate_menu_data
+
+__all__ = ["MenuValidationIssue", "validate_menu_data"]
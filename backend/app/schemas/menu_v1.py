@@ -0,0 +1,107 @@
+"""
+Menu schema v1 as typed definitions compiled once into a pydantic-core
+validator. Mirrors /contracts/menu.schema.v1.json exactly (the schema is
+locked, so these definitions are too):
+
+- strict types: no coercion, booleans are not numbers
+- optional keys may be omitted but not set to null (except price)
+- additionalProperties: false everywhere (extra="forbid")
+
+Errors are reported as JSON Pointer paths into the submitted document.
+"""
+
+from typing import Annotated, Any, Literal, TypedDict
+
+from pydantic import ConfigDict, PlainValidator, StringConstraints, TypeAdapter, ValidationError
+from pydantic_core import PydanticCustomError
+from typing_extensions import NotRequired
+from typing_extensions import TypedDict as SchemaDict  # pydantic needs this on Python < 3.12
+
+
+_FORBID_EXTRA = ConfigDict(extra="forbid", strict=True)
+
+NonEmptyStr = Annotated[str, StringConstraints(min_length=1)]
+
+
+def _validate_price(value: Any) -> Any:
+    """price: number | string | null (JSON Schema semantics, bool excluded)."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    raise PydanticCustomError("price_type", "Input should be a number, a string or null")
+
+
+def _validate_schema_version(value: Any) -> Any:
+    """schema_version: integer const 1 (1.0 counts as an integer, True does not)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value == 1:
+        return 1
+    raise PydanticCustomError("schema_version", "Input should be 1")
+
+
+Price = Annotated[Any, PlainValidator(_validate_price)]
+SchemaVersion = Annotated[Literal[1], PlainValidator(_validate_schema_version)]
+
+
+class MenuItemV1(SchemaDict):
+    __pydantic_config__ = _FORBID_EXTRA  # type: ignore[misc]
+    name: NonEmptyStr
+    description: NotRequired[str]
+    price: NotRequired[Price]
+
+
+class CategoryV1(SchemaDict):
+    __pydantic_config__ = _FORBID_EXTRA  # type: ignore[misc]
+    name: NonEmptyStr
+    items: list[MenuItemV1]
+
+
+class ThemeV1(SchemaDict):
+    __pydantic_config__ = _FORBID_EXTRA  # type: ignore[misc]
+    primaryColor: NotRequired[str]
+    backgroundColor: NotRequired[str]
+    font: NotRequired[str]
+
+
+class MenuDataV1(SchemaDict):
+    __pydantic_config__ = _FORBID_EXTRA  # type: ignore[misc]
+    schema_version: SchemaVersion
+    title: NotRequired[str]
+    categories: list[CategoryV1]
+    theme: NotRequired[ThemeV1]
+
+
+# Compiled once at import (application startup)
+menu_v1_validator: TypeAdapter[MenuDataV1] = TypeAdapter(MenuDataV1)
+
+
+class MenuValidationIssue(TypedDict):
+    """One schema violation."""
+    path: str  # JSON Pointer, e.g. /categories/0/items/3/price
+    message: str
+
+
+def json_pointer(loc: tuple[int | str, ...]) -> str:
+    return "".join(
+        "/" + str(part).replace("~", "~0").replace("/", "~1") for part in loc
+    )
+
+
+def validate_menu_data(data: Any) -> list[MenuValidationIssue]:
+    """
+    Validate menu data against schema v1.
+    
+    Args:
+        data: Decoded JSON document (menus.data)
+        
+    Returns:
+        List of issues with JSON Pointer paths; empty if the data is valid
+    """
+    try:
+        menu_v1_validator.validate_python(data)
+    except ValidationError as e:
+        return [
+            MenuValidationIssue(path=json_pointer(err["loc"]), message=err["msg"])
+            for err in e.errors(include_url=False)
+        ]
+    return []
@@ -0,0 +1,200 @@
+"""
+RFC 6902 JSON Patch support for menu data (schema v1).
+Operations are checked against the schema by the path they touch only:
+each target path is resolved to its schema node and just the supplied
+value is validated, so a patch never requires re-validating (or sending)
+the whole document. Compiled steps are applied in the database.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Literal, NamedTuple
+
+from pydantic import BaseModel, ConfigDict, Field, StrictStr, TypeAdapter, ValidationError
+
+from app.schemas.menu_v1 import (
+    CategoryV1,
+    MenuDataV1,
+    MenuItemV1,
+    MenuValidationIssue,
+    NonEmptyStr,
+    Price,
+    SchemaVersion,
+    ThemeV1,
+    json_pointer,
+)
+
+
+MAX_PATCH_OPERATIONS = 100
+
+
+class JsonPatchOperation(BaseModel):
+    """One RFC 6902 operation as sent by the client."""
+    model_config = ConfigDict(populate_by_name=True, extra="forbid")
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: str | None = Field(default=None, alias="from")
+
+
+class PatchStep(NamedTuple):
+    """A validated operation, ready to be applied in the database."""
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: list[str]  # JSON Pointer tokens; "-" only as last token of add
+    from_path: list[str] | None
+    value: Any
+    parent_is_array: bool  # Target's parent is an array (index/append semantics)
+
+
+class PatchValidationError(Exception):
+    """Raised when a patch is malformed or would violate the schema."""
+
+    def __init__(self, issues: list[MenuValidationIssue]) -> None:
+        super().__init__(f"{len(issues)} patch error(s)")
+        self.issues = issues
+
+
+# --- Schema tree (mirrors menu_v1) ---
+
+@dataclass(frozen=True)
+class _Node:
+    kind: str
+    adapter: TypeAdapter[Any]
+    fields: dict[str, tuple["_Node", bool]] = field(default_factory=dict)  # name -> (node, required)
+    element: "_Node | None" = None
+
+
+_STRING = _Node("string", TypeAdapter(StrictStr))
+_NON_EMPTY = _Node("non_empty_string", TypeAdapter(NonEmptyStr))
+
+_ITEM = _Node("item", TypeAdapter(MenuItemV1), fields={
+    "name": (_NON_EMPTY, True),
+    "description": (_STRING, False),
+    "price": (_Node("price", TypeAdapter(Price)), False),
+})
+_CATEGORY = _Node("category", TypeAdapter(CategoryV1), fields={
+    "name": (_NON_EMPTY, True),
+    "items": (_Node("items", TypeAdapter(list[MenuItemV1]), element=_ITEM), True),
+})
+_THEME = _Node("theme", TypeAdapter(ThemeV1), fields={
+    "primaryColor": (_STRING, False),
+    "backgroundColor": (_STRING, False),
+    "font": (_STRING, False),
+})
+_ROOT = _Node("menu", TypeAdapter(MenuDataV1), fields={
+    "schema_version": (_Node("schema_version", TypeAdapter(SchemaVersion)), True),
+    "title": (_STRING, False),
+    "categories": (_Node("categories", TypeAdapter(list[CategoryV1]), element=_CATEGORY), True),
+    "theme": (_THEME, False),
+})
+
+
+class _Target(NamedTuple):
+    node: _Node
+    parent_is_array: bool
+    required: bool
+
+
+def _parse_pointer(pointer: str) -> list[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON Pointer: '{pointer}'")
+    return [t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/")]
+
+
+def _is_index(token: str) -> bool:
+    return token == "0" or (token.isdigit() and not token.startswith("0"))
+
+
+def _resolve(tokens: list[str], allow_append: bool) -> _Target:
+    """Walk the schema tree along the path; raise ValueError if it leaves it."""
+    node, parent_is_array, required = _ROOT, False, True
+    for position, token in enumerate(tokens):
+        if node.element is not None:
+            is_last = position == len(tokens) - 1
+            if not (_is_index(token) or (token == "-" and allow_append and is_last)):
+                raise ValueError(f"'{token}' is not a valid array index")
+            node, parent_is_array, required = node.element, True, False
+        elif token in node.fields:
+            (node, required), parent_is_array = node.fields[token], False
+        else:
+            raise ValueError(f"'{token}' is not allowed here by the menu schema")
+    return _Target(node, parent_is_array, required)
+
+
+def compile_patch(operations: list[JsonPatchOperation]) -> list[PatchStep]:
+    """
+    Validate operations against the schema and compile them into steps.
+    
+    Raises:
+        PatchValidationError: With one issue per offending operation
+    """
+    if len(operations) > MAX_PATCH_OPERATIONS:
+        raise PatchValidationError([
+            MenuValidationIssue(path="", message=f"Too many operations. Maximum: {MAX_PATCH_OPERATIONS}")
+        ])
+    
+    steps: list[PatchStep] = []
+    issues: list[MenuValidationIssue] = []
+    
+    for i, operation in enumerate(operations):
+        try:
+            steps.append(_compile_one(operation))
+        except ValidationError as e:
+            issues.extend(
+                MenuValidationIssue(
+                    path=operation.path + json_pointer(err["loc"]),
+                    message=f"operation {i} ({operation.op}): {err['msg']}",
+                )
+                for err in e.errors(include_url=False)
+            )
+        except ValueError as e:
+            issues.append(
+                MenuValidationIssue(path=operation.path, message=f"operation {i} ({operation.op}): {e}")
+            )
+    
+    if issues:
+        raise PatchValidationError(issues)
+    return steps
+
+
+def _compile_one(operation: JsonPatchOperation) -> PatchStep:
+    op = operation.op
+    tokens = _parse_pointer(operation.path)
+    target = _resolve(tokens, allow_append=op in ("add", "move", "copy"))
+    
+    if op in ("add", "replace", "test") and "value" not in operation.model_fields_set:
+        raise ValueError("'value' is required")
+    if op in ("move", "copy") and operation.from_ is None:
+        raise ValueError("'from' is required")
+    if not tokens and op in ("remove", "move"):
+        raise ValueError("the document root cannot be removed or moved")
+    if op == "remove" and target.required:
+        raise ValueError("cannot remove a required field")
+    
+    value = operation.value
+    if op in ("add", "replace"):
+        value = target.node.adapter.validate_python(value)
+    
+    from_tokens = None
+    if op in ("move", "copy"):
+        from_tokens = _parse_pointer(operation.from_ or "")
+        source = _resolve(from_tokens, allow_append=False)
+        if op == "move" and len(tokens) > len(from_tokens) and tokens[:len(from_tokens)] == from_tokens:
+            raise ValueError("cannot move a value into one of its children")
+        if source.node.kind != target.node.kind:
+            raise ValueError(
+                f"cannot {op} a {source.node.kind} to a {target.node.kind} location"
+            )
+        # Moving a value onto its own location is a no-op (RFC 6902 4.4)
+        if op == "move" and from_tokens != tokens and source.required:
+            raise ValueError("cannot move a required field")
+    
+    return PatchStep(
+        op=op,
+        path=tokens,
+        from_path=from_tokens,
+        value=value,
+        parent_is_array=target.parent_is_array,
+    )
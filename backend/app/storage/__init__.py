@@ -3,6 +3,40 @@ Phase-4: Supabase Storage module.
 Handles image uploads to Supabase Storage bucket.
 """
 
-from app.storage.supabase import upload_file
+from app.storage.supabase import (
+    close_storage,
+    content_hash_of,
+    content_path,
+    create_signed_upload_url,
+    delete_files,
+    direct_upload_path,
+    download_object,
+    object_exists,
+    object_size,
+    public_url_for,
+    put_object,
+    read_object_head,
+    SIGNED_UPLOAD_EXPIRES_SECONDS,
+    SignedUpload,
+    start_storage,
+    upload_file,
+)
 
-__all__ = ["upload_file"]
+__all__ = [
+    "close_storage",
+    "content_hash_of",
+    "content_path",
+    "create_signed_upload_url",
+    "delete_files",
+    "direct_upload_path",
+    "download_object",
+    "object_exists",
+    "object_size",
+    "public_url_for",
+    "put_object",
+    "read_object_head",
+    "SIGNED_UPLOAD_EXPIRES_SECONDS",
+    "SignedUpload",
+    "start_storage",
+    "upload_file",
+]
@@ -1,16 +1,23 @@
 """
 Phase-4: Supabase Storage client.
-Reads configuration from environment variables directly (Phase-4 scoped).
-Does NOT modify Phase-1 config.py.
+Uses a single pooled httpx.AsyncClient (keep-alive + HTTP/2) whose lifetime
+is managed by the application lifespan. Configuration is resolved once.
+Every call goes through the "storage" outbound policy: a timeout budget
+per call, jittered retries for idempotent calls, and a circuit breaker
+that fails fast with CircuitOpenError while Storage is down.
 """
 
-import os
+import time
 import uuid
-from typing import TypedDict
+from functools import lru_cache
+from typing import AsyncIterable, NamedTuple, TypedDict
 
 import httpx
 
+from app.config import get_settings
 from app.logging import logger
+from app.metrics import STORAGE_BYTES, STORAGE_UPLOAD_DURATION, count_uploaded
+from app.resilience import OutboundPolicy, get_policy
 
 
 class StorageResult(TypedDict):
@@ -19,24 +26,50 @@ class StorageResult(TypedDict):
     url: str
 
 
+class SignedUpload(NamedTuple):
+    """Pre-authorized upload target for a single object."""
+    url: str  # Absolute URL; the client PUTs the file body here
+    token: str
+
+
+# Lifetime of Supabase signed upload URLs (fixed by Supabase Storage)
+SIGNED_UPLOAD_EXPIRES_SECONDS = 2 * 60 * 60
+
+
 class StorageConfigError(Exception):
     """Raised when required storage configuration is missing."""
     pass
 
 
-def _get_storage_config() -> tuple[str, str, str]:
+class StorageConfig(NamedTuple):
+    """Storage configuration resolved once at startup."""
+    supabase_url: str
+    bucket_name: str
+    auth_headers: dict[str, str]
+
+
+# Shared client, created by start_storage() (or lazily on first use)
+_client: httpx.AsyncClient | None = None
+
+
+@lru_cache(maxsize=1)
+def _get_storage_config() -> StorageConfig:
     """
-    Get storage configuration from environment variables.
+    Resolve storage configuration from settings.
+    
+    Cached after the first successful call, so environment variables are
+    not re-read on every upload.
     
     Returns:
-        Tuple of (supabase_url, service_role_key, bucket_name)
+        StorageConfig with base URL, bucket name and auth headers
         
     Raises:
         StorageConfigError: If any required env var is missing
     """
-    supabase_url = os.environ.get("SUPABASE_URL")
-    service_role_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-    bucket_name = os.environ.get("SUPABASE_STORAGE_BUCKET")
+    settings = get_settings()
+    supabase_url = settings.SUPABASE_URL
+    service_role_key = settings.SUPABASE_SERVICE_ROLE_KEY
+    bucket_name = settings.SUPABASE_STORAGE_BUCKET
     
     missing = []
     if not supabase_url:
@@ -52,33 +85,322 @@ def _get_storage_config() -> tuple[str, str, str]:
             "Please configure these before using storage features."
         )
     
-    return supabase_url, service_role_key, bucket_name
+    return StorageConfig(
+        supabase_url=supabase_url.rstrip("/"),
+        bucket_name=bucket_name,
+        auth_headers={"Authorization": f"Bearer {service_role_key}"},
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_policy() -> OutboundPolicy:
+    settings = get_settings()
+    return get_policy(
+        "storage",
+        attempts=settings.OUTBOUND_RETRY_ATTEMPTS,
+        backoff_base=settings.OUTBOUND_RETRY_BASE_SECONDS,
+        backoff_max=settings.OUTBOUND_RETRY_MAX_SECONDS,
+        failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.CIRCUIT_RESET_SECONDS,
+    )
+
+
+def _create_client() -> httpx.AsyncClient:
+    """Create the pooled async client used for all storage calls."""
+    settings = get_settings()
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(settings.STORAGE_TIMEOUT_SECONDS, connect=5.0),
+        limits=httpx.Limits(
+            max_connections=settings.STORAGE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.STORAGE_MAX_CONNECTIONS,
+            keepalive_expiry=30.0,
+        ),
+    )
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it if the lifespan has not run."""
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+
+async def start_storage() -> None:
+    """
+    Initialize storage at application startup.
+    
+    Resolves configuration once and opens the shared connection pool.
+    Missing configuration is logged, not raised, so the API can still
+    start without storage; uploads will then fail with StorageConfigError.
+    """
+    try:
+        config = _get_storage_config()
+        logger.info(f"Storage initialized for bucket '{config.bucket_name}'")
+    except StorageConfigError as e:
+        logger.warning(f"Storage not configured: {e}")
+    _get_client()
+    _get_policy()
+
+
+async def close_storage() -> None:
+    """Close the shared connection pool at application shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
+def public_url_for(storage_path: str) -> str:
+    """Public URL of an object in the (public) bucket."""
+    config = _get_storage_config()
+    return f"{config.supabase_url}/storage/v1/object/public/{config.bucket_name}/{storage_path}"
 
-def upload_file(menu_id: str, file_bytes: bytes, extension: str) -> StorageResult:
+
+async def put_object(
+    storage_path: str,
+    content: bytes | AsyncIterable[bytes],
+    content_type: str,
+    upsert: bool = False,
+) -> StorageResult:
     """
-    Upload a file to Supabase Storage.
+    Write an object at an explicit path in the bucket.
+    
+    Args:
+        storage_path: Object path inside the bucket
+        content: Raw bytes, or an async iterable of chunks (streamed)
+        content_type: MIME type stored with the object
+        upsert: Overwrite an existing object instead of failing
+        
+    Returns:
+        StorageResult with 'path' and 'url' keys
+        
+    Raises:
+        StorageConfigError: If storage is not configured
+        CircuitOpenError: If storage is failing and calls are short-circuited
+        httpx.HTTPStatusError: If the upload fails
+    """
+    config = _get_storage_config()
+    
+    # Supabase Storage upload endpoint
+    upload_url = f"{config.supabase_url}/storage/v1/object/{config.bucket_name}/{storage_path}"
+    
+    headers = {
+        **config.auth_headers,
+        "Content-Type": content_type,
+    }
+    if upsert:
+        headers["x-upsert"] = "true"
+    
+    if isinstance(content, bytes):
+        STORAGE_BYTES.labels("upload").inc(len(content))
+    else:
+        content = count_uploaded(content)
+    
+    # A streamed body cannot be replayed, and without upsert a retry after
+    # a lost response would fail on the object the first attempt created
+    started = time.perf_counter()
+    response = await _get_policy().request(
+        lambda: _get_client().post(upload_url, content=content, headers=headers),
+        budget=get_settings().STORAGE_TIMEOUT_SECONDS,
+        idempotent=upsert and isinstance(content, bytes),
+    )
+    response.raise_for_status()
+    
+    logger.info(
+        f"Upload successful: {storage_path}",
+        extra={"duration_ms": round((time.perf_counter() - started) * 1000, 1)},
+    )
+    
+    return StorageResult(path=storage_path, url=public_url_for(storage_path))
+
+
+async def download_object(storage_path: str) -> bytes | None:
+    """
+    Read an object from the bucket.
+    
+    Returns:
+        The object bytes, or None if it does not exist
+        
+    Raises:
+        StorageConfigError: If storage is not configured
+        CircuitOpenError: If storage is failing and calls are short-circuited
+        httpx.HTTPStatusError: For errors other than a missing object
+    """
+    config = _get_storage_config()
+    url = f"{config.supabase_url}/storage/v1/object/{config.bucket_name}/{storage_path}"
+    
+    response = await _get_policy().request(
+        lambda: _get_client().get(url, headers=config.auth_headers),
+        budget=get_settings().STORAGE_TIMEOUT_SECONDS,
+    )
+    # Storage answers 400 or 404 for missing objects depending on version
+    if response.status_code in (400, 404):
+        return None
+    response.raise_for_status()
+    STORAGE_BYTES.labels("download").inc(len(response.content))
+    return response.content
+
+
+async def object_exists(storage_path: str) -> bool:
+    """
+    Check whether an object exists without downloading it (HEAD).
+    
+    Raises:
+        StorageConfigError: If storage is not configured
+        CircuitOpenError: If storage is failing and calls are short-circuited
+        httpx.HTTPStatusError: For errors other than a missing object
+    """
+    config = _get_storage_config()
+    url = f"{config.supabase_url}/storage/v1/object/{config.bucket_name}/{storage_path}"
+    
+    response = await _get_policy().request(
+        lambda: _get_client().head(url, headers=config.auth_headers),
+        budget=get_settings().STORAGE_CALL_TIMEOUT_SECONDS,
+    )
+    if response.status_code in (400, 404):
+        return False
+    response.raise_for_status()
+    return True
+
+
+async def object_size(storage_path: str) -> int | None:
+    """
+    Size of an object in bytes, from a HEAD request (nothing is downloaded).
+    
+    Returns:
+        The size, or None if the object does not exist
+        
+    Raises:
+        StorageConfigError: If storage is not configured
+        CircuitOpenError: If storage is failing and calls are short-circuited
+        httpx.HTTPStatusError: For errors other than a missing object
+    """
+    config = _get_storage_config()
+    url = f"{config.supabase_url}/storage/v1/object/{config.bucket_name}/{storage_path}"
+    
+    response = await _get_policy().request(
+        lambda: _get_client().head(url, headers=config.auth_headers),
+        budget=get_settings().STORAGE_CALL_TIMEOUT_SECONDS,
+    )
+    if response.status_code in (400, 404):
+        return None
+    response.raise_for_status()
+    return int(response.headers["content-length"])
+
+
+async def read_object_head(storage_path: str, length: int) -> bytes | None:
+    """
+    Read the first `length` bytes of an object with a ranged GET.
+    
+    Returns:
+        Up to `length` bytes, or None if the object does not exist
+        
+    Raises:
+        StorageConfigError: If storage is not configured
+        CircuitOpenError: If storage is failing and calls are short-circuited
+        httpx.HTTPStatusError: For errors other than a missing object
+    """
+    config = _get_storage_config()
+    url = f"{config.supabase_url}/storage/v1/object/{config.bucket_name}/{storage_path}"
+    
+    response = await _get_policy().request(
+        lambda: _get_client().get(url, headers={**config.auth_headers, "Range": f"bytes=0-{length - 1}"}),
+        budget=get_settings().STORAGE_CALL_TIMEOUT_SECONDS,
+    )
+    if response.status_code in (400, 404):
+        return None
+    response.raise_for_status()
+    # A server ignoring Range answers 200 with the whole object
+    head = response.content[:length]
+    STORAGE_BYTES.labels("download").inc(len(response.content))
+    return head
+
+
+async def create_signed_upload_url(storage_path: str) -> SignedUpload:
+    """
+    Authorize a client to upload one object directly, without the API.
+    
+    The URL accepts a single PUT of the file body and cannot overwrite an
+    existing object. It expires after SIGNED_UPLOAD_EXPIRES_SECONDS.
+    
+    Raises:
+        StorageConfigError: If storage is not configured
+        CircuitOpenError: If storage is failing and calls are short-circuited
+        httpx.HTTPStatusError: If storage refuses to sign
+    """
+    config = _get_storage_config()
+    url = f"{config.supabase_url}/storage/v1/object/upload/sign/{config.bucket_name}/{storage_path}"
+    
+    response = await _get_policy().request(
+        lambda: _get_client().post(url, headers=config.auth_headers),
+        budget=get_settings().STORAGE_CALL_TIMEOUT_SECONDS,
+    )
+    response.raise_for_status()
+    signed = response.json()
+    # Storage answers with a URL relative to /storage/v1
+    upload_url = f"{config.supabase_url}/storage/v1{signed['url']}"
+    token = signed.get("token") or httpx.URL(upload_url).params.get("token", "")
+    return SignedUpload(url=upload_url, token=token)
+
+
+def content_path(menu_id: str, content_hash: str, extension: str) -> str:
+    """Content-addressed object path: menus/{menu_id}/{sha256}.{ext}"""
+    return f"menus/{menu_id}/{content_hash}.{extension}"
+
+
+def direct_upload_path(menu_id: str, extension: str) -> str:
+    """
+    Server-chosen path for an object a client uploads directly.
+    
+    The client's bytes are never hashed by the API, so they are not stored
+    under a content-addressed name (content_hash_of returns None for it).
+    """
+    return f"menus/{menu_id}/{uuid.uuid4().hex}.{extension}"
+
+
+def content_hash_of(storage_path: str) -> str | None:
+    """Inverse of content_path; None for paths that are not content-addressed."""
+    stem = storage_path.rsplit("/", 1)[-1].split(".", 1)[0]
+    if len(stem) == 64 and all(c in "0123456789abcdef" for c in stem):
+        return stem
+    return None
+
+
+async def upload_file(
+    menu_id: str,
+    content: bytes | AsyncIterable[bytes],
+    extension: str,
+    content_hash: str,
+) -> StorageResult:
+    """
+    Upload a file to Supabase Storage at its content-addressed path.
+    
+    Content may be an async byte stream, in which case chunks are sent as
+    they are produced and the file is never held in memory as a whole.
+    Exceptions raised by the stream abort the request and propagate.
+    
+    Writes with upsert: the path is derived from the bytes, so overwriting
+    is idempotent, and concurrent uploads of the same content both succeed
+    instead of the second failing on an existing object.
     
     Args:
         menu_id: The menu ID to associate this image with
-        file_bytes: Raw bytes of the file
+        content: Raw bytes of the file, or an async iterable of chunks
         extension: File extension without dot (e.g., 'jpg', 'png', 'webp')
+        content_hash: Hex SHA-256 of the content (names the object)
         
     Returns:
         StorageResult with 'path' and 'url' keys
         
     Raises:
         StorageConfigError: If storage is not configured
+        CircuitOpenError: If storage is failing and calls are short-circuited
         httpx.HTTPStatusError: If upload fails
     """
-    supabase_url, service_role_key, bucket_name = _get_storage_config()
-    
-    # Generate deterministic path: menus/{menu_id}/{uuid}.{ext}
-    file_uuid = str(uuid.uuid4())
-    storage_path = f"menus/{menu_id}/{file_uuid}.{extension}"
-    
-    # Supabase Storage upload endpoint
-    upload_url = f"{supabase_url}/storage/v1/object/{bucket_name}/{storage_path}"
+    # Same bytes, same path: menus/{menu_id}/{sha256}.{ext}
+    storage_path = content_path(menu_id, content_hash, extension)
     
     # Determine content type from extension
     content_types = {
@@ -89,24 +411,46 @@ def upload_file(menu_id: str, file_bytes: bytes, extension: str) -> StorageResul
     }
     content_type = content_types.get(extension.lower(), "application/octet-stream")
     
-    headers = {
-        "Authorization": f"Bearer {service_role_key}",
-        "Content-Type": content_type,
-    }
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await put_object(storage_path, content, content_type, upsert=True)
+        outcome = "ok"
+        return result
+    finally:
+        STORAGE_UPLOAD_DURATION.labels(outcome).observe(time.perf_counter() - started)
+
+
+async def delete_files(paths: list[str]) -> None:
+    """
+    Delete objects from Supabase Storage in a single request.
     
-    logger.info(f"Uploading file to storage: {storage_path}")
+    Used to roll back uploads that already succeeded when a later file in
+    the same request fails.
     
-    with httpx.Client() as client:
-        response = client.post(
-            upload_url,
-            content=file_bytes,
-            headers=headers,
-        )
-        response.raise_for_status()
+    Args:
+        paths: Object paths inside the bucket (e.g. 'menus/{menu_id}/{uuid}.jpg')
+        
+    Raises:
+        StorageConfigError: If storage is not configured
+        CircuitOpenError: If storage is failing and calls are short-circuited
+        httpx.HTTPStatusError: If deletion fails
+    """
+    if not paths:
+        return
     
-    # Construct public URL
-    public_url = f"{supabase_url}/storage/v1/object/public/{bucket_name}/{storage_path}"
+    config = _get_storage_config()
+    delete_url = f"{config.supabase_url}/storage/v1/object/{config.bucket_name}"
     
-    logger.info(f"Upload successful: {storage_path}")
+    response = await _get_policy().request(
+        lambda: _get_client().request(
+            "DELETE",
+            delete_url,
+            json={"prefixes": paths},
+            headers=config.auth_headers,
+        ),
+        budget=get_settings().STORAGE_CALL_TIMEOUT_SECONDS,
+    )
+    response.raise_for_status()
     
-    return StorageResult(path=storage_path, url=public_url)
+    logger.info(f"Deleted {len(paths)} object(s) from storage")
@@ -0,0 +1,39 @@
+"""
+Resumable uploads.
+tus-style sessions: create, append chunks at offsets, query the offset,
+then finalize into the regular content-addressed image storage.
+"""
+
+from app.uploads.staging import (
+    UploadOffsetMismatchError,
+    UploadSession,
+    UploadSessionBusyError,
+    UploadTooLargeError,
+    append_chunk,
+    close_uploads,
+    create_session,
+    delete_session,
+    get_session,
+    hash_staged,
+    iter_staged,
+    locked_upload,
+    read_head,
+    start_uploads,
+)
+
+__all__ = [
+    "UploadOffsetMismatchError",
+    "UploadSession",
+    "UploadSessionBusyError",
+    "UploadTooLargeError",
+    "append_chunk",
+    "close_uploads",
+    "create_session",
+    "delete_session",
+    "get_session",
+    "hash_staged",
+    "iter_staged",
+    "locked_upload",
+    "read_head",
+    "start_uploads",
+]
@@ -0,0 +1,288 @@
+"""
+Resumable upload sessions staged on local disk.
+Each session is a pair of files under UPLOAD_STAGING_DIR/{user_id}/:
+{upload_id}.json (what is being uploaded) and {upload_id}.part (the bytes
+received so far). The offset is the size of the .part file, so it survives
+dropped connections and worker restarts, and every chunk is appended
+straight to disk as it arrives; nothing is buffered beyond one chunk.
+
+A session belongs to one node's disk: with several nodes, uploads must be
+routed to the same node (sticky sessions). Sessions expire after
+UPLOAD_SESSION_TTL_SECONDS and are swept in the background.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterable, AsyncIterator, BinaryIO, NamedTuple
+
+from app.config import get_settings
+from app.logging import logger
+from app.media.validation import STREAM_CHUNK_BYTES
+
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_sweeper: asyncio.Task[None] | None = None
+
+
+class UploadSession(NamedTuple):
+    """A resumable upload and how far it has got."""
+    id: str
+    user_id: str
+    menu_id: str
+    content_type: str
+    extension: str
+    size: int  # Total bytes announced at creation
+    created_at: float  # Unix time
+    offset: int  # Bytes received so far
+
+
+class UploadSessionBusyError(Exception):
+    """Raised when another request is already writing to the session."""
+    pass
+
+
+class UploadOffsetMismatchError(Exception):
+    """Raised when a chunk does not start at the current offset."""
+
+    def __init__(self, offset: int) -> None:
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+class UploadTooLargeError(Exception):
+    """Raised when a chunk would grow the upload past its announced size."""
+    pass
+
+
+def _user_dir(user_id: str) -> str:
+    # user_id is a verified JWT subject (a UUID), never client-chosen text
+    return os.path.join(get_settings().UPLOAD_STAGING_DIR, user_id)
+
+
+def _paths(user_id: str, upload_id: str) -> tuple[str, str]:
+    base = os.path.join(_user_dir(user_id), upload_id)
+    return f"{base}.json", f"{base}.part"
+
+
+def _count_sessions(user_id: str) -> int:
+    try:
+        return sum(name.endswith(".json") for name in os.listdir(_user_dir(user_id)))
+    except FileNotFoundError:
+        return 0
+
+
+def _create(user_id: str, menu_id: str, content_type: str, extension: str, size: int) -> UploadSession:
+    os.makedirs(_user_dir(user_id), exist_ok=True)
+    session = UploadSession(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        menu_id=menu_id,
+        content_type=content_type,
+        extension=extension,
+        size=size,
+        created_at=time.time(),
+        offset=0,
+    )
+    meta_path, part_path = _paths(user_id, session.id)
+    open(part_path, "xb").close()
+    with open(meta_path, "x", encoding="utf-8") as f:
+        json.dump(session._asdict(), f)
+    return session
+
+
+def _load(user_id: str, upload_id: str) -> UploadSession | None:
+    if not _UPLOAD_ID.match(upload_id):
+        return None
+    meta_path, part_path = _paths(user_id, upload_id)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        offset = os.path.getsize(part_path)
+    except (FileNotFoundError, ValueError):
+        return None
+    if meta["created_at"] + get_settings().UPLOAD_SESSION_TTL_SECONDS < time.time():
+        return None
+    return UploadSession(**{**meta, "offset": offset})
+
+
+def _delete(user_id: str, upload_id: str) -> None:
+    for path in _paths(user_id, upload_id):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _open_locked(path: str) -> BinaryIO:
+    f = open(path, "r+b")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        raise UploadSessionBusyError("Upload is busy")
+    return f
+
+
+async def create_session(
+    user_id: str, menu_id: str, content_type: str, extension: str, size: int
+) -> UploadSession | None:
+    """
+    Start a new upload session.
+
+    Returns:
+        The session, or None if the user already has
+        UPLOAD_MAX_SESSIONS_PER_USER open sessions
+    """
+    if await asyncio.to_thread(_count_sessions, user_id) >= get_settings().UPLOAD_MAX_SESSIONS_PER_USER:
+        return None
+    return await asyncio.to_thread(_create, user_id, menu_id, content_type, extension, size)
+
+
+async def get_session(user_id: str, upload_id: str) -> UploadSession | None:
+    """The user's session with its current offset, or None if unknown or expired."""
+    return await asyncio.to_thread(_load, user_id, upload_id)
+
+
+async def delete_session(user_id: str, upload_id: str) -> None:
+    """Remove a session and its staged bytes (no-op if already gone)."""
+    await asyncio.to_thread(_delete, user_id, upload_id)
+
+
+async def append_chunk(session: UploadSession, offset: int, chunks: AsyncIterable[bytes]) -> int:
+    """
+    Append a request body at offset, writing each chunk as it arrives.
+
+    Bytes written before the client disconnects are kept, so the client
+    resumes from the new offset instead of re-sending them.
+
+    Returns:
+        The new offset
+
+    Raises:
+        UploadSessionBusyError: If another request is writing to the session
+        UploadOffsetMismatchError: If offset is not the current offset
+        UploadTooLargeError: If the body goes past the announced size
+            (nothing beyond the size is kept)
+    """
+    _, part_path = _paths(session.user_id, session.id)
+    f = await asyncio.to_thread(_open_locked, part_path)
+    try:
+        current = await asyncio.to_thread(os.fstat, f.fileno())
+        if current.st_size != offset:
+            raise UploadOffsetMismatchError(current.st_size)
+        f.seek(offset)
+        written = offset
+        async for chunk in chunks:
+            if written + len(chunk) > session.size:
+                chunk = chunk[:session.size - written]
+                await asyncio.to_thread(f.write, chunk)
+                raise UploadTooLargeError(f"Upload exceeds its announced size of {session.size} bytes")
+            await asyncio.to_thread(f.write, chunk)
+            written += len(chunk)
+        return written
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+@asynccontextmanager
+async def locked_upload(session: UploadSession) -> AsyncIterator[BinaryIO]:
+    """
+    Hold the session's write lock and yield its staged file for reading.
+
+    Raises:
+        UploadSessionBusyError: If another request is writing to the session
+    """
+    _, part_path = _paths(session.user_id, session.id)
+    f = await asyncio.to_thread(_open_locked, part_path)
+    try:
+        yield f
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+def _read_head(user_id: str, upload_id: str, length: int) -> bytes:
+    _, part_path = _paths(user_id, upload_id)
+    with open(part_path, "rb") as f:
+        return f.read(length)
+
+
+async def read_head(session: UploadSession, length: int) -> bytes:
+    """The first length bytes received so far (fewer if not yet uploaded)."""
+    return await asyncio.to_thread(_read_head, session.user_id, session.id, length)
+
+
+def _hash_and_head(f: BinaryIO, head_bytes: int) -> tuple[str, bytes]:
+    f.seek(0)
+    head = f.read(head_bytes)
+    digest = hashlib.sha256(head)
+    while chunk := f.read(STREAM_CHUNK_BYTES):
+        digest.update(chunk)
+    return digest.hexdigest(), head
+
+
+async def hash_staged(f: BinaryIO, head_bytes: int) -> tuple[str, bytes]:
+    """SHA-256 of a staged file and its first head_bytes, in one pass off the loop."""
+    return await asyncio.to_thread(_hash_and_head, f, head_bytes)
+
+
+async def iter_staged(f: BinaryIO) -> AsyncIterator[bytes]:
+    """Stream a staged file from the start, one chunk in memory at a time."""
+    await asyncio.to_thread(f.seek, 0)
+    while chunk := await asyncio.to_thread(f.read, STREAM_CHUNK_BYTES):
+        yield chunk
+
+
+def _sweep() -> int:
+    settings = get_settings()
+    cutoff = time.time() - settings.UPLOAD_SESSION_TTL_SECONDS
+    removed = 0
+    try:
+        user_dirs = os.scandir(settings.UPLOAD_STAGING_DIR)
+    except FileNotFoundError:
+        return 0
+    with user_dirs:
+        for user_dir in user_dirs:
+            if not user_dir.is_dir():
+                continue
+            for entry in os.scandir(user_dir.path):
+                if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                    _delete(user_dir.name, entry.name.removesuffix(".json"))
+                    removed += 1
+    return removed
+
+
+async def _sweep_loop() -> None:
+    while True:
+        try:
+            removed = await asyncio.to_thread(_sweep)
+            if removed:
+                logger.info(f"Removed {removed} expired upload session(s)")
+        except OSError as e:
+            logger.warning(f"Upload session sweep failed: {e}")
+        await asyncio.sleep(get_settings().UPLOAD_SWEEP_INTERVAL_SECONDS)
+
+
+async def start_uploads() -> None:
+    """Start sweeping expired upload sessions."""
+    global _sweeper
+    _sweeper = asyncio.create_task(_sweep_loop())
+
+
+async def close_uploads() -> None:
+    """Stop the sweeper (staged sessions stay on disk for the next run)."""
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        try:
+            await _sweeper
+        except asyncio.CancelledError:
+            pass
+        _sweeper = None
@@ -0,0 +1,80 @@
+"""
+Background execution for work that must stay off the request path.
+A lifespan-managed process pool runs CPU-bound jobs (image decoding and
+encoding) outside the API process, and fire-and-forget tasks are tracked
+here so they are not garbage-collected mid-flight and can be cancelled on
+shutdown.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Coroutine, TypeVar
+
+from app.config import get_settings
+from app.logging import logger
+
+
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+_background_tasks: set[asyncio.Task[Any]] = set()
+
+
+async def start_workers() -> None:
+    """Create the process pool at application startup."""
+    global _pool
+    settings = get_settings()
+    # spawn: forking a process that already runs an event loop and driver
+    # threads is unsafe; workers import only what their job needs
+    _pool = ProcessPoolExecutor(
+        max_workers=settings.WORKER_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=settings.WORKER_MAX_TASKS_PER_CHILD,
+    )
+    logger.info(f"Worker pool ready (processes={settings.WORKER_PROCESSES})")
+
+
+async def close_workers() -> None:
+    """Cancel background tasks and shut the process pool down."""
+    global _pool
+    tasks = list(_background_tasks)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"Cancelled {len(tasks)} background task(s) at shutdown")
+
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+async def run_in_process(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a picklable, module-level function in the process pool.
+
+    Raises:
+        RuntimeError: If the pool was not started
+    """
+    if _pool is None:
+        raise RuntimeError("Worker pool is not running")
+    return await asyncio.get_running_loop().run_in_executor(_pool, func, *args)
+
+
+def spawn_background(coro: Coroutine[Any, Any, Any], name: str) -> None:
+    """
+    Run a coroutine as a detached task.
+
+    The coroutine is expected to handle and log its own errors; anything
+    that escapes is logged here so it never disappears silently.
+    """
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_done)
+
+
+def _on_background_done(task: asyncio.Task[Any]) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed: {task.exception()}")
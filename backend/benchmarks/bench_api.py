@@ -0,0 +1,282 @@
+"""
+Benchmark: API latency and throughput against local Supabase stand-ins.
+
+Boots the app from app.main:create_app under uvicorn, with Storage and
+JWKS served by benchmarks.stubs (optionally delayed to model a remote
+project), and drives each scenario with a fixed number of concurrent
+clients over real HTTP:
+
+    health, menu_get, menu_list, menu_update, upload, public_read
+
+Postgres is real (DATABASE_URL, migrations applied). Benchmark menus are
+owned by a fresh random user and deleted afterwards. Upload admission
+limits are lifted, so the upload scenario measures uploads, not the
+per-user rate limiter.
+
+Usage (from backend/):
+    pip install -r benchmarks/requirements.txt
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_api \\
+        [--requests 500] [--concurrency 16] [--storage-latency-ms 20] \\
+        [--jwks-latency-ms 50] [--json out.json] \\
+        [--compare baseline.json --tolerance 0.2]
+
+With --compare, the run fails (exit 1) when any scenario's p95 latency or
+throughput is worse than the baseline by more than the tolerance.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import asyncpg
+import httpx
+from PIL import Image
+
+from benchmarks.stubs import StubLatency, SupabaseStub, ThreadedServer
+
+
+SCENARIOS = ("health", "menu_get", "menu_list", "menu_update", "upload", "public_read")
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def make_menu_data(categories: int = 5, items_per_category: int = 10) -> dict[str, Any]:
+    """A valid schema v1 menu of realistic size."""
+    return {
+        "schema_version": 1,
+        "title": "Benchmark Menu",
+        "categories": [
+            {
+                "name": f"Category {c}",
+                "items": [
+                    {"name": f"Item {c}-{i}", "description": "Lorem ipsum dolor sit amet", "price": 10 + i}
+                    for i in range(items_per_category)
+                ],
+            }
+            for c in range(categories)
+        ],
+    }
+
+
+def make_jpeg() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 900), (180, 120, 60)).save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+async def seed_menus(database_url: str, user_id: str, count: int) -> list[str]:
+    """Insert `count` menus for user_id; the first one is published."""
+    data = json.dumps(make_menu_data())
+    connection = await asyncpg.connect(database_url)
+    try:
+        rows = await connection.fetch(
+            """
+            INSERT INTO menus (user_id, data, is_published)
+            SELECT $1, $2::jsonb, n = 1 FROM generate_series(1, $3) AS n
+            RETURNING id, is_published
+            """,
+            uuid.UUID(user_id), data, count,
+        )
+    finally:
+        await connection.close()
+    return [str(r["id"]) for r in sorted(rows, key=lambda r: not r["is_published"])]
+
+
+async def delete_menus(database_url: str, user_id: str) -> None:
+    connection = await asyncpg.connect(database_url)
+    try:
+        await connection.execute("DELETE FROM menus WHERE user_id = $1", uuid.UUID(user_id))
+    finally:
+        await connection.close()
+
+
+def build_scenarios(menu_ids: list[str], files_per_upload: int) -> dict[str, tuple[Request, int]]:
+    """Scenario name -> (request function, expected status)."""
+    published_id, *own_ids = menu_ids
+    data = make_menu_data()
+    jpeg = make_jpeg()
+
+    def upload_files(i: int) -> list[tuple[str, tuple[str, bytes, str]]]:
+        # Trailing bytes after the JPEG end marker make every file unique,
+        # so content-addressed de-duplication never short-circuits the upload
+        return [
+            ("files", (f"page{n}.jpg", jpeg + f"{i}-{n}-{uuid.uuid4()}".encode(), "image/jpeg"))
+            for n in range(files_per_upload)
+        ]
+
+    return {
+        "health": (lambda c, i: c.get("/api/health"), 200),
+        "menu_get": (lambda c, i: c.get(f"/api/menus/{own_ids[i % len(own_ids)]}"), 200),
+        "menu_list": (lambda c, i: c.get("/api/menus/", params={"limit": 20}), 200),
+        "menu_update": (lambda c, i: c.put(f"/api/menus/{own_ids[i % len(own_ids)]}", json={"data": data}), 200),
+        "upload": (lambda c, i: c.post(f"/api/menus/{own_ids[i % len(own_ids)]}/images", files=upload_files(i)), 200),
+        "public_read": (lambda c, i: c.get(f"/api/public/menus/{published_id}"), 200),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    request: Request,
+    expected_status: int,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> dict[str, float]:
+    """Issue `requests` requests from `concurrency` workers; latency stats in ms."""
+    for i in range(warmup):
+        await request(client, i)
+
+    samples: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await request(client, i)
+                ok = response.status_code == expected_status
+            except httpx.HTTPError:
+                ok = False
+            samples.append((time.perf_counter() - started) * 1000)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": requests / wall,
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": percentiles[49],
+        "p95_ms": percentiles[94],
+        "p99_ms": percentiles[98],
+    }
+
+
+def compare(results: dict[str, dict[str, float]], baseline_path: Path, tolerance: float) -> list[str]:
+    """Regressions beyond tolerance, as printable lines."""
+    baseline = json.loads(baseline_path.read_text())["results"]
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.2f}ms -> {stats['p95_ms']:.2f}ms")
+        if stats["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {before['throughput_rps']:.1f} -> {stats['throughput_rps']:.1f} req/s"
+            )
+        if stats["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {stats['errors']}")
+    return regressions
+
+
+async def drive(args: argparse.Namespace, base_url: str, token: str, menu_ids: list[str]) -> dict[str, Any]:
+    scenarios = build_scenarios(menu_ids, args.upload_files)
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        print(f"{'scenario':<12} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for name in args.scenarios:
+            request, expected_status = scenarios[name]
+            requests = args.upload_requests if name == "upload" else args.requests
+            stats = await run_scenario(client, request, expected_status, requests, args.concurrency, args.warmup)
+            results[name] = stats
+            print(
+                f"{name:<12} {stats['throughput_rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+                f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['errors']:>7}"
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--upload-requests", type=int, default=100)
+    parser.add_argument("--upload-files", type=int, default=3, help="Images per upload request")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--menus", type=int, default=20, help="Menus seeded for the benchmark user")
+    parser.add_argument("--storage-latency-ms", type=float, default=0.0)
+    parser.add_argument("--jwks-latency-ms", type=float, default=0.0)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+    if not args.database_url:
+        sys.exit("DATABASE_URL (or --database-url) is required")
+
+    stub = SupabaseStub(latency=StubLatency(
+        storage=args.storage_latency_ms / 1000, jwks=args.jwks_latency_ms / 1000
+    ))
+    with ThreadedServer(stub.asgi_app()) as supabase:
+        # Settings are read on first import of the app, so configure first
+        os.environ.update(
+            ENV="bench",
+            LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+            FRONTEND_ORIGIN="http://127.0.0.1",
+            DATABASE_URL=args.database_url,
+            SUPABASE_URL=supabase.url,
+            SUPABASE_SERVICE_ROLE_KEY="bench-service-role-key",
+            SUPABASE_STORAGE_BUCKET="bench",
+            # One benchmark user sends every upload: admission control would
+            # turn the upload scenario into a measurement of the rate limiter
+            UPLOAD_RATE_PER_MINUTE="1000000",
+            UPLOAD_BURST="1000000",
+            UPLOAD_MAX_INFLIGHT_BYTES=str(1 << 40),
+        )
+        from app.main import create_app
+
+        user_id = str(uuid.uuid4())
+        menu_ids = asyncio.run(seed_menus(args.database_url, user_id, args.menus))
+        try:
+            with ThreadedServer(create_app(), lifespan="on") as api:
+                token = stub.issue_token(supabase.url, user_id)
+                results = asyncio.run(drive(args, api.url, token, menu_ids))
+        finally:
+            asyncio.run(delete_menus(args.database_url, user_id))
+
+    report = {
+        "config": {
+            "requests": args.requests,
+            "upload_requests": args.upload_requests,
+            "upload_files": args.upload_files,
+            "concurrency": args.concurrency,
+            "storage_latency_ms": args.storage_latency_ms,
+            "jwks_latency_ms": args.jwks_latency_ms,
+            "python": sys.version.split()[0],
+        },
+        "results": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
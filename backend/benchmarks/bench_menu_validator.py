@@ -0,0 +1,112 @@
+"""
+Benchmark: precompiled menu validator vs reference JSON Schema validator.
+
+Compares app.schemas.validate_menu_data (pydantic-core, compiled once) with
+jsonschema's Draft 2020-12 validator for contracts/menu.schema.v1.json on
+small, medium and 1,000-item menus. Before timing, both validators are
+checked to agree on every document in contracts/examples.
+
+Usage (from backend/):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.bench_menu_validator [--repeat 200] [--json out.json]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import jsonschema
+
+from app.schemas import validate_menu_data
+
+
+CONTRACTS_DIR = Path(__file__).resolve().parents[2] / "contracts"
+
+
+def make_menu(categories: int, items_per_category: int) -> dict[str, Any]:
+    """Build a valid menu with the given shape."""
+    return {
+        "schema_version": 1,
+        "title": "Benchmark Menu",
+        "categories": [
+            {
+                "name": f"Category {c}",
+                "items": [
+                    {
+                        "name": f"Item {c}-{i}",
+                        "description": "Lorem ipsum dolor sit amet",
+                        "price": 10 + i if i % 3 else f"{i} TL",
+                    }
+                    for i in range(items_per_category)
+                ],
+            }
+            for c in range(categories)
+        ],
+        "theme": {"primaryColor": "#aa0000", "font": "Inter"},
+    }
+
+
+def check_conformance(reference: jsonschema.protocols.Validator) -> None:
+    """Fail loudly if the two validators disagree on any contract example."""
+    examples = json.loads((CONTRACTS_DIR / "examples" / "menu.examples.json").read_text())
+    for group in ("valid_examples", "invalid_examples"):
+        for example in examples[group]:
+            ours = not validate_menu_data(example["data"])
+            theirs = reference.is_valid(example["data"])
+            if ours != theirs:
+                sys.exit(f"Validators disagree on '{example['name']}': ours={ours}, reference={theirs}")
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Run fn `repeat` times and return latency stats in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": statistics.fmean(samples),
+        "p50_us": samples[len(samples) // 2],
+        "p95_us": samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+    
+    schema = json.loads((CONTRACTS_DIR / "menu.schema.v1.json").read_text())
+    reference = jsonschema.Draft202012Validator(schema)
+    check_conformance(reference)
+    
+    sizes = {
+        "small (10 items)": make_menu(2, 5),
+        "medium (100 items)": make_menu(10, 10),
+        "large (1000 items)": make_menu(20, 50),
+    }
+    
+    results = []
+    print(f"{'menu':<20} {'validator':<12} {'mean µs':>10} {'p50 µs':>10} {'p95 µs':>10}")
+    for label, menu in sizes.items():
+        assert not validate_menu_data(menu) and reference.is_valid(menu)
+        for name, fn in (
+            ("compiled", lambda: validate_menu_data(menu)),
+            ("jsonschema", lambda: reference.is_valid(menu)),
+        ):
+            stats = time_call(fn, args.repeat)
+            results.append({"menu": label, "validator": name, **stats})
+            print(f"{label:<20} {name:<12} {stats['mean_us']:>10.1f} {stats['p50_us']:>10.1f} {stats['p95_us']:>10.1f}")
+    
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
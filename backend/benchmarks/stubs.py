@@ -0,0 +1,122 @@
+"""
+Local stand-ins for the Supabase services the API calls.
+
+- Storage: /storage/v1/object/{bucket}/{path} (POST, GET, HEAD) and bulk
+  DELETE /storage/v1/object/{bucket}, backed by an in-memory dict
+- Auth: /auth/v1/.well-known/jwks.json serving one RSA key, plus a helper
+  that signs RS256 access tokens the API accepts
+
+Every response is delayed by a configurable latency so benchmarks can
+model a remote Supabase project. Servers run on their own thread and event
+loop, so they never compete with the API's loop.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import jwt
+import uvicorn
+from cryptography.hazmat.primitives.asymmetric import rsa
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.types import ASGIApp
+
+
+@dataclass
+class StubLatency:
+    """Injected delay per request, in seconds."""
+    storage: float = 0.0
+    jwks: float = 0.0
+
+
+@dataclass
+class SupabaseStub:
+    """In-memory Storage + JWKS server state."""
+    latency: StubLatency = field(default_factory=StubLatency)
+    objects: dict[str, bytes] = field(default_factory=dict)
+    kid: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+
+    def __post_init__(self) -> None:
+        self._private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def jwks(self) -> dict:
+        jwk = jwt.algorithms.RSAAlgorithm.to_jwk(self._private_key.public_key(), as_dict=True)
+        return {"keys": [{**jwk, "kid": self.kid, "alg": "RS256", "use": "sig"}]}
+
+    def issue_token(self, base_url: str, user_id: str, ttl_seconds: int = 3600) -> str:
+        """Sign an access token as Supabase Auth at base_url would."""
+        now = int(time.time())
+        claims = {
+            "sub": user_id,
+            "aud": "authenticated",
+            "iss": f"{base_url}/auth/v1",
+            "role": "authenticated",
+            "iat": now,
+            "exp": now + ttl_seconds,
+        }
+        return jwt.encode(claims, self._private_key, algorithm="RS256", headers={"kid": self.kid})
+
+    def asgi_app(self) -> Starlette:
+        async def jwks(request: Request) -> Response:
+            await asyncio.sleep(self.latency.jwks)
+            return JSONResponse(self.jwks())
+
+        async def object_(request: Request) -> Response:
+            await asyncio.sleep(self.latency.storage)
+            path = request.path_params["path"]
+            if request.method == "POST":
+                self.objects[path] = await request.body()
+                return JSONResponse({"Key": path})
+            if path not in self.objects:
+                return JSONResponse({"error": "not_found"}, status_code=400)
+            if request.method == "HEAD":
+                return Response(headers={"content-length": str(len(self.objects[path]))})
+            return Response(self.objects[path])
+
+        async def delete_objects(request: Request) -> Response:
+            await asyncio.sleep(self.latency.storage)
+            prefixes = (await request.json()).get("prefixes", [])
+            deleted = [{"name": p} for p in prefixes if self.objects.pop(p, None) is not None]
+            return JSONResponse(deleted)
+
+        return Starlette(routes=[
+            Route("/auth/v1/.well-known/jwks.json", jwks),
+            Route("/storage/v1/object/{bucket}/{path:path}", object_, methods=["GET", "HEAD", "POST"]),
+            Route("/storage/v1/object/{bucket}", delete_objects, methods=["DELETE"]),
+        ])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ThreadedServer:
+    """uvicorn serving an ASGI app on a background thread."""
+
+    def __init__(self, app: ASGIApp, port: int | None = None, lifespan: str = "off") -> None:
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, lifespan=lifespan, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "ThreadedServer":
+        self._thread.start()
+        deadline = time.monotonic() + 30
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Server on port {self.port} failed to start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=30)
@@ -0,0 +1,22 @@
+-- Migration: 002_menus_listing_index
+-- Phase-5: Keyset-paginated menu listing
+-- Created: 2026-10-16
+-- Description: Adds a stored title column derived from data->>'title' and a
+--   composite index on (user_id, updated_at DESC, id DESC) covering the
+--   summary columns, so listing a page is an index-only range scan that never
+--   reads the JSONB document.
+-- IMMUTABLE: Do not modify this migration after deployment
+
+-- Title projected out of the JSONB document (kept in sync by Postgres)
+ALTER TABLE menus
+    ADD COLUMN IF NOT EXISTS title TEXT GENERATED ALWAYS AS (data->>'title') STORED;
+
+-- Keyset pagination index: WHERE user_id = $1 AND (updated_at, id) < ($2, $3)
+CREATE INDEX IF NOT EXISTS idx_menus_user_updated_id
+    ON menus (user_id, updated_at DESC, id DESC)
+    INCLUDE (title, is_published);
+
+-- The composite index also serves plain user_id lookups
+DROP INDEX IF EXISTS idx_menus_user_id;
+
+COMMENT ON COLUMN menus.title IS 'Generated from data->>''title''. Read-only; used by menu listing.';
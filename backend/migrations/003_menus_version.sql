@@ -0,0 +1,12 @@
+-- Migration: 003_menus_version
+-- Phase-5: Optimistic concurrency for menu edits
+-- Created: 2026-10-17
+-- Description: Adds a version counter incremented on every change to
+--   menus.data. Exposed to clients as the menu ETag; PATCH requests carry it
+--   in If-Match and are rejected with 409 when it is stale.
+-- IMMUTABLE: Do not modify this migration after deployment
+
+ALTER TABLE menus
+    ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+COMMENT ON COLUMN menus.version IS 'Incremented on every data change. Used as ETag / If-Match for concurrent edits.';
@@ -0,0 +1,30 @@
+-- Migration: 004_menu_images
+-- Phase-4: Image derivatives
+-- Created: 2026-10-17
+-- Description: Tracks uploaded originals and their resized WebP derivatives.
+--   Rows are inserted as 'pending' when an upload succeeds; a background
+--   worker fills in derivatives (width -> storage path) and marks them 'ready'.
+-- IMMUTABLE: Do not modify this migration after deployment
+
+CREATE TABLE IF NOT EXISTS menu_images (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    menu_id UUID NOT NULL REFERENCES menus(id) ON DELETE CASCADE,
+
+    -- Storage path of the original, e.g. menus/{menu_id}/{uuid}.jpg
+    path TEXT NOT NULL UNIQUE,
+
+    status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'ready', 'failed')),
+
+    -- {"320": "menus/{menu_id}/{uuid}_w320.webp", ...}
+    derivatives JSONB NOT NULL DEFAULT '{}'::jsonb,
+
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_menu_images_menu_created
+    ON menu_images(menu_id, created_at);
+
+COMMENT ON TABLE menu_images IS 'Uploaded menu images and their WebP derivatives. Ownership via menus.user_id.';
+COMMENT ON COLUMN menu_images.derivatives IS 'Width (px) to storage path of each WebP derivative; empty until ready.';
@@ -0,0 +1,17 @@
+-- Migration: 005_menu_images_content_hash
+-- Phase-4: Content-addressed image storage
+-- Created: 2026-10-17
+-- Description: Originals are stored at menus/{menu_id}/{sha256}.{ext}.
+--   content_hash is the per-menu index of image hashes: uploads look it up
+--   to skip transferring bytes the menu already has, and OCR uses it as a
+--   stable cache key. NULL for images uploaded before this migration.
+-- IMMUTABLE: Do not modify this migration after deployment
+
+ALTER TABLE menu_images
+    ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_menu_images_menu_hash
+    ON menu_images(menu_id, content_hash)
+    WHERE content_hash IS NOT NULL;
+
+COMMENT ON COLUMN menu_images.content_hash IS 'Hex SHA-256 of the original bytes; also names the storage object.';
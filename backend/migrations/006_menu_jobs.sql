@@ -0,0 +1,40 @@
+-- Migration: 006_menu_jobs
+-- Phase-7: Asynchronous OCR + parse jobs
+-- Created: 2026-10-17
+-- Description: One row per background job. POST /api/menus creates a row
+--   ('queued') and returns its id; an in-process worker claims it
+--   ('running'), reports stage/progress, and stores the outcome
+--   ('succeeded' with result, or 'failed' with error). Rows live in Postgres
+--   so any API instance can answer GET /api/jobs/{id}.
+-- IMMUTABLE: Do not modify this migration after deployment
+
+CREATE TABLE IF NOT EXISTS menu_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    menu_id UUID NOT NULL REFERENCES menus(id) ON DELETE CASCADE,
+
+    -- Owner at creation time; GET /api/jobs/{id} is owner-only
+    user_id UUID NOT NULL,
+
+    kind TEXT NOT NULL,
+
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    stage TEXT,
+    progress INTEGER NOT NULL DEFAULT 0 CHECK (progress BETWEEN 0 AND 100),
+
+    -- Job input, e.g. {"image_paths": [...]}
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+    result JSONB,
+    error TEXT,
+
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Workers pick up unfinished jobs at startup
+CREATE INDEX IF NOT EXISTS idx_menu_jobs_unfinished
+    ON menu_jobs(created_at)
+    WHERE status IN ('queued', 'running');
+
+COMMENT ON TABLE menu_jobs IS 'Background jobs (OCR + parse). Ownership via user_id.';
+COMMENT ON COLUMN menu_jobs.result IS 'Job output on success; raw OCR text and partial data on parse failure.';
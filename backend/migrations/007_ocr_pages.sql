@@ -0,0 +1,28 @@
+-- Migration: 007_ocr_pages
+-- Phase-7: OCR result cache
+-- Created: 2026-10-17
+-- Description: Normalized OCR text per image, keyed by the image's SHA-256
+--   (the same hash that names the stored original) and the provider, plus
+--   the cached parse of that page. Re-running a menu only OCRs and parses
+--   pages missing here; parses from an older parser_version are redone.
+--   Not owner-scoped: identical bytes yield identical text.
+-- IMMUTABLE: Do not modify this migration after deployment
+
+CREATE TABLE IF NOT EXISTS ocr_pages (
+    content_hash TEXT NOT NULL,
+    provider TEXT NOT NULL,
+
+    -- Normalized OCR text (one line per visual line)
+    text TEXT NOT NULL,
+
+    -- Page parse ({title, leading_items, categories}) and the parser version
+    parsed JSONB,
+    parser_version INTEGER,
+
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (content_hash, provider)
+);
+
+COMMENT ON TABLE ocr_pages IS 'OCR text and page parse cache keyed by image content hash.';
@@ -0,0 +1,14 @@
+-- Migration: 008_menu_jobs_attempts
+-- Phase-7: Job leases
+-- Created: 2026-10-17
+-- Description: Count how many times a job was claimed. A running job's
+--   updated_at is its heartbeat; a job whose heartbeat is older than
+--   JOB_LEASE_SECONDS lost its worker (crash, SIGKILL) and is re-queued, or
+--   failed once it has used up JOB_MAX_ATTEMPTS, so a job that kills its
+--   worker cannot loop forever.
+-- IMMUTABLE: Do not modify this migration after deployment
+
+ALTER TABLE menu_jobs
+    ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN menu_jobs.attempts IS 'Times the job was claimed by a worker.';
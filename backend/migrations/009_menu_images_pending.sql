@@ -0,0 +1,12 @@
+-- Migration: 009_menu_images_pending
+-- Phase-4: Derivative recovery
+-- Created: 2026-10-17
+-- Description: Derivative generation runs as a detached task, so a shutdown
+--   or crash mid-run leaves the row 'pending'. Each API process
+--   periodically reschedules 'pending' rows not touched for
+--   DERIVATIVE_STALE_SECONDS; this index keeps that scan off the full table.
+-- IMMUTABLE: Do not modify this migration after deployment
+
+CREATE INDEX IF NOT EXISTS idx_menu_images_pending
+    ON menu_images(updated_at)
+    WHERE status = 'pending';
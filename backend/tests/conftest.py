@@ -0,0 +1,37 @@
+"""
+Shared test setup.
+Settings are read when app modules are imported, so the required
+variables are set here first. Tests that need Postgres run against
+TEST_DATABASE_URL (a database with all migrations applied) and are
+skipped when it is not set. Async tests use the anyio pytest plugin.
+"""
+
+import os
+from typing import AsyncIterator
+
+import pytest
+
+os.environ.setdefault("ENV", "local")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("FRONTEND_ORIGIN", "http://localhost:5173")
+os.environ.setdefault("OCR_PROVIDER", "fake")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", "")
+
+from app.db import close_db, start_db  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def db() -> AsyncIterator[None]:
+    """Open the connection pool for one test (skips without TEST_DATABASE_URL)."""
+    if not os.environ["DATABASE_URL"]:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    await start_db()
+    try:
+        yield
+    finally:
+        await close_db()
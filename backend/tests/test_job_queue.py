@@ -0,0 +1,196 @@
+"""OCR job state transitions, against Postgres (see conftest.db)."""
+
+import hashlib
+import uuid
+from typing import Any
+
+import pytest
+
+from app.db import jobs as jobs_repo
+from app.db import menus as menus_repo
+from app.db import ocr as ocr_repo
+from app.db.pool import get_pool
+from app.jobs import queue
+
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("db")]
+
+EMPTY_MENU: dict[str, Any] = {"schema_version": 1, "title": "Draft", "categories": []}
+
+
+@pytest.fixture
+def storage(monkeypatch: pytest.MonkeyPatch) -> dict[str, bytes]:
+    """In-memory stand-in for the originals a job downloads."""
+    objects: dict[str, bytes] = {}
+
+    async def download_object(path: str) -> bytes | None:
+        return objects.get(path)
+
+    monkeypatch.setattr(queue, "download_object", download_object)
+    return objects
+
+
+async def _create_job(storage: dict[str, bytes], pages: int = 2) -> tuple[str, str, str]:
+    """A menu with pages stored, and a queued job for it: (menu_id, user_id, job_id)."""
+    user_id = str(uuid.uuid4())
+    menu = await menus_repo.create_menu(user_id, EMPTY_MENU)
+    assert menu is not None
+    images: list[queue.JobImage] = []
+    for i in range(pages):
+        path = f"menus/{menu['id']}/{uuid.uuid4().hex}.jpg"
+        storage[path] = f"page {i} {path}".encode()
+        images.append(queue.JobImage(path=path, content_hash=None))
+    job = await jobs_repo.create_job(
+        menu["id"], user_id, queue.OCR_JOB,
+        {"images": images, "expected_version": menu["version"]},
+    )
+    return menu["id"], user_id, job["id"]
+
+
+async def _get_job(job_id: str, user_id: str) -> jobs_repo.JobRecord:
+    job = await jobs_repo.get_owned_job(job_id, user_id)
+    assert job is not None
+    return job
+
+
+async def test_claim_moves_queued_to_running_once(storage: dict[str, bytes]) -> None:
+    _, user_id, job_id = await _create_job(storage)
+    assert (await _get_job(job_id, user_id))["status"] == "queued"
+
+    claimed = await jobs_repo.claim_job(job_id)
+
+    assert claimed is not None and claimed["status"] == "running"
+    assert await jobs_repo.claim_job(job_id) is None
+
+
+async def test_finish_only_applies_to_running_jobs(storage: dict[str, bytes]) -> None:
+    _, user_id, job_id = await _create_job(storage)
+
+    await jobs_repo.finish_job(job_id, "succeeded", result={})
+    assert (await _get_job(job_id, user_id))["status"] == "queued"
+
+    await jobs_repo.claim_job(job_id)
+    await jobs_repo.finish_job(job_id, "failed", error="boom")
+    job = await _get_job(job_id, user_id)
+    assert (job["status"], job["error"]) == ("failed", "boom")
+
+
+async def test_requeue_puts_running_job_back(storage: dict[str, bytes]) -> None:
+    _, user_id, job_id = await _create_job(storage)
+    await jobs_repo.claim_job(job_id)
+
+    await jobs_repo.requeue_job(job_id)
+
+    job = await _get_job(job_id, user_id)
+    assert (job["status"], job["stage"], job["progress"]) == ("queued", None, 0)
+
+
+async def test_run_succeeds_and_saves_menu(storage: dict[str, bytes]) -> None:
+    menu_id, user_id, job_id = await _create_job(storage)
+
+    await queue._run(job_id)
+
+    job = await _get_job(job_id, user_id)
+    assert job["status"] == "succeeded"
+    assert job["progress"] == 100
+    assert job["result"] is not None
+    menu = await menus_repo.get_owned_menu(menu_id, user_id)
+    assert menu is not None
+    assert menu["version"] == job["result"]["version"]
+    assert menu["data"] == job["result"]["data"]
+    assert menu["data"]["categories"]
+
+
+async def test_pages_without_trusted_hash_hit_the_cache_by_their_bytes(storage: dict[str, bytes]) -> None:
+    menu_id, user_id, job_id = await _create_job(storage, pages=1)
+    (data,) = storage.values()
+    await ocr_repo.save_ocr_text(hashlib.sha256(data).hexdigest(), "fake", "Çaylar\nDemlik Çay 90")
+
+    await queue._run(job_id)
+
+    menu = await menus_repo.get_owned_menu(menu_id, user_id)
+    assert menu is not None
+    assert menu["data"]["categories"] == [{"name": "Çaylar", "items": [{"name": "Demlik Çay", "price": 90}]}]
+
+
+async def test_run_fails_when_a_page_is_missing(storage: dict[str, bytes]) -> None:
+    _, user_id, job_id = await _create_job(storage)
+    storage.clear()
+
+    await queue._run(job_id)
+
+    job = await _get_job(job_id, user_id)
+    assert job["status"] == "failed"
+    assert "missing from storage" in (job["error"] or "")
+
+
+async def test_run_fails_on_version_conflict(storage: dict[str, bytes]) -> None:
+    menu_id, user_id, job_id = await _create_job(storage)
+    edited = {**EMPTY_MENU, "title": "Edited meanwhile"}
+    assert await menus_repo.replace_menu_data(menu_id, user_id, edited) is not None
+
+    await queue._run(job_id)
+
+    job = await _get_job(job_id, user_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "Menu was edited while it was being processed"
+    assert job["result"] is not None and job["result"]["partial"] is False
+    menu = await menus_repo.get_owned_menu(menu_id, user_id)
+    assert menu is not None and menu["data"]["title"] == "Edited meanwhile"
+
+
+async def test_run_skips_jobs_that_are_not_queued(storage: dict[str, bytes]) -> None:
+    menu_id, user_id, job_id = await _create_job(storage)
+    await jobs_repo.claim_job(job_id)
+
+    await queue._run(job_id)
+
+    assert (await _get_job(job_id, user_id))["status"] == "running"
+    menu = await menus_repo.get_owned_menu(menu_id, user_id)
+    assert menu is not None and menu["data"] == EMPTY_MENU
+
+
+async def test_expired_lease_is_requeued_then_failed(storage: dict[str, bytes]) -> None:
+    _, user_id, job_id = await _create_job(storage)
+    expire = "UPDATE menu_jobs SET updated_at = NOW() - INTERVAL '1 hour' WHERE id = $1::uuid"
+
+    await jobs_repo.claim_job(job_id)
+    await get_pool().execute(expire, job_id)
+    requeued, _ = await jobs_repo.recover_expired_jobs(lease_seconds=60, max_attempts=2)
+    assert job_id in requeued
+    assert (await _get_job(job_id, user_id))["status"] == "queued"
+
+    await jobs_repo.claim_job(job_id)
+    await get_pool().execute(expire, job_id)
+    requeued, _ = await jobs_repo.recover_expired_jobs(lease_seconds=60, max_attempts=2)
+    assert job_id not in requeued
+    assert (await _get_job(job_id, user_id))["status"] == "failed"
+
+
+async def test_live_lease_is_left_alone(storage: dict[str, bytes]) -> None:
+    _, user_id, job_id = await _create_job(storage)
+    await jobs_repo.claim_job(job_id)
+
+    requeued, _ = await jobs_repo.recover_expired_jobs(lease_seconds=60, max_attempts=2)
+
+    assert job_id not in requeued
+    assert (await _get_job(job_id, user_id))["status"] == "running"
+
+
+async def test_run_refreshes_published_menu(storage: dict[str, bytes], monkeypatch: pytest.MonkeyPatch) -> None:
+    menu_id, user_id, job_id = await _create_job(storage)
+    await menus_repo.publish_menu(menu_id, user_id)
+    synced: list[menus_repo.MenuRecord] = []
+
+    async def sync_public_menu(menu: menus_repo.MenuRecord) -> None:
+        synced.append(menu)
+
+    monkeypatch.setattr(queue, "sync_public_menu", sync_public_menu)
+
+    await queue._run(job_id)
+
+    job = await _get_job(job_id, user_id)
+    assert job["result"] is not None
+    assert [(m["id"], m["version"], m["is_published"]) for m in synced] == [
+        (menu_id, job["result"]["version"], True)
+    ]
@@ -0,0 +1,197 @@
+"""JWKSKeyStore against the local Supabase stub (benchmarks/stubs.py)."""
+
+import asyncio
+from typing import Any, Iterator
+
+import jwt
+import pytest
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.auth.jwks import JWKSKeyStore, JWKSUnavailableError
+from benchmarks.stubs import SupabaseStub, ThreadedServer
+
+
+pytestmark = pytest.mark.anyio
+
+JWKS_PATH = "/auth/v1/.well-known/jwks.json"
+
+
+class CountingJWKS:
+    """Wraps the stub: counts JWKS requests and can make them fail or serve another document."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.requests = 0
+        self.failing = False
+        self.document: Any = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] == JWKS_PATH:
+            self.requests += 1
+            if self.failing:
+                await Response(status_code=503)(scope, receive, send)
+                return
+            if self.document is not None:
+                await JSONResponse(self.document)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+@pytest.fixture(scope="module")
+def stub() -> SupabaseStub:
+    return SupabaseStub()
+
+
+@pytest.fixture(scope="module")
+def upstream(stub: SupabaseStub) -> Iterator[tuple[CountingJWKS, str]]:
+    """(counter, JWKS URL) of a stub server shared by this module's tests."""
+    counter = CountingJWKS(stub.asgi_app())
+    with ThreadedServer(counter) as server:
+        yield counter, f"{server.url}{JWKS_PATH}"
+
+
+@pytest.fixture
+def jwks(stub: SupabaseStub, upstream: tuple[CountingJWKS, str]) -> Iterator[CountingJWKS]:
+    counter, _ = upstream
+    original_kid = stub.kid
+    counter.requests, counter.failing, counter.document = 0, False, None
+    stub.latency.jwks = 0.0
+    yield counter
+    stub.kid = original_kid
+
+
+@pytest.fixture
+def url(upstream: tuple[CountingJWKS, str]) -> str:
+    return upstream[1]
+
+
+async def test_concurrent_unknown_kid_lookups_share_one_fetch(
+    stub: SupabaseStub, jwks: CountingJWKS, url: str
+) -> None:
+    store = JWKSKeyStore(url, refresh_interval=3600, min_refetch_interval=0)
+    stub.latency.jwks = 0.2
+    try:
+        keys = await asyncio.gather(*(store.get_signing_key(stub.kid) for _ in range(20)))
+    finally:
+        await store.close()
+
+    assert jwks.requests == 1
+    assert all(key.key_id == stub.kid for key in keys)
+
+
+async def test_rotated_kid_is_fetched_once(stub: SupabaseStub, jwks: CountingJWKS, url: str) -> None:
+    rotations = []
+    store = JWKSKeyStore(
+        url, refresh_interval=3600, min_refetch_interval=0, on_rotate=lambda: rotations.append(1)
+    )
+    try:
+        assert await store.refresh()
+        stub.kid = "rotated"
+        stub.latency.jwks = 0.2
+        keys = await asyncio.gather(*(store.get_signing_key("rotated") for _ in range(20)))
+    finally:
+        await store.close()
+
+    assert jwks.requests == 2
+    assert all(key.key_id == "rotated" for key in keys)
+    assert rotations == [1]
+
+
+async def test_unknown_kid_refetch_is_throttled(stub: SupabaseStub, jwks: CountingJWKS, url: str) -> None:
+    store = JWKSKeyStore(url, refresh_interval=3600, min_refetch_interval=60)
+    try:
+        assert await store.refresh()
+        for _ in range(5):
+            with pytest.raises(jwt.InvalidTokenError):
+                await store.get_signing_key("unknown")
+        # Known keys are still served from memory
+        assert (await store.get_signing_key(stub.kid)).key_id == stub.kid
+    finally:
+        await store.close()
+
+    assert jwks.requests == 1
+
+
+async def test_unknown_kid_refetches_once_the_interval_passed(
+    stub: SupabaseStub, jwks: CountingJWKS, url: str
+) -> None:
+    store = JWKSKeyStore(url, refresh_interval=3600, min_refetch_interval=0.2)
+    try:
+        assert await store.refresh()
+        await asyncio.sleep(0.3)
+        with pytest.raises(jwt.InvalidTokenError):
+            await store.get_signing_key("unknown")
+        with pytest.raises(jwt.InvalidTokenError):
+            await store.get_signing_key("unknown")
+    finally:
+        await store.close()
+
+    assert jwks.requests == 2
+
+
+async def test_failed_refresh_keeps_last_good_keys(stub: SupabaseStub, jwks: CountingJWKS, url: str) -> None:
+    store = JWKSKeyStore(url, refresh_interval=3600, min_refetch_interval=0)
+    try:
+        assert await store.refresh()
+        jwks.failing = True
+
+        assert not await store.refresh()
+        assert (await store.get_signing_key(stub.kid)).key_id == stub.kid
+        # An unknown kid still refetches, fails, and is rejected as unknown
+        with pytest.raises(jwt.InvalidTokenError):
+            await store.get_signing_key("unknown")
+    finally:
+        await store.close()
+
+    assert jwks.requests == 3
+
+
+async def test_never_loaded_store_is_unavailable(jwks: CountingJWKS, url: str) -> None:
+    jwks.failing = True
+    store = JWKSKeyStore(url, refresh_interval=3600, min_refetch_interval=0)
+    try:
+        await store.start()
+        with pytest.raises(JWKSUnavailableError):
+            await store.get_signing_key("any")
+    finally:
+        await store.close()
+
+
+@pytest.mark.parametrize("document", [
+    None,
+    [],
+    "keys",
+    {},
+    {"keys": None},
+    {"keys": "abc"},
+    {"keys": {"kid": "k1"}},
+    {"keys": [None, 1, "k1", [], True]},
+    {"keys": [{"kid": 1, "kty": "RSA"}, {"kid": "", "kty": "RSA"}, {"kty": "RSA"}]},
+    {"keys": [{"kid": "k1", "kty": "RSA", "n": 123, "e": "AQAB"}, {"kid": "k2", "kty": "XYZ"}]},
+])
+def test_parse_skips_malformed_documents_and_entries(document: Any) -> None:
+    assert JWKSKeyStore._parse(document) == {}
+
+
+def test_parse_keeps_good_keys_next_to_malformed_ones(stub: SupabaseStub) -> None:
+    (good,) = stub.jwks()["keys"]
+    document = {"keys": [None, "junk", {**good, "kid": "enc", "use": "enc"}, good, 42]}
+
+    assert list(JWKSKeyStore._parse(document)) == [stub.kid]
+
+
+async def test_malformed_entries_do_not_fail_the_refresh(stub: SupabaseStub, jwks: CountingJWKS, url: str) -> None:
+    jwks.document = {"keys": ["junk", None, *stub.jwks()["keys"]]}
+    store = JWKSKeyStore(url, refresh_interval=3600, min_refetch_interval=0)
+    try:
+        assert await store.refresh()
+        assert (await store.get_signing_key(stub.kid)).key_id == stub.kid
+
+        # Nothing usable left: rejected like any refresh without keys
+        jwks.document = {"keys": [None]}
+        assert not await store.refresh()
+        with pytest.raises(jwt.InvalidTokenError):
+            await store.get_signing_key("unknown")
+    finally:
+        await store.close()
@@ -0,0 +1,216 @@
+"""Image sniffing and the size-limited upload stream, on hand-built headers."""
+
+import struct
+
+import pytest
+
+from app.media.validation import (
+    STREAM_CHUNK_BYTES,
+    ImageInfo,
+    ImageTooLargeError,
+    LimitedStream,
+    sniff_image,
+)
+
+
+pytestmark = pytest.mark.anyio
+
+
+# --- Header builders ---
+
+SOI = b"\xff\xd8"
+EOI = b"\xff\xd9"
+
+
+def segment(marker: int, payload: bytes) -> bytes:
+    """A JPEG marker segment; the length field counts itself but not the marker."""
+    return bytes([0xFF, marker]) + struct.pack(">H", len(payload) + 2) + payload
+
+
+def sof(marker: int, width: int, height: int) -> bytes:
+    # precision, height, width, one component (id, sampling, quant table)
+    return segment(marker, struct.pack(">BHHB", 8, height, width, 1) + b"\x01\x11\x00")
+
+
+APP0 = segment(0xE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00")
+APP1 = segment(0xE1, b"Exif\x00\x00" + bytes(2000))
+DQT = segment(0xDB, b"\x00" + bytes(64))
+DHT = segment(0xC4, b"\x00" + bytes(16) + b"\x00")
+DRI = segment(0xDD, b"\x00\x10")
+SOS = segment(0xDA, b"\x01\x01\x00\x00\x3f\x00") + b"\x12\x34\x56\x78" * 8
+
+
+def webp(chunk: bytes, payload: bytes) -> bytes:
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def vp8(width: int, height: int, scale: int = 0) -> bytes:
+    # frame tag (keyframe), start code, 14-bit dimensions with 2-bit scale on top
+    return webp(b"VP8 ", b"\x10\x02\x00" + b"\x9d\x01\x2a"
+                + struct.pack("<HH", width | scale << 14, height | scale << 14) + bytes(8))
+
+
+def vp8l(width: int, height: int) -> bytes:
+    bits = (width - 1) | (height - 1) << 14 | 1 << 28  # alpha hint, version 0
+    return webp(b"VP8L", b"\x2f" + bits.to_bytes(4, "little") + bytes(8))
+
+
+def vp8x(width: int, height: int) -> bytes:
+    return webp(b"VP8X", b"\x10\x00\x00\x00" + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little"))
+
+
+def png(width: int, height: int) -> bytes:
+    ihdr = struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + b"\x00\x00\x00\x00"
+
+
+def jpeg(width: int | None, height: int | None) -> ImageInfo:
+    return ImageInfo("jpeg", "image/jpeg", "jpg", width, height)
+
+
+def webp_info(width: int | None, height: int | None) -> ImageInfo:
+    return ImageInfo("webp", "image/webp", "webp", width, height)
+
+
+# --- JPEG segment walking ---
+
+@pytest.mark.parametrize("head, expected", [
+    (SOI + APP0 + DQT + sof(0xC0, 640, 480) + DHT + SOS + EOI, jpeg(640, 480)),
+    (SOI + APP0 + APP1 + DQT + sof(0xC2, 4032, 3024) + SOS, jpeg(4032, 3024)),
+    # Huffman tables before the frame header: C4 is not a start-of-frame
+    (SOI + DQT + DHT + sof(0xC1, 800, 600) + SOS, jpeg(800, 600)),
+    (SOI + DHT + DHT + DRI + sof(0xCF, 1, 65535) + SOS, jpeg(1, 65535)),
+    # Fill bytes may pad any marker
+    (SOI + b"\xff\xff\xff" + APP0 + b"\xff" + sof(0xC0, 320, 200), jpeg(320, 200)),
+    (SOI + APP0 + b"\xff\xff" + DQT + b"\xff\xff\xff\xff" + sof(0xC0, 320, 200), jpeg(320, 200)),
+    # Standalone markers carry no length
+    (SOI + b"\xff\xd0\xff\xd7" + sof(0xC0, 16, 9), jpeg(16, 9)),
+    # Scan data before any frame header: stop rather than parse entropy data
+    (SOI + APP0 + DHT + SOS + sof(0xC0, 640, 480), jpeg(None, None)),
+    (SOI + SOS, jpeg(None, None)),
+    # Not a marker where one is expected: give up on dimensions
+    (SOI + APP0 + b"\x00\x00" + sof(0xC0, 640, 480), jpeg(None, None)),
+    # Header cut short: before the frame, inside the frame, inside a segment length
+    (SOI + APP0 + APP1, jpeg(None, None)),
+    (SOI + APP0 + sof(0xC0, 640, 480)[:8], jpeg(None, None)),
+    (SOI + APP0 + sof(0xC0, 640, 480)[:9], jpeg(640, 480)),
+    (SOI + b"\xff\xe0\x00", jpeg(None, None)),
+    (b"\xff\xd8\xff", jpeg(None, None)),
+])
+def test_jpeg_dimensions(head: bytes, expected: ImageInfo) -> None:
+    assert sniff_image(head) == expected
+
+
+@pytest.mark.parametrize("marker", [0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF])
+def test_jpeg_every_start_of_frame(marker: int) -> None:
+    assert sniff_image(SOI + APP0 + sof(marker, 123, 45) + SOS) == jpeg(123, 45)
+
+
+@pytest.mark.parametrize("marker", [0xC4, 0xC8, 0xCC])
+def test_jpeg_c4_c8_cc_are_skipped(marker: int) -> None:
+    head = SOI + segment(marker, struct.pack(">BHHB", 8, 1, 1, 1)) + sof(0xC0, 123, 45)
+
+    assert sniff_image(head) == jpeg(123, 45)
+
+
+# --- WebP ---
+
+@pytest.mark.parametrize("head, expected", [
+    (vp8(1024, 768), webp_info(1024, 768)),
+    (vp8(16383, 1), webp_info(16383, 1)),
+    (vp8(1024, 768, scale=3), webp_info(1024, 768)),  # scaling bits are not part of the size
+    (vp8(1024, 768)[:29], webp_info(None, None)),
+    (vp8l(1, 1), webp_info(1, 1)),
+    (vp8l(800, 600), webp_info(800, 600)),
+    (vp8l(16384, 16384), webp_info(16384, 16384)),
+    (vp8l(800, 600)[:24], webp_info(None, None)),
+    (vp8x(1, 1), webp_info(1, 1)),
+    (vp8x(4000, 3000), webp_info(4000, 3000)),
+    (vp8x(1 << 24, 1 << 24), webp_info(1 << 24, 1 << 24)),
+    (vp8x(4000, 3000)[:29], webp_info(None, None)),
+    (webp(b"ALPH", bytes(32)), webp_info(None, None)),
+    (b"RIFF\x00\x00\x00\x00WEBP", webp_info(None, None)),
+])
+def test_webp_dimensions(head: bytes, expected: ImageInfo) -> None:
+    assert sniff_image(head) == expected
+
+
+# --- Format detection ---
+
+@pytest.mark.parametrize("head, expected", [
+    (png(1200, 900), ImageInfo("png", "image/png", "png", 1200, 900)),
+    (png(1200, 900)[:23], ImageInfo("png", "image/png", "png", None, None)),
+    (b"", None),
+    (b"\xff\xd8", None),
+    (b"\xff\xd8\xfe", None),
+    (b"\x89PNG\r\n\x1a", None),
+    (b"RIFF\x00\x00\x00\x00WAVEfmt ", None),
+    (b"RIFF\x00\x00\x00\x00WEB", None),
+    (b"GIF89a\x01\x00\x01\x00", None),
+    (b"%PDF-1.7\n", None),
+    (b"<svg xmlns='http://www.w3.org/2000/svg'/>", None),
+])
+def test_sniff_image_formats(head: bytes, expected: ImageInfo | None) -> None:
+    assert sniff_image(head) == expected
+
+
+# --- LimitedStream ---
+
+class ChunkedSource:
+    """An UploadFile stand-in that hands out its data in read-size pieces."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.reads: list[int] = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+
+async def _drain(stream: LimitedStream) -> list[bytes]:
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.parametrize("head_size, rest_size, max_bytes", [
+    (0, 0, 0),
+    (10, 0, 10),
+    (0, 10, 10),
+    (10, 5, 15),
+    (100, STREAM_CHUNK_BYTES * 2 + 1, 100 + STREAM_CHUNK_BYTES * 2 + 1),
+])
+async def test_limited_stream_within_limit(head_size: int, rest_size: int, max_bytes: int) -> None:
+    head, rest = b"h" * head_size, b"r" * rest_size
+    stream = LimitedStream(ChunkedSource(rest), head, max_bytes)
+
+    chunks = await _drain(stream)
+
+    assert b"".join(chunks) == head + rest
+    assert stream.bytes_read == head_size + rest_size
+    assert all(len(chunk) <= max(head_size, STREAM_CHUNK_BYTES) for chunk in chunks)
+
+
+@pytest.mark.parametrize("head_size, rest_size, max_bytes, chunks_before", [
+    (11, 0, 10, 0),                       # the head alone is over
+    (10, 1, 10, 1),                       # one byte over, in the first read
+    (0, STREAM_CHUNK_BYTES + 1, STREAM_CHUNK_BYTES, 1),
+    (5, STREAM_CHUNK_BYTES * 3, STREAM_CHUNK_BYTES + 5, 2),
+])
+async def test_limited_stream_stops_over_limit(
+    head_size: int, rest_size: int, max_bytes: int, chunks_before: int
+) -> None:
+    source = ChunkedSource(b"r" * rest_size)
+    stream = LimitedStream(source, b"h" * head_size, max_bytes)
+    received: list[bytes] = []
+
+    with pytest.raises(ImageTooLargeError):
+        async for chunk in stream:
+            received.append(chunk)
+
+    assert len(received) == chunks_before
+    assert sum(map(len, received)) <= max_bytes
+    # Reading stops at the offending chunk; the rest of the source is never read
+    assert len(source.reads) <= chunks_before + 1
+    assert all(size == STREAM_CHUNK_BYTES for size in source.reads)
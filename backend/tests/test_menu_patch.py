@@ -0,0 +1,235 @@
+"""JSON Patch applied in Postgres (menus CTE chain) and the PATCH route's If-Match handling."""
+
+import uuid
+from typing import Any
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.api.menus import _parse_if_match, patch_menu
+from app.db import menus as menus_repo
+from app.schemas.patch import JsonPatchOperation, compile_patch
+
+
+pytestmark = pytest.mark.anyio
+
+MENU: dict[str, Any] = {
+    "schema_version": 1,
+    "title": "Cafe",
+    "categories": [
+        {"name": "Coffee", "items": [
+            {"name": "Espresso", "price": 25},
+            {"name": "Latte", "price": 35},
+        ]},
+        {"name": "Tea", "items": []},
+    ],
+}
+
+
+def _ops(*operations: dict[str, Any]) -> list[JsonPatchOperation]:
+    return [JsonPatchOperation.model_validate(op) for op in operations]
+
+
+async def _create_menu() -> tuple[str, str]:
+    user_id = str(uuid.uuid4())
+    menu = await menus_repo.create_menu(user_id, MENU)
+    assert menu is not None
+    return menu["id"], user_id
+
+
+async def _apply(*operations: dict[str, Any]) -> dict[str, Any]:
+    menu_id, user_id = await _create_menu()
+    menu = await menus_repo.apply_menu_patch(menu_id, user_id, 1, compile_patch(_ops(*operations)))
+    assert menu is not None
+    assert menu["version"] == 2
+    return menu["data"]
+
+
+def _names(data: dict[str, Any], category: int) -> list[str]:
+    return [item["name"] for item in data["categories"][category]["items"]]
+
+
+# --- CTE chain, one operation at a time ---
+
+@pytest.mark.usefixtures("db")
+@pytest.mark.parametrize("operation, check", [
+    ({"op": "add", "path": "/theme", "value": {"font": "Inter"}},
+     lambda d: d["theme"] == {"font": "Inter"}),
+    ({"op": "add", "path": "/title", "value": "Bistro"},  # add onto an existing member replaces it
+     lambda d: d["title"] == "Bistro"),
+    ({"op": "add", "path": "/categories/0/items/1", "value": {"name": "Mocha"}},
+     lambda d: _names(d, 0) == ["Espresso", "Mocha", "Latte"]),
+    ({"op": "add", "path": "/categories/0/items/2", "value": {"name": "Mocha"}},  # index == length appends
+     lambda d: _names(d, 0) == ["Espresso", "Latte", "Mocha"]),
+    ({"op": "add", "path": "/categories/1/items/-", "value": {"name": "Chai"}},
+     lambda d: _names(d, 1) == ["Chai"]),
+    ({"op": "replace", "path": "/categories/0/items/1/price", "value": "36,50"},
+     lambda d: d["categories"][0]["items"][1]["price"] == "36,50"),
+    ({"op": "replace", "path": "", "value": {"schema_version": 1, "categories": []}},
+     lambda d: d == {"schema_version": 1, "categories": []}),
+    ({"op": "remove", "path": "/categories/0/items/0"},
+     lambda d: _names(d, 0) == ["Latte"]),
+    ({"op": "remove", "path": "/title"},
+     lambda d: "title" not in d),
+    ({"op": "test", "path": "/categories/0/items/0", "value": {"name": "Espresso", "price": 25}},
+     lambda d: d == MENU),
+    ({"op": "copy", "from": "/categories/0/items/0", "path": "/categories/1/items/0"},
+     lambda d: _names(d, 0) == ["Espresso", "Latte"] and _names(d, 1) == ["Espresso"]),
+    ({"op": "copy", "from": "/categories/0/name", "path": "/categories/1/name"},
+     lambda d: d["categories"][1]["name"] == "Coffee"),
+    ({"op": "move", "from": "/categories/0/items/0", "path": "/categories/1/items/-"},
+     lambda d: _names(d, 0) == ["Latte"] and _names(d, 1) == ["Espresso"]),
+    ({"op": "move", "from": "/categories/0/items/0", "path": "/categories/0/items/1"},  # index after the removal
+     lambda d: _names(d, 0) == ["Latte", "Espresso"]),
+    ({"op": "move", "from": "/categories/1", "path": "/categories/0"},
+     lambda d: [c["name"] for c in d["categories"]] == ["Tea", "Coffee"]),
+])
+async def test_single_operation(operation: dict[str, Any], check: Any) -> None:
+    assert check(await _apply(operation))
+
+
+@pytest.mark.usefixtures("db")
+@pytest.mark.parametrize("path", ["/title", "/categories/0/name", "/categories/0/items", "/categories/1", "/categories/0/items/1"])
+async def test_move_onto_its_own_path_leaves_the_document_unchanged(path: str) -> None:
+    assert await _apply({"op": "move", "from": path, "path": path}) == MENU
+
+
+@pytest.mark.usefixtures("db")
+async def test_steps_see_the_previous_steps_result() -> None:
+    data = await _apply(
+        {"op": "add", "path": "/theme", "value": {}},
+        {"op": "move", "from": "/title", "path": "/theme/font"},
+        {"op": "add", "path": "/categories/-", "value": {"name": "Desserts", "items": []}},
+        {"op": "copy", "from": "/categories/0/items/1", "path": "/categories/2/items/-"},
+        {"op": "replace", "path": "/categories/2/items/0/name", "value": "Affogato"},
+        {"op": "test", "path": "/categories/2/items/0", "value": {"name": "Affogato", "price": 35}},
+        {"op": "remove", "path": "/categories/1"},
+    )
+
+    assert "title" not in data
+    assert data["theme"] == {"font": "Cafe"}
+    assert [c["name"] for c in data["categories"]] == ["Coffee", "Desserts"]
+    assert _names(data, 1) == ["Affogato"]
+    assert _names(data, 0) == ["Espresso", "Latte"]
+
+
+@pytest.mark.usefixtures("db")
+async def test_values_travel_as_parameters() -> None:
+    title = "'); DROP TABLE menus; --"
+
+    assert (await _apply({"op": "replace", "path": "/title", "value": title}))["title"] == title
+
+
+# --- Steps that do not apply: nothing is written ---
+
+@pytest.mark.usefixtures("db")
+@pytest.mark.parametrize("operations", [
+    [{"op": "test", "path": "/title", "value": "Bistro"}],
+    [{"op": "test", "path": "/title", "value": None}],
+    [{"op": "replace", "path": "/theme/font", "value": "Inter"}],
+    [{"op": "remove", "path": "/categories/5"}],
+    [{"op": "add", "path": "/categories/0/items/3", "value": {"name": "Mocha"}}],
+    [{"op": "add", "path": "/theme/font", "value": "Inter"}],  # parent object is missing
+    [{"op": "copy", "from": "/categories/0/items/9", "path": "/categories/1/items/0"}],
+    [{"op": "move", "from": "/theme", "path": "/theme"}],
+    [{"op": "move", "from": "/title", "path": "/theme/font"}],  # no theme object to add into
+    [{"op": "move", "from": "/categories/0/items/1", "path": "/categories/0/items/2"}],  # past the end after removal
+    [{"op": "replace", "path": "/title", "value": "Bistro"}, {"op": "test", "path": "/title", "value": "Cafe"}],
+])
+async def test_failed_step_rejects_the_whole_patch(operations: list[dict[str, Any]]) -> None:
+    menu_id, user_id = await _create_menu()
+
+    with pytest.raises(menus_repo.PatchNotApplicableError):
+        await menus_repo.apply_menu_patch(menu_id, user_id, 1, compile_patch(_ops(*operations)))
+
+    menu = await menus_repo.get_owned_menu(menu_id, user_id)
+    assert menu is not None
+    assert menu["version"] == 1
+    assert menu["data"] == MENU
+
+
+# --- Versions and ownership ---
+
+@pytest.mark.usefixtures("db")
+async def test_stale_version_is_a_conflict() -> None:
+    menu_id, user_id = await _create_menu()
+    steps = compile_patch(_ops({"op": "replace", "path": "/title", "value": "Bistro"}))
+    assert await menus_repo.apply_menu_patch(menu_id, user_id, 1, steps) is not None
+
+    for stale in (1, 3, -1):
+        with pytest.raises(menus_repo.VersionConflictError) as e:
+            await menus_repo.apply_menu_patch(menu_id, user_id, stale, steps)
+        assert e.value.current_version == 2
+
+
+@pytest.mark.usefixtures("db")
+async def test_stale_version_wins_over_a_failing_test() -> None:
+    menu_id, user_id = await _create_menu()
+    steps = compile_patch(_ops({"op": "test", "path": "/title", "value": "Bistro"}))
+
+    with pytest.raises(menus_repo.VersionConflictError):
+        await menus_repo.apply_menu_patch(menu_id, user_id, 7, steps)
+
+
+@pytest.mark.usefixtures("db")
+async def test_menu_of_another_user_is_not_found() -> None:
+    menu_id, _ = await _create_menu()
+    steps = compile_patch(_ops({"op": "replace", "path": "/title", "value": "Bistro"}))
+
+    assert await menus_repo.apply_menu_patch(menu_id, str(uuid.uuid4()), 1, steps) is None
+    assert await menus_repo.apply_menu_patch("not-a-uuid", str(uuid.uuid4()), 1, steps) is None
+
+
+# --- If-Match on the PATCH route ---
+
+@pytest.mark.parametrize("header, version", [
+    (None, None),
+    ('"v3"', 3),
+    ('W/"v3"', 3),
+    (' "v12" ', 12),
+    ("v3", 3),
+    ('"3"', -1),
+    ('"vx"', -1),
+    ("*", -1),
+    ('"v3", "v4"', -1),
+])
+def test_parse_if_match(header: str | None, version: int | None) -> None:
+    assert _parse_if_match(header) == version
+
+
+async def test_patch_without_if_match_is_rejected_before_anything_else() -> None:
+    # No database needed: the precondition is checked first
+    with pytest.raises(HTTPException) as e:
+        await patch_menu(str(uuid.uuid4()), _ops({"op": "remove", "path": "/categories"}), str(uuid.uuid4()), Response())
+
+    assert e.value.status_code == 428
+
+
+@pytest.mark.usefixtures("db")
+async def test_patch_route_status_codes() -> None:
+    menu_id, user_id = await _create_menu()
+    replace = _ops({"op": "replace", "path": "/title", "value": "Bistro"})
+
+    response = Response()
+    result = await patch_menu(menu_id, replace, user_id, response, if_match='"v1"')
+    assert result.version == 2
+    assert response.headers["ETag"] == '"v2"'
+
+    for if_match in ('"v1"', '"garbage"'):
+        with pytest.raises(HTTPException) as e:
+            await patch_menu(menu_id, replace, user_id, Response(), if_match=if_match)
+        assert e.value.status_code == 409
+        assert e.value.headers == {"ETag": '"v2"'}
+
+    with pytest.raises(HTTPException) as e:
+        await patch_menu(menu_id, _ops({"op": "test", "path": "/title", "value": "Cafe"}), user_id, Response(), if_match='"v2"')
+    assert e.value.status_code == 409
+    assert e.value.headers is None
+
+    with pytest.raises(HTTPException) as e:
+        await patch_menu(menu_id, _ops({"op": "replace", "path": "/subtitle", "value": "x"}), user_id, Response(), if_match='"v2"')
+    assert e.value.status_code == 422
+
+    with pytest.raises(HTTPException) as e:
+        await patch_menu(menu_id, replace, str(uuid.uuid4()), Response(), if_match='"v2"')
+    assert e.value.status_code == 404
@@ -0,0 +1,39 @@
+"""Fake OCR provider: deterministic output in the normalized text format."""
+
+import pytest
+
+from app.jobs.ocr import _FAKE_PAGES, FakeOCRProvider, OCRError, normalize_text
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_same_bytes_give_the_same_text() -> None:
+    first = await FakeOCRProvider().extract_text(b"menu photo", "image/jpeg")
+    second = await FakeOCRProvider().extract_text(b"menu photo", "image/png")
+
+    assert first == second
+    assert first.provider == "fake"
+
+
+async def test_every_fake_page_is_reachable() -> None:
+    provider = FakeOCRProvider()
+    texts = {(await provider.extract_text(bytes([i]), "image/jpeg")).text for i in range(64)}
+
+    assert texts == {normalize_text(page) for page in _FAKE_PAGES}
+
+
+async def test_output_is_normalized() -> None:
+    result = await FakeOCRProvider().extract_text(b"menu photo", "image/jpeg")
+
+    assert result.text == normalize_text(result.text)
+    assert "" not in result.text.splitlines()
+
+
+async def test_empty_image_is_rejected() -> None:
+    with pytest.raises(OCRError):
+        await FakeOCRProvider().extract_text(b"", "image/jpeg")
+
+
+def test_normalize_text() -> None:
+    assert normalize_text("  Cafe   Deluxe \n\n\tLatte  35 \n") == "Cafe Deluxe\nLatte 35"
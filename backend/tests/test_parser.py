@@ -0,0 +1,71 @@
+"""Menu text parser: page parsing and merging, on the fake OCR pages."""
+
+from app.jobs.ocr import _FAKE_PAGES, normalize_text
+from app.jobs.parser import merge_pages, parse_menu_text, parse_page
+
+
+FAKE_PAGES = [normalize_text(page) for page in _FAKE_PAGES]
+
+
+def test_parse_menu_text_on_fake_pages() -> None:
+    result = parse_menu_text(FAKE_PAGES)
+
+    assert result.issues == []
+    assert result.item_count == 12
+    assert result.data["title"] == "Cafe Deluxe"
+    assert [c["name"] for c in result.data["categories"]] == [
+        "Kahveler", "Tatlılar", "Başlangıçlar", "Ana Yemekler", "Soğuk İçecekler",
+    ]
+    assert result.data["categories"][0]["items"] == [
+        {"name": "Espresso", "price": 25},
+        {"name": "Americano", "price": 30},
+        {"name": "Latte", "price": 35},
+    ]
+
+
+def test_parse_menu_text_equals_merge_of_page_parses() -> None:
+    assert parse_menu_text(FAKE_PAGES) == merge_pages([parse_page(text) for text in FAKE_PAGES])
+
+
+def test_parse_page_title_and_prices() -> None:
+    page = parse_page("Cafe Deluxe\nKahveler\nLatte ...... 35,50 TL\nMocha: 40 ₺")
+
+    assert page["title"] == "Cafe Deluxe"
+    assert page["leading_items"] == []
+    assert page["categories"] == [{
+        "name": "Kahveler",
+        "items": [{"name": "Latte", "price": 35.5}, {"name": "Mocha", "price": 40}],
+    }]
+
+
+def test_merge_continues_previous_category_across_pages() -> None:
+    first = parse_page("Kahveler\nEspresso 25")
+    second = parse_page("Latte 35\nTatlılar\nBrownie 55")
+
+    result = merge_pages([first, second])
+
+    assert result.data["categories"] == [
+        {"name": "Kahveler", "items": [{"name": "Espresso", "price": 25}, {"name": "Latte", "price": 35}]},
+        {"name": "Tatlılar", "items": [{"name": "Brownie", "price": 55}]},
+    ]
+
+
+def test_merge_combines_categories_with_the_same_name() -> None:
+    result = parse_menu_text(["Kahveler\nEspresso 25", "Kahveler\nLatte 35"])
+
+    assert result.data["categories"] == [
+        {"name": "Kahveler", "items": [{"name": "Espresso", "price": 25}, {"name": "Latte", "price": 35}]},
+    ]
+
+
+def test_leading_items_without_a_category_go_to_the_default_category() -> None:
+    result = parse_menu_text(["Espresso 25"])
+
+    assert result.data["categories"] == [{"name": "Menü", "items": [{"name": "Espresso", "price": 25}]}]
+
+
+def test_text_without_items_yields_no_items() -> None:
+    result = parse_menu_text(["Hoşgeldiniz\nAfiyet olsun"])
+
+    assert result.item_count == 0
+    assert result.data["categories"] == []
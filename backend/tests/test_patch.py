@@ -0,0 +1,273 @@
+"""JSON Patch validation and compilation against schema v1 (no database)."""
+
+from typing import Any
+
+import pytest
+
+from app.schemas.patch import (
+    MAX_PATCH_OPERATIONS,
+    JsonPatchOperation,
+    PatchStep,
+    PatchValidationError,
+    compile_patch,
+)
+
+
+def _op(**fields: Any) -> JsonPatchOperation:
+    return JsonPatchOperation.model_validate(fields)
+
+
+def _compile(**fields: Any) -> PatchStep:
+    steps = compile_patch([_op(**fields)])
+    assert len(steps) == 1
+    return steps[0]
+
+
+def _rejection(**fields: Any) -> str:
+    with pytest.raises(PatchValidationError) as e:
+        compile_patch([_op(**fields)])
+    assert len(e.value.issues) >= 1
+    return e.value.issues[0]["message"]
+
+
+@pytest.mark.parametrize("path", [
+    "",
+    "/title",
+    "/schema_version",
+    "/theme",
+    "/theme/font",
+    "/categories",
+    "/categories/0",
+    "/categories/12/name",
+    "/categories/0/items",
+    "/categories/0/items/3",
+    "/categories/0/items/3/price",
+])
+def test_paths_inside_the_schema_resolve(path: str) -> None:
+    assert _compile(op="test", path=path, value=None).path == (path[1:].split("/") if path else [])
+
+
+@pytest.mark.parametrize("path, reason", [
+    ("title", "Invalid JSON Pointer"),
+    ("/subtitle", "not allowed here"),
+    ("/theme/fontSize", "not allowed here"),
+    ("/categories/0/items/0/calories", "not allowed here"),
+    ("/categories/x", "not a valid array index"),
+    ("/categories/01", "not a valid array index"),
+    ("/categories/-1", "not a valid array index"),
+    ("/categories/-/name", "not a valid array index"),
+    ("/title/0", "not allowed here"),
+])
+def test_paths_outside_the_schema_are_rejected(path: str, reason: str) -> None:
+    assert reason in _rejection(op="test", path=path, value=None)
+
+
+def test_pointer_escapes_are_decoded() -> None:
+    # "~1" is "/" and "~0" is "~"; neither spelling names a schema field
+    assert "'a/b' is not allowed" in _rejection(op="test", path="/a~1b", value=None)
+    assert "'~c' is not allowed" in _rejection(op="test", path="/~0c", value=None)
+
+
+def test_append_token_only_for_add_move_copy() -> None:
+    assert _compile(op="add", path="/categories/-", value={"name": "Tea", "items": []}).path == ["categories", "-"]
+    assert _compile(op="copy", path="/categories/-", **{"from": "/categories/0"}).path == ["categories", "-"]
+    assert _compile(op="move", path="/categories/-", **{"from": "/categories/0"}).path == ["categories", "-"]
+    for op in ("replace", "remove", "test"):
+        assert "not a valid array index" in _rejection(op=op, path="/categories/-", value={"name": "Tea", "items": []})
+
+
+def test_add_compiles_with_the_validated_value() -> None:
+    step = _compile(op="add", path="/categories/0/items/1", value={"name": "Latte", "price": "35,50"})
+
+    assert step == PatchStep(
+        op="add",
+        path=["categories", "0", "items", "1"],
+        from_path=None,
+        value={"name": "Latte", "price": "35,50"},
+        parent_is_array=True,
+    )
+
+
+def test_add_object_member_is_not_an_array_insert() -> None:
+    step = _compile(op="add", path="/theme/font", value="Inter")
+
+    assert step.parent_is_array is False
+    assert step.value == "Inter"
+
+
+@pytest.mark.parametrize("path, value", [
+    ("/title", 42),
+    ("/schema_version", 2),
+    ("/schema_version", True),
+    ("/categories/0/name", ""),
+    ("/categories/0/items/0/price", False),
+    ("/categories/0/items/0", {"name": "Latte", "calories": 120}),
+    ("/categories/0", {"name": "Tea"}),
+    ("/theme", {"font": None}),
+    ("", {"schema_version": 1}),
+])
+def test_add_and_replace_validate_the_value(path: str, value: Any) -> None:
+    for op in ("add", "replace"):
+        with pytest.raises(PatchValidationError) as e:
+            compile_patch([_op(op=op, path=path, value=value)])
+        assert all(issue["path"].startswith(path) for issue in e.value.issues)
+        assert all(f"operation 0 ({op})" in issue["message"] for issue in e.value.issues)
+
+
+def test_value_errors_point_inside_the_value() -> None:
+    with pytest.raises(PatchValidationError) as e:
+        compile_patch([_op(op="add", path="/categories/-", value={"name": "Tea", "items": [{"name": ""}]})])
+
+    assert [issue["path"] for issue in e.value.issues] == ["/categories/-/items/0/name"]
+
+
+def test_replace_whole_document() -> None:
+    document = {"schema_version": 1, "categories": []}
+    step = _compile(op="replace", path="", value=document)
+
+    assert step.path == []
+    assert step.value == document
+
+
+def test_price_null_is_allowed() -> None:
+    assert _compile(op="replace", path="/categories/0/items/0/price", value=None).value is None
+
+
+@pytest.mark.parametrize("op", ["add", "replace", "test"])
+def test_value_is_required(op: str) -> None:
+    assert "'value' is required" in _rejection(op=op, path="/title")
+
+
+def test_explicit_null_value_counts_as_supplied() -> None:
+    assert _compile(op="test", path="/title", value=None).value is None
+
+
+@pytest.mark.parametrize("path", ["/title", "/theme", "/theme/font", "/categories/1", "/categories/0/items/0/price"])
+def test_remove_optional(path: str) -> None:
+    step = _compile(op="remove", path=path)
+
+    assert step.op == "remove"
+    assert step.from_path is None
+
+
+@pytest.mark.parametrize("path, reason", [
+    ("", "the document root cannot be removed"),
+    ("/schema_version", "cannot remove a required field"),
+    ("/categories", "cannot remove a required field"),
+    ("/categories/0/name", "cannot remove a required field"),
+    ("/categories/0/items", "cannot remove a required field"),
+])
+def test_remove_required_is_rejected(path: str, reason: str) -> None:
+    assert reason in _rejection(op="remove", path=path)
+
+
+def test_test_value_is_not_schema_validated() -> None:
+    # A test only compares; a value the schema forbids simply never matches
+    assert _compile(op="test", path="/title", value=42).value == 42
+
+
+@pytest.mark.parametrize("op", ["move", "copy"])
+def test_from_is_required(op: str) -> None:
+    assert "'from' is required" in _rejection(op=op, path="/title")
+
+
+def test_copy_compiles() -> None:
+    step = _compile(op="copy", path="/categories/1/items/0", **{"from": "/categories/0/items/2"})
+
+    assert step.from_path == ["categories", "0", "items", "2"]
+    assert step.parent_is_array is True
+
+
+def test_copy_required_field_is_allowed() -> None:
+    # The source stays in place, so copying a required field is fine
+    step = _compile(op="copy", path="/categories/1/name", **{"from": "/categories/0/name"})
+
+    assert step.from_path == ["categories", "0", "name"]
+
+
+@pytest.mark.parametrize("op", ["move", "copy"])
+@pytest.mark.parametrize("source, target", [
+    ("/categories/1", "/categories/0/items/0"),
+    ("/categories/0/items/0", "/categories/1"),
+    ("/title", "/categories/0/name"),
+    ("/categories/0/name", "/title"),
+    ("/theme", "/categories/0"),
+])
+def test_move_and_copy_require_the_same_kind(op: str, source: str, target: str) -> None:
+    assert f"cannot {op} a" in _rejection(op=op, path=target, **{"from": source})
+
+
+def test_move_compiles() -> None:
+    step = _compile(op="move", path="/categories/1/items/0", **{"from": "/categories/0/items/2"})
+
+    assert step.op == "move"
+    assert step.path == ["categories", "1", "items", "0"]
+    assert step.from_path == ["categories", "0", "items", "2"]
+
+
+@pytest.mark.parametrize("path", ["/title", "/categories/0/name", "/categories/0/items", "/categories/2"])
+def test_move_onto_its_own_path_is_a_no_op(path: str) -> None:
+    # Allowed even for required fields: nothing is removed (RFC 6902 4.4)
+    step = _compile(op="move", path=path, **{"from": path})
+
+    assert step.path == step.from_path
+
+
+def test_move_required_field_is_rejected() -> None:
+    assert "cannot move a required field" in _rejection(
+        op="move", path="/categories/1/name", **{"from": "/categories/0/name"}
+    )
+
+
+@pytest.mark.parametrize("source, target", [
+    ("/categories/0", "/categories/0/items/0"),
+    ("/categories/0", "/categories/0/items/-"),
+    ("/categories/0/items", "/categories/0/items/1"),
+    ("/theme", "/theme/font"),
+])
+def test_move_into_one_of_its_children_is_rejected(source: str, target: str) -> None:
+    assert "cannot move a value into one of its children" in _rejection(op="move", path=target, **{"from": source})
+
+
+def test_copy_into_one_of_its_children_is_only_a_kind_check() -> None:
+    # The source is left in place, so only the kinds have to agree
+    assert "cannot copy a category to a item location" in _rejection(
+        op="copy", path="/categories/0/items/0", **{"from": "/categories/0"}
+    )
+
+
+def test_move_prefix_check_uses_whole_tokens() -> None:
+    # /categories/1 is not a child of /categories/10
+    step = _compile(op="move", path="/categories/1", **{"from": "/categories/10"})
+
+    assert step.from_path == ["categories", "10"]
+
+
+def test_issues_are_collected_per_operation() -> None:
+    operations = [
+        _op(op="replace", path="/title", value="Cafe"),
+        _op(op="replace", path="/subtitle", value="x"),
+        _op(op="remove", path="/categories"),
+    ]
+    with pytest.raises(PatchValidationError) as e:
+        compile_patch(operations)
+
+    assert [issue["path"] for issue in e.value.issues] == ["/subtitle", "/categories"]
+    assert e.value.issues[0]["message"].startswith("operation 1 (replace)")
+    assert e.value.issues[1]["message"].startswith("operation 2 (remove)")
+
+
+def test_too_many_operations() -> None:
+    operations = [_op(op="test", path="/title", value="x")] * (MAX_PATCH_OPERATIONS + 1)
+    with pytest.raises(PatchValidationError) as e:
+        compile_patch(operations)
+
+    assert len(e.value.issues) == 1
+    assert "Too many operations" in e.value.issues[0]["message"]
+
+
+def test_operation_rejects_unknown_members() -> None:
+    with pytest.raises(ValueError):
+        JsonPatchOperation.model_validate({"op": "add", "path": "/title", "value": "x", "extra": 1})
+    with pytest.raises(ValueError):
+        JsonPatchOperation.model_validate({"op": "merge", "path": "/title"})
@@ -0,0 +1,198 @@
+"""Circuit breaker state machine and its use by OutboundPolicy."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.resilience import CircuitBreaker, CircuitOpenError, OutboundPolicy
+
+
+def _breaker(failure_threshold: int = 2, reset_timeout: float = 0.0) -> CircuitBreaker:
+    # reset_timeout 0: the next acquire after opening half-opens at once
+    return CircuitBreaker("test", failure_threshold, reset_timeout)
+
+
+def _trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(breaker.acquire())
+    assert breaker.state == "open"
+
+
+def test_opens_after_consecutive_failures() -> None:
+    breaker = _breaker(failure_threshold=3, reset_timeout=60)
+
+    breaker.record_failure(breaker.acquire())
+    breaker.record_failure(breaker.acquire())
+    breaker.record_success(breaker.acquire())
+    breaker.record_failure(breaker.acquire())
+    breaker.record_failure(breaker.acquire())
+    assert breaker.state == "closed"
+
+    breaker.record_failure(breaker.acquire())
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as e:
+        breaker.acquire()
+    assert 59 < e.value.retry_after <= 60
+    assert breaker.stats()["rejected"] == 1
+
+
+@pytest.mark.parametrize("succeeds, state", [(True, "closed"), (False, "open")])
+def test_probe_outcome_decides(succeeds: bool, state: str) -> None:
+    breaker = _breaker()
+    _trip(breaker)
+
+    probe = breaker.acquire()
+    assert probe.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    if succeeds:
+        breaker.record_success(probe)
+    else:
+        breaker.record_failure(probe)
+    assert breaker.state == state
+
+
+def test_released_probe_frees_the_slot() -> None:
+    breaker = _breaker()
+    _trip(breaker)
+
+    breaker.release_probe(breaker.acquire())
+
+    assert breaker.state == "half_open"
+    assert breaker.acquire().state == "half_open"
+
+
+def test_late_success_from_closed_call_does_not_close_half_open() -> None:
+    breaker = _breaker()
+    slow = breaker.acquire()
+    _trip(breaker)
+    probe = breaker.acquire()
+
+    breaker.record_success(slow)
+
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()  # the probe slot is still taken
+    breaker.record_failure(probe)
+    assert breaker.state == "open"
+
+
+def test_late_failure_from_closed_call_does_not_reopen_half_open() -> None:
+    breaker = _breaker()
+    slow = breaker.acquire()
+    _trip(breaker)
+    probe = breaker.acquire()
+
+    breaker.record_failure(slow)
+    breaker.release_probe(slow)
+
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+    breaker.record_success(probe)
+    assert breaker.state == "closed"
+
+
+def test_late_outcomes_while_open_are_ignored() -> None:
+    breaker = _breaker(reset_timeout=60)
+    slow = [breaker.acquire() for _ in range(3)]
+    breaker.record_failure(slow[0])
+    breaker.record_failure(slow[1])
+    assert breaker.state == "open"
+    retry_in = breaker.stats()["retry_in"]
+
+    breaker.record_success(slow[2])
+
+    assert breaker.state == "open"
+    assert breaker.stats()["retry_in"] == retry_in
+
+
+def test_outcome_from_an_earlier_probe_is_ignored() -> None:
+    breaker = _breaker()
+    _trip(breaker)
+    first = breaker.acquire()
+    breaker.record_failure(first)
+    second = breaker.acquire()
+    assert second.state == "half_open"
+
+    breaker.record_success(first)
+    breaker.release_probe(first)
+
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+    breaker.record_success(second)
+    assert breaker.state == "closed"
+
+
+def test_closed_calls_before_a_reclose_do_not_count() -> None:
+    breaker = _breaker()
+    slow = breaker.acquire()
+    _trip(breaker)
+    breaker.record_success(breaker.acquire())
+    breaker.record_failure(breaker.acquire())
+
+    breaker.record_failure(slow)
+
+    assert breaker.state == "closed"
+    assert breaker.consecutive_failures == 1
+
+
+# --- OutboundPolicy ---
+
+def _policy(breaker: CircuitBreaker, attempts: int = 1) -> OutboundPolicy:
+    return OutboundPolicy(breaker, attempts, backoff_base=0.0, backoff_max=0.0)
+
+
+@pytest.mark.anyio
+async def test_policy_ignores_slow_call_that_outlived_the_closed_state() -> None:
+    breaker = _breaker()
+    policy = _policy(breaker)
+    release = asyncio.Event()
+
+    async def slow() -> httpx.Response:
+        await release.wait()
+        return httpx.Response(200)
+
+    async def failing() -> httpx.Response:
+        raise httpx.ConnectError("refused")
+
+    async def probe() -> httpx.Response:
+        await asyncio.sleep(0)
+        release.set()  # the slow call finishes while this probe is out
+        await asyncio.sleep(0.01)
+        return httpx.Response(503)
+
+    slow_call = asyncio.create_task(policy.request(slow, budget=5))
+    await asyncio.sleep(0)
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(httpx.ConnectError):
+            await policy.request(failing, budget=5)
+    assert breaker.state == "open"
+
+    response = await policy.request(probe, budget=5)
+
+    assert (await slow_call).status_code == 200
+    assert response.status_code == 503
+    assert breaker.state == "open"
+
+
+@pytest.mark.anyio
+async def test_policy_cancelled_probe_frees_the_slot() -> None:
+    breaker = _breaker()
+    _trip(breaker)
+
+    async def hang() -> httpx.Response:
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    call = asyncio.create_task(_policy(breaker).request(hang, budget=5))
+    await asyncio.sleep(0)
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+    assert breaker.state == "half_open"
+    assert breaker.acquire().state == "half_open"